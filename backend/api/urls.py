@@ -1,8 +1,9 @@
 from django.urls import path, include
-from .views import AuthTestView
+from .views import AuthTestView, MetricsView
 
 urlpatterns = [
     path("auth-test/", AuthTestView.as_view(), name="auth-test"),
+    path("metrics/", MetricsView.as_view(), name="metrics"),
     path("routines/", include("routines.urls")),
     path("users/", include("users.urls")),
-] 
\ No newline at end of file
+]
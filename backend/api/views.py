@@ -1,8 +1,12 @@
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.crypto import constant_time_compare
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import BasePermission, IsAuthenticated
 from rest_framework.request import Request
 from users.models import UserProfile
+from core.metrics import registry
 from typing import Any
 
 class AuthTestView(APIView):
@@ -18,4 +22,19 @@ class AuthTestView(APIView):
                 "role": user.role,
                 "supabase_id": str(user.supabase_id),
             }
-        }) 
\ No newline at end of file
+        })
+
+class HasMetricsToken(BasePermission):
+    """Allow admins, or scrapers presenting the configured metrics token."""
+    def has_permission(self, request: Request, view: Any) -> bool:
+        token = request.headers.get("X-Metrics-Token", "")
+        if settings.METRICS_TOKEN and constant_time_compare(token, settings.METRICS_TOKEN):
+            return True
+        return getattr(request.user, "role", None) == "admin"
+
+class MetricsView(APIView):
+    """Expose this worker's storage metrics in Prometheus text format."""
+    permission_classes = [HasMetricsToken]
+
+    def get(self, request: Request, *args: Any, **kwargs: Any) -> HttpResponse:
+        return HttpResponse(registry.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
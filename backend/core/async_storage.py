@@ -0,0 +1,218 @@
+from django.conf import settings
+from django.core.cache import cache
+from typing import Any, Coroutine, Dict, Iterable, List, Optional
+from urllib.parse import quote
+from weakref import WeakKeyDictionary
+from core.images import image_placeholder
+from core.metrics import observe_storage_bytes, observe_storage_call
+from core.resilience import StorageUnavailable, get_async_bulkhead, get_circuit_breaker, is_service_failure
+from core.storage import SupabaseStorage, signed_url_cache_key
+import asyncio
+import hashlib
+import time
+import httpx
+
+# One connection pool per event loop, shared by every AsyncSupabaseStorage
+_http_clients: "WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = WeakKeyDictionary()
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """Return the shared HTTP client for the running event loop."""
+    loop = asyncio.get_running_loop()
+    client = _http_clients.get(loop)
+    if client is None or client.is_closed:
+        client = _http_clients[loop] = httpx.AsyncClient(
+            base_url=f'{settings.SUPABASE_URL}/storage/v1',
+            headers={
+                'apikey': settings.SUPABASE_KEY,
+                'Authorization': f'Bearer {settings.SUPABASE_KEY}',
+            },
+            limits=httpx.Limits(max_connections=settings.STORAGE_ASYNC_MAX_CONNECTIONS),
+            timeout=max(settings.STORAGE_TIMEOUTS.values()),
+        )
+    return client
+
+class AsyncSupabaseStorage:
+    """Asyncio counterpart of SupabaseStorage for ASGI views.
+
+    Talks to the Supabase Storage REST API over a pooled ``httpx.AsyncClient``
+    and shares the circuit breaker, timeouts, metrics and signed URL cache of
+    the sync client.
+    Unlike the sync client, signing returns the signed URL as a string.
+    """
+
+    def __init__(self, http_client: Optional[httpx.AsyncClient] = None):
+        """Initialize with the shared HTTP client unless one is given."""
+        self.http = http_client or get_async_http_client()
+        self.bucket_name = 'media-assets'
+
+    async def _call(self, operation: str, request: Coroutine[Any, Any, httpx.Response]) -> httpx.Response:
+        """Await a storage request under the breaker, the operation timeout and the
+        event loop's concurrency limit."""
+        breaker = get_circuit_breaker(f'storage:{self.bucket_name}')
+        if not breaker.allow_request():
+            request.close()
+            observe_storage_call(operation, self.bucket_name, 'rejected', 0.0)
+            raise StorageUnavailable()
+
+        timeout = settings.STORAGE_TIMEOUTS.get(operation, settings.STORAGE_TIMEOUTS['default'])
+        started = time.perf_counter()
+        try:
+            response = await get_async_bulkhead().run(request, timeout)
+            response.raise_for_status()
+        except Exception as e:
+            observe_storage_call(operation, self.bucket_name, 'error', time.perf_counter() - started)
+            if is_service_failure(e):
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+            if isinstance(e, TimeoutError):
+                raise StorageUnavailable('Media storage did not respond in time.')
+            raise
+        observe_storage_call(operation, self.bucket_name, 'ok', time.perf_counter() - started)
+        breaker.record_success()
+        return response
+
+    def _object_url(self, file_path: str) -> str:
+        return f'/object/{self.bucket_name}/{quote(file_path)}'
+
+    async def upload_file(
+        self,
+        file_data: bytes,
+        file_name: str,
+        instructor_id: int,
+        asset_type: str,
+        content_type: Optional[str] = None
+    ) -> Dict:
+        """Upload a file and return its metadata, like ``SupabaseStorage.upload_file``."""
+        file_path = SupabaseStorage._generate_file_path(file_name, instructor_id, asset_type)
+        content_type = content_type or SupabaseStorage._get_content_type(file_name)
+
+        await self._call('upload', self.http.post(
+            self._object_url(file_path),
+            content=file_data,
+            headers={'content-type': content_type, 'x-upsert': 'false'}
+        ))
+        observe_storage_bytes('upload', self.bucket_name, len(file_data), 'out')
+
+        return {
+            'file_name': file_name,
+            'content_type': content_type,
+            'file_size': len(file_data),
+            'content_hash': hashlib.sha256(file_data).hexdigest(),
+            # Decoding is CPU-bound, so keep it off the event loop
+            'blurhash': await asyncio.to_thread(image_placeholder, file_data) if asset_type == 'image' else None,
+            'url': await self.get_signed_url(file_path),
+            'path': file_path
+        }
+
+    async def get_signed_url(self, file_path: str, expires_in: int = 3600) -> str:
+        """Sign a URL, reusing a cached one during the first half of its lifetime.
+
+        Shares its cache with ``SupabaseStorage``.
+        """
+        cache_key = signed_url_cache_key(self.bucket_name, file_path, expires_in)
+        cached = await cache.aget(cache_key)
+        if cached and cached['fresh_until'] > time.time():
+            return cached['url']
+
+        try:
+            response = await self._call('sign', self.http.post(
+                f'/object/sign/{self.bucket_name}/{quote(file_path)}',
+                json={'expiresIn': expires_in}
+            ))
+        except Exception as e:
+            if cached and is_service_failure(e):
+                return cached['url']
+            raise
+
+        signed_url = f"{self.http.base_url}{response.json()['signedURL'].lstrip('/')}"
+        margin = min(60, expires_in // 10)
+        await cache.aset(
+            cache_key,
+            {'url': signed_url, 'fresh_until': time.time() + expires_in / 2},
+            expires_in - margin
+        )
+        return signed_url
+
+    async def get_signed_urls(
+        self,
+        file_paths: Iterable[str],
+        expires_in: int = 3600,
+        concurrency: Optional[int] = None
+    ) -> Dict[str, Optional[str]]:
+        """Sign many URLs concurrently, at most ``concurrency`` at a time.
+
+        Paths that could not be signed map to ``None``.
+        """
+        semaphore = asyncio.Semaphore(concurrency or settings.STORAGE_ASYNC_CONCURRENCY)
+
+        async def sign(file_path: str) -> Optional[str]:
+            async with semaphore:
+                try:
+                    return await self.get_signed_url(file_path, expires_in)
+                except Exception as e:
+                    print(f"Error signing URL for {file_path}: {str(e)}")
+                    return None
+
+        file_paths = list(dict.fromkeys(file_paths))
+        urls = await asyncio.gather(*(sign(file_path) for file_path in file_paths))
+        return dict(zip(file_paths, urls))
+
+    async def list_files(self, prefix: str, limit: int = 100, offset: int = 0) -> List[Dict[str, Any]]:
+        """List one page of raw storage entries directly under a prefix."""
+        response = await self._call('list', self.http.post(
+            f'/object/list/{self.bucket_name}',
+            json={
+                'prefix': prefix.rstrip('/'),
+                'limit': limit,
+                'offset': offset,
+                'sortBy': {'column': 'name', 'order': 'asc'},
+            }
+        ))
+        return response.json()
+
+    async def list_uploads(
+        self,
+        instructor_id: int,
+        asset_type: Optional[str] = None,
+        limit: int = 100,
+        offset: int = 0
+    ) -> List[Dict]:
+        """List an instructor's files with signed URLs, signing them concurrently."""
+        prefix = f"{instructor_id}/"
+        if asset_type:
+            prefix = f"{prefix}{asset_type}/"
+
+        files = [
+            file_info for file_info in await self.list_files(prefix, limit=limit, offset=offset)
+            if file_info.get('id') is not None
+        ]
+        paths = [f"{prefix}{file_info['name']}" for file_info in files]
+        urls = await self.get_signed_urls(paths)
+
+        return [
+            {
+                'file_path': file_path,
+                'name': file_info['name'],
+                'size': (file_info.get('metadata') or {}).get('size', 0),
+                'created_at': file_info.get('created_at'),
+                'url': urls[file_path]
+            }
+            for file_path, file_info in zip(paths, files)
+        ]
+
+    async def delete_files(self, file_paths: Iterable[str]) -> bool:
+        """Delete a batch of files in a single request."""
+        file_paths = list(file_paths)
+        if not file_paths:
+            return True
+        try:
+            await self._call('delete', self.http.request(
+                'DELETE',
+                f'/object/{self.bucket_name}',
+                json={'prefixes': file_paths}
+            ))
+            return True
+        except Exception as e:
+            print(f"Error deleting {len(file_paths)} files: {str(e)}")
+            return False
@@ -0,0 +1,89 @@
+"""
+Conditional GET for viewsets.
+
+Validators are computed before anything is serialized: from a content
+version tag when the viewset tracks one, otherwise from the newest
+``updated_at`` and the row count of the scoped queryset. A client polling
+with ``If-None-Match`` is answered 304 after at most that one query.
+"""
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework.response import Response
+from typing import Any, Optional, Tuple
+from urllib.parse import urlencode
+import hashlib
+
+Validators = Tuple[str, Optional[Any]]
+
+class ConditionalGetMixin:
+    """Emit ETag / Last-Modified on ``list`` and ``retrieve`` and honour preconditions.
+
+    ``Last-Modified`` is only sent when validators come from the watermark,
+    since nested content can change without touching ``updated_at``, and
+    ``If-Modified-Since`` is only honoured on detail responses, since a
+    watermark cannot tell that rows were removed from a list.
+    """
+    watermark_field = 'updated_at'
+
+    def get_version_tag(self) -> Optional[str]:
+        """Return a tag that changes whenever the response content may, or None to use the watermark."""
+        return None
+
+    def _etag(self, *parts: Any) -> str:
+        query = urlencode(sorted(self.request.query_params.lists()), doseq=True)
+        digest = hashlib.md5(
+            ':'.join(str(part) for part in (self.basename, self.request.user.pk, query, *parts)).encode(),
+            usedforsecurity=False
+        ).hexdigest()
+        # Weak: equivalent content may be rendered in different formats
+        return f'W/"{digest}"'
+
+    def get_list_validators(self) -> Validators:
+        version = self.get_version_tag()
+        if version is not None:
+            return self._etag('list', version), None
+        watermark = self.filter_queryset(self.get_queryset()).aggregate(
+            latest=Max(self.watermark_field), count=Count('pk')
+        )
+        return self._etag('list', watermark['latest'], watermark['count']), watermark['latest']
+
+    def get_detail_validators(self, instance) -> Validators:
+        version = self.get_version_tag()
+        if version is not None:
+            return self._etag('detail', instance.pk, version), None
+        latest = getattr(instance, self.watermark_field)
+        return self._etag('detail', instance.pk, latest), latest
+
+    def _conditional(self, request, validators: Validators, use_last_modified: bool) -> Optional[Response]:
+        etag, last_modified = validators
+        not_modified = get_conditional_response(
+            request,
+            etag=etag,
+            last_modified=int(last_modified.timestamp()) if last_modified and use_last_modified else None
+        )
+        if not_modified is not None:
+            self._set_validators(not_modified, validators)
+        return not_modified
+
+    def _set_validators(self, response, validators: Validators):
+        etag, last_modified = validators
+        response['ETag'] = etag
+        if last_modified:
+            response['Last-Modified'] = http_date(last_modified.timestamp())
+        return response
+
+    def list(self, request, *args, **kwargs):
+        validators = self.get_list_validators()
+        not_modified = self._conditional(request, validators, use_last_modified=False)
+        if not_modified is not None:
+            return not_modified
+        return self._set_validators(super().list(request, *args, **kwargs), validators)
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        validators = self.get_detail_validators(instance)
+        not_modified = self._conditional(request, validators, use_last_modified=True)
+        if not_modified is not None:
+            return not_modified
+        return self._set_validators(Response(self.get_serializer(instance).data), validators)
@@ -0,0 +1,85 @@
+"""HTTP helpers for conditional and partial responses."""
+from typing import BinaryIO, Optional, Tuple
+import re
+
+_RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+class RangeNotSatisfiable(Exception):
+    """Raised when a byte range lies entirely outside the content."""
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """Parse a single-range ``Range`` header into inclusive ``(start, end)`` offsets.
+
+    Returns None when the header is absent, malformed or asks for several
+    ranges, in which case the full content should be sent.
+
+    Raises:
+        RangeNotSatisfiable: If the range starts beyond the end of the content
+    """
+    if not header:
+        return None
+    match = _RANGE_RE.match(header.strip())
+    if not match or not any(match.groups()):
+        return None
+
+    first, last = match.groups()
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if not length:
+            raise RangeNotSatisfiable()
+        return max(0, size - length), size - 1
+
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        raise RangeNotSatisfiable()
+    return start, end
+
+def etag_matches(header: Optional[str], etag: str, weak: bool = True) -> bool:
+    """Return whether an ``If-None-Match`` / ``If-Range`` value matches ``etag``.
+
+    Weak comparison (the default, used by ``If-None-Match``) ignores ``W/``
+    prefixes; strong comparison, required by ``If-Range``, does not.
+    """
+    if not header:
+        return False
+    if header.strip() == '*':
+        return True
+    for candidate in header.split(','):
+        candidate = candidate.strip()
+        if weak:
+            candidate = candidate.removeprefix('W/')
+            if candidate == etag.removeprefix('W/'):
+                return True
+        elif candidate == etag and not etag.startswith('W/'):
+            return True
+    return False
+
+class RangedFile:
+    """Read-only view of ``length`` bytes of a file starting at ``start``.
+
+    ``fileno()`` is passed through so WSGI servers can still ``sendfile()``
+    the range, bounded by the response's Content-Length.
+    """
+
+    def __init__(self, fileobj: BinaryIO, start: int, length: int):
+        fileobj.seek(start)
+        self.fileobj = fileobj
+        self.remaining = length
+
+    def read(self, size: int = -1) -> bytes:
+        if self.remaining <= 0:
+            return b''
+        size = self.remaining if size < 0 else min(size, self.remaining)
+        data = self.fileobj.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self) -> int:
+        return self.fileobj.fileno()
+
+    def close(self) -> None:
+        self.fileobj.close()
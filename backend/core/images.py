@@ -0,0 +1,92 @@
+"""
+Image placeholders for progressive loading.
+
+Placeholders use the BlurHash format: a short base83 string holding the
+average colour and a few cosine components of an image, which clients decode
+into a blurred preview while the real image loads.
+"""
+from PIL import Image, UnidentifiedImageError
+from typing import BinaryIO, Optional, Union
+import io
+import numpy as np
+
+BASE83_CHARS = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz#$%*+,-.:;=?@[]^_{|}~'
+
+# Components along each axis; 4x3 suits the mostly landscape pose images
+PLACEHOLDER_COMPONENTS = (4, 3)
+
+# Longest side of the copy the placeholder is computed from
+PLACEHOLDER_SAMPLE_SIZE = 32
+
+def _base83(value: int, length: int) -> str:
+    digits = []
+    for _ in range(length):
+        value, digit = divmod(value, 83)
+        digits.append(BASE83_CHARS[digit])
+    return ''.join(reversed(digits))
+
+def _srgb_to_linear(pixels: np.ndarray) -> np.ndarray:
+    values = pixels / 255.0
+    return np.where(values <= 0.04045, values / 12.92, ((values + 0.055) / 1.055) ** 2.4)
+
+def _linear_to_srgb(value: float) -> int:
+    value = min(max(value, 0.0), 1.0)
+    if value <= 0.0031308:
+        return int(value * 12.92 * 255 + 0.5)
+    return int((1.055 * value ** (1 / 2.4) - 0.055) * 255 + 0.5)
+
+def blurhash_encode(pixels: np.ndarray, components_x: int = 4, components_y: int = 3) -> str:
+    """Encode an ``(height, width, 3)`` array of 8-bit RGB pixels as a BlurHash.
+
+    Raises:
+        ValueError: If a component count is outside 1-9
+    """
+    if not (1 <= components_x <= 9 and 1 <= components_y <= 9):
+        raise ValueError("BlurHash component counts must be between 1 and 9")
+    height, width = pixels.shape[:2]
+    linear = _srgb_to_linear(pixels[..., :3].astype(np.float64))
+
+    # Project the image onto each cosine basis function in one pass
+    basis_x = np.cos(np.pi * np.outer(np.arange(components_x), np.arange(width)) / width)
+    basis_y = np.cos(np.pi * np.outer(np.arange(components_y), np.arange(height)) / height)
+    factors = np.einsum('jy,ix,yxc->jic', basis_y, basis_x, linear) / (width * height)
+    factors[1:] *= 2
+    factors[0, 1:] *= 2
+    factors = factors.reshape(-1, 3)
+
+    dc, ac = factors[0], factors[1:]
+    result = _base83((components_x - 1) + (components_y - 1) * 9, 1)
+    if len(ac):
+        quantised_max = int(max(0, min(82, int(np.abs(ac).max() * 166 - 0.5))))
+        maximum = (quantised_max + 1) / 166
+        result += _base83(quantised_max, 1)
+    else:
+        maximum = 1.0
+        result += _base83(0, 1)
+
+    r, g, b = (_linear_to_srgb(value) for value in dc)
+    result += _base83((r << 16) + (g << 8) + b, 4)
+
+    scaled = ac / maximum
+    quantised = np.clip(np.floor(np.sign(scaled) * np.sqrt(np.abs(scaled)) * 9 + 9.5), 0, 18).astype(int)
+    for qr, qg, qb in quantised:
+        result += _base83(qr * 19 * 19 + qg * 19 + qb, 2)
+    return result
+
+def image_placeholder(image: Union[bytes, BinaryIO]) -> Optional[str]:
+    """Return the BlurHash placeholder of an encoded image, or None if it cannot be read.
+
+    The image is decoded at reduced size where the format allows it and
+    downscaled before encoding, so large uploads stay cheap.
+    """
+    if isinstance(image, (bytes, bytearray)):
+        image = io.BytesIO(image)
+    try:
+        with Image.open(image) as img:
+            img.draft('RGB', (PLACEHOLDER_SAMPLE_SIZE, PLACEHOLDER_SAMPLE_SIZE))
+            img = img.convert('RGB')
+            img.thumbnail((PLACEHOLDER_SAMPLE_SIZE, PLACEHOLDER_SAMPLE_SIZE))
+            pixels = np.asarray(img)
+    except (UnidentifiedImageError, OSError, ValueError):
+        return None
+    return blurhash_encode(pixels, *PLACEHOLDER_COMPONENTS)
@@ -0,0 +1,169 @@
+from contextvars import ContextVar
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import bisect
+import math
+import threading
+
+# Latency buckets in seconds, from a cached signed URL up to a large upload
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelValues = Tuple[str, ...]
+
+class Counter:
+    """Monotonic counter with labels."""
+    kind = 'counter'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str]):
+        """Initialize an empty counter."""
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        """Increase the series identified by ``labels`` by ``amount``."""
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self) -> List[Tuple[str, LabelValues, float]]:
+        """Return ``(suffix, label values, value)`` for every series."""
+        with self._lock:
+            return [('', key, value) for key, value in sorted(self._values.items())]
+
+class Histogram:
+    """Cumulative histogram with labels and fixed bucket bounds."""
+    kind = 'histogram'
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str],
+        buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS
+    ):
+        """Initialize an empty histogram."""
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[LabelValues, List] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        """Record one observation in the series identified by ``labels``."""
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def samples(self) -> List[Tuple[str, LabelValues, float]]:
+        """Return ``(suffix, label values, value)`` for every series."""
+        samples = []
+        with self._lock:
+            for key, (counts, total, count) in sorted(self._series.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+                    cumulative += bucket_count
+                    le = '+Inf' if bound == math.inf else repr(float(bound))
+                    samples.append(('_bucket', key + (le,), cumulative))
+                samples.append(('_sum', key, total))
+                samples.append(('_count', key, count))
+        return samples
+
+class MetricsRegistry:
+    """Process-local collection of metrics rendered in Prometheus text format.
+
+    Each worker process keeps its own registry, so a scraper sees the
+    numbers of whichever worker served the request.
+    """
+
+    def __init__(self):
+        """Initialize an empty registry."""
+        self._metrics: List = []
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str]) -> Counter:
+        """Create and register a counter."""
+        metric = Counter(name, documentation, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str], **kwargs) -> Histogram:
+        """Create and register a histogram."""
+        metric = Histogram(name, documentation, labelnames, **kwargs)
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """Render every registered metric in the Prometheus exposition format."""
+        lines = []
+        for metric in self._metrics:
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            labelnames = metric.labelnames
+            for suffix, values, value in metric.samples():
+                names = labelnames + ('le',) if suffix == '_bucket' else labelnames
+                labels = ','.join(f'{name}="{_escape(v)}"' for name, v in zip(names, values))
+                lines.append(f'{metric.name}{suffix}{{{labels}}} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+registry = MetricsRegistry()
+
+STORAGE_LATENCY = registry.histogram(
+    'storage_operation_duration_seconds',
+    'Time spent in media storage operations.',
+    ['operation', 'bucket', 'outcome']
+)
+STORAGE_BYTES = registry.counter(
+    'storage_bytes_total',
+    'Bytes sent to and received from media storage.',
+    ['operation', 'bucket', 'direction']
+)
+
+# Storage timings collected for the request currently being served
+_request_timings: ContextVar[Optional[List[Tuple[str, float]]]] = ContextVar('storage_timings', default=None)
+
+def observe_storage_call(operation: str, bucket: str, outcome: str, seconds: float) -> None:
+    """Record a storage call in the latency histogram and the current request."""
+    STORAGE_LATENCY.observe(seconds, operation=operation, bucket=bucket, outcome=outcome)
+    timings = _request_timings.get()
+    if timings is not None:
+        timings.append((operation, seconds))
+
+def observe_storage_bytes(operation: str, bucket: str, num_bytes: int, direction: str) -> None:
+    """Count bytes sent (``'out'``) to or received (``'in'``) from storage."""
+    STORAGE_BYTES.inc(num_bytes, operation=operation, bucket=bucket, direction=direction)
+
+def start_request_timings() -> object:
+    """Begin collecting storage timings for the current request."""
+    return _request_timings.set([])
+
+def finish_request_timings(token: object) -> List[Tuple[str, float]]:
+    """Stop collecting and return the ``(operation, seconds)`` pairs recorded."""
+    timings = _request_timings.get() or []
+    _request_timings.reset(token)
+    return timings
+
+def server_timing_header(timings: Iterable[Tuple[str, float]]) -> str:
+    """Summarize timings per operation as a ``Server-Timing`` header value."""
+    totals: Dict[str, List[float]] = {}
+    for operation, seconds in timings:
+        total = totals.setdefault(operation, [0.0, 0])
+        total[0] += seconds
+        total[1] += 1
+    return ', '.join(
+        f'storage-{operation};dur={seconds * 1000:.1f};desc="{count} call{"s" if count != 1 else ""}"'
+        for operation, (seconds, count) in totals.items()
+    )
@@ -0,0 +1,40 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.http import HttpRequest, HttpResponse
+from typing import Callable
+from core.metrics import finish_request_timings, server_timing_header, start_request_timings
+
+class ServerTimingMiddleware:
+    """Report time spent in media storage calls as a ``Server-Timing`` header."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]):
+        """Store the next handler in the middleware chain."""
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        """Collect storage timings while the request is handled."""
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = start_request_timings()
+        try:
+            response = self.get_response(request)
+        finally:
+            timings = finish_request_timings(token)
+        return self._add_header(response, timings)
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        """Async variant used when the handler chain runs under ASGI."""
+        token = start_request_timings()
+        try:
+            response = await self.get_response(request)
+        finally:
+            timings = finish_request_timings(token)
+        return self._add_header(response, timings)
+
+    def _add_header(self, response: HttpResponse, timings) -> HttpResponse:
+        if timings:
+            response['Server-Timing'] = server_timing_header(timings)
+        return response
@@ -0,0 +1,26 @@
+"""
+Cursor pagination for list endpoints.
+
+Pages are located by the last row's sort key rather than by an offset, so
+fetching page 100 costs the same as fetching page 1, and rows inserted while
+a client scrolls do not shift later pages. Orderings end in ``id`` so rows
+sharing a timestamp still have a stable order; each ordering is backed by a
+matching index on the model.
+"""
+from django.conf import settings
+from rest_framework.pagination import CursorPagination
+
+class CreatedCursorPagination(CursorPagination):
+    """Newest first by ``(created_at, id)``; the default for all list endpoints."""
+    ordering = ('-created_at', '-id')
+    page_size = settings.API_PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = settings.API_MAX_PAGE_SIZE
+
+class CompletedCursorPagination(CreatedCursorPagination):
+    """Most recent practice first by ``(completed_at, id)``."""
+    ordering = ('-completed_at', '-id')
+
+class EarnedCursorPagination(CreatedCursorPagination):
+    """Most recently earned first by ``(earned_at, id)``."""
+    ordering = ('-earned_at', '-id')
@@ -0,0 +1,26 @@
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+from typing import Any, Mapping, Optional
+from .renderers import ORJSONRenderer
+import codecs
+import orjson
+
+class ORJSONParser(BaseParser):
+    """Drop-in replacement for DRF's ``JSONParser`` built on orjson.
+
+    Like ``JSONParser`` with ``STRICT_JSON``, ``NaN`` and ``Infinity`` are
+    rejected. Bodies in a charset other than UTF-8 are decoded first.
+    """
+    media_type = 'application/json'
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type: Optional[str] = None, parser_context: Optional[Mapping] = None) -> Any:
+        encoding = (parser_context or {}).get('encoding', settings.DEFAULT_CHARSET)
+        content = stream.read()
+        try:
+            if codecs.lookup(encoding).name != 'utf-8':
+                content = content.decode(encoding)
+            return orjson.loads(content)
+        except (LookupError, ValueError) as exc:
+            raise ParseError(f'JSON parse error - {exc}')
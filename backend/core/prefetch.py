@@ -0,0 +1,125 @@
+"""
+Declarative per-action query plans for viewsets.
+
+Nested serializers read related objects row by row, so every viewset that
+nests them declares what each action loads up front, and what each optional
+expansion adds::
+
+    class RoutineViewSet(PrefetchPlanMixin, viewsets.ModelViewSet):
+        prefetch_plans = {
+            'list': PrefetchPlan(select_related=['instructor']),
+        }
+        expand_plans = {
+            'exercises': PrefetchPlan(prefetch_related=['exercises']),
+        }
+"""
+from django.db.models import Expression, IntegerField, Prefetch, QuerySet, Subquery
+from typing import Dict, Optional, Sequence, Union
+from core.sparse import expanded_paths
+
+class SubqueryCount(Subquery):
+    """Number of rows a correlated queryset matches, 0 when there are none.
+
+    Unlike ``Count`` over a join, several of these on one queryset do not
+    multiply each other's rows.
+    """
+    template = '(SELECT COUNT(*) FROM (%(subquery)s) _count)'
+    output_field = IntegerField()
+
+class PrefetchPlan:
+    """Related objects an action's serializer reads, loaded in a fixed number of queries.
+
+    A plan may also restrict the columns loaded with ``only`` and add
+    computed columns with ``annotate``.
+    """
+
+    def __init__(
+        self,
+        select_related: Sequence[str] = (),
+        prefetch_related: Sequence[Union[str, Prefetch]] = (),
+        only: Sequence[str] = (),
+        annotate: Optional[Dict[str, Expression]] = None
+    ):
+        self.select_related = list(select_related)
+        self.prefetch_related = list(prefetch_related)
+        self.only = list(only)
+        self.annotate = dict(annotate or {})
+
+    def apply(self, queryset: QuerySet) -> QuerySet:
+        """Return ``queryset`` loading the plan's related objects."""
+        if self.select_related:
+            queryset = queryset.select_related(*self.select_related)
+        if self.prefetch_related:
+            queryset = queryset.prefetch_related(*self.prefetch_related)
+        if self.only:
+            queryset = queryset.only(*self.only)
+        if self.annotate:
+            queryset = queryset.annotate(**self.annotate)
+        return queryset
+
+    def under(self, relation: str) -> 'PrefetchPlan':
+        """Return this plan for objects prefetched through ``relation``."""
+        lookups = [f'{relation}__{name}' for name in self.select_related]
+        for lookup in self.prefetch_related:
+            if isinstance(lookup, Prefetch):
+                lookups.append(Prefetch(
+                    f'{relation}__{lookup.prefetch_through}',
+                    queryset=lookup.queryset,
+                    to_attr=lookup.to_attr
+                ))
+            else:
+                lookups.append(f'{relation}__{lookup}')
+        return PrefetchPlan(prefetch_related=lookups)
+
+def nest_plans(relation: str, plans: Dict[str, PrefetchPlan]) -> Dict[str, PrefetchPlan]:
+    """Re-root expansion plans at ``relation``, e.g. a routine's under a combined routine's ``routines``."""
+    return {f'{relation}.{path}': plan.under(relation) for path, plan in plans.items()}
+
+class PrefetchPlanMixin:
+    """Apply ``prefetch_plans[action]`` to the queryset of list and detail actions.
+
+    Plans are applied in ``filter_queryset``, after the viewset's own
+    ``get_queryset`` scoping, so subclasses keep overriding ``get_queryset``
+    as usual. Actions without a plan fall back to the ``'default'`` plan.
+    ``expand_plans`` are added for each relation path the request expands,
+    so relations that are not serialized are not loaded either.
+    """
+    prefetch_plans: Dict[str, PrefetchPlan] = {}
+    expand_plans: Dict[str, PrefetchPlan] = {}
+
+    def get_prefetch_plan(self) -> Optional[PrefetchPlan]:
+        return self.prefetch_plans.get(self.action, self.prefetch_plans.get('default'))
+
+    def filter_queryset(self, queryset: QuerySet) -> QuerySet:
+        queryset = super().filter_queryset(queryset)
+        plan = self.get_prefetch_plan()
+        if plan:
+            queryset = plan.apply(queryset)
+        # Parents come first, so custom Prefetch querysets precede lookups through them
+        for path in expanded_paths(self.request):
+            if path in self.expand_plans:
+                queryset = self.expand_plans[path].apply(queryset)
+        return queryset
+
+class SummaryListMixin:
+    """Serve ``list`` with a lightweight serializer and plan unless relations are expanded.
+
+    Lists return ``summary_serializer_class`` rows loaded with
+    ``summary_plan``; requesting ``?expand=`` switches back to the full
+    serializer so expanded relations have somewhere to go.
+    """
+    summary_serializer_class = None
+    summary_plan: Optional[PrefetchPlan] = None
+
+    def use_summary(self) -> bool:
+        return self.action == 'list' and not self.request.query_params.get('expand')
+
+    def get_serializer_class(self):
+        if self.use_summary():
+            return self.summary_serializer_class
+        return super().get_serializer_class()
+
+    def get_prefetch_plan(self) -> Optional[PrefetchPlan]:
+        if self.use_summary():
+            return self.summary_plan
+        return super().get_prefetch_plan()
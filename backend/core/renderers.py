@@ -0,0 +1,65 @@
+from rest_framework.negotiation import BaseContentNegotiation
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+from typing import Any, Mapping, Optional
+import json
+import orjson
+
+class ORJSONRenderer(BaseRenderer):
+    """Drop-in replacement for DRF's ``JSONRenderer`` built on orjson.
+
+    Strings, numbers, containers, datetimes, dates, times, UUIDs and NumPy
+    arrays are encoded natively, in the same form DRF's encoder gives them.
+    Everything else, such as Decimals, durations and lazy translations, is
+    handed to DRF's encoder, so responses parse to the same data as before.
+    orjson only indents by two spaces, so any requested indent gives that.
+    """
+    media_type = 'application/json'
+    format = 'json'
+    # JSON is always UTF-8 here, see JSONRenderer
+    charset = None
+    options = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+    default = staticmethod(JSONEncoder().default)
+
+    get_indent = JSONRenderer.get_indent
+
+    def render(self, data: Any, accepted_media_type: Optional[str] = None, renderer_context: Optional[Mapping] = None) -> bytes:
+        if data is None:
+            return b''
+        options = self.options
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            options |= orjson.OPT_INDENT_2
+        content = orjson.dumps(data, default=self.default, option=options)
+        # Escaped like JSONRenderer, so the output is also valid JavaScript
+        return content.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+
+class PassthroughRenderer(BaseRenderer):
+    """Lets binary endpoints be negotiated with ``Accept: application/octet-stream``.
+
+    Bytes are returned unchanged. Anything else, such as an error body, is
+    encoded as JSON so failures stay readable.
+    """
+    media_type = 'application/octet-stream'
+    format = 'bin'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data: Any, accepted_media_type: Optional[str] = None, renderer_context: Optional[Mapping] = None) -> bytes:
+        if data is None:
+            return b''
+        if isinstance(data, (bytes, bytearray, memoryview)):
+            return bytes(data)
+        return json.dumps(data).encode()
+
+class IgnoreClientContentNegotiation(BaseContentNegotiation):
+    """Always use the view's first renderer, whatever the client accepts.
+
+    For views that return raw responses (files, redirects), where the
+    ``Accept`` header of a media player should not cause a 406.
+    """
+
+    def select_parser(self, request, parsers):
+        return parsers[0]
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        return renderers[0], renderers[0].media_type
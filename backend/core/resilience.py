@@ -0,0 +1,229 @@
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from collections import deque
+from django.conf import settings
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+from weakref import WeakKeyDictionary
+import asyncio
+import threading
+import time
+import httpx
+import requests
+
+try:
+    from botocore.exceptions import HTTPClientError as BotocoreTransportError
+except ImportError:  # botocore is only installed for the S3 backend
+    BotocoreTransportError = None
+
+class StorageUnavailable(APIException):
+    """Raised when media storage is timing out, overloaded, or failing."""
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'Media storage is temporarily unavailable. Please try again shortly.'
+    default_code = 'storage_unavailable'
+
+class CircuitBreaker:
+    """Error-rate circuit breaker shared by all callers in a worker process.
+
+    The breaker is closed while the failure rate over the last ``window``
+    calls stays below ``failure_rate``. Once it is exceeded the breaker opens
+    and rejects calls for ``reset_timeout`` seconds, then lets a single trial
+    call through (half-open) to decide whether to close again.
+    """
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(
+        self,
+        name: str,
+        failure_rate: float = 0.5,
+        window: int = 20,
+        min_calls: int = 5,
+        reset_timeout: float = 30.0
+    ):
+        """Initialize a closed breaker."""
+        self.name = name
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.reset_timeout = reset_timeout
+        self._results: Deque[bool] = deque(maxlen=window)
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """Current breaker state."""
+        with self._lock:
+            return self._state
+
+    def allow_request(self) -> bool:
+        """Return whether a call may be attempted right now."""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    return False
+                self._state = self.HALF_OPEN
+                self._trial_in_flight = False
+            if self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
+
+    def record_success(self) -> None:
+        """Record a call that reached the service and succeeded."""
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._close()
+            else:
+                self._results.append(True)
+
+    def record_failure(self) -> None:
+        """Record a call that timed out or failed on the service side."""
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._open()
+                return
+            self._results.append(False)
+            failures = self._results.count(False)
+            if len(self._results) >= self.min_calls and failures / len(self._results) >= self.failure_rate:
+                self._open()
+
+    def _open(self) -> None:
+        self._state = self.OPEN
+        self._opened_at = time.monotonic()
+        self._trial_in_flight = False
+
+    def _close(self) -> None:
+        self._state = self.CLOSED
+        self._results.clear()
+        self._trial_in_flight = False
+
+class Bulkhead:
+    """Bounds concurrent calls to a dependency and runs them under a deadline.
+
+    Each admitted call runs on a dedicated worker thread so the caller can stop
+    waiting once its timeout passes. The permit is only returned when the call
+    really finishes, so calls that hang keep counting against the limit.
+    """
+
+    def __init__(self, max_concurrent: int, max_wait: float):
+        """Initialize the permit pool and its worker threads."""
+        self.max_wait = max_wait
+        self._permits = threading.BoundedSemaphore(max_concurrent)
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrent, thread_name_prefix='storage')
+
+    def run(self, func: Callable[..., Any], timeout: float, *args: Any, **kwargs: Any) -> Any:
+        """Run ``func`` if a permit is free within ``max_wait``.
+
+        Raises:
+            StorageUnavailable: If no permit is available or ``timeout`` expires
+        """
+        if not self._permits.acquire(timeout=self.max_wait):
+            raise StorageUnavailable('Too many concurrent media storage operations.')
+        try:
+            future = self._executor.submit(func, *args, **kwargs)
+        except BaseException:
+            self._permits.release()
+            raise
+        future.add_done_callback(lambda _: self._permits.release())
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            raise StorageUnavailable('Media storage did not respond in time.')
+
+class AsyncBulkhead:
+    """Asyncio counterpart of ``Bulkhead`` for one event loop.
+
+    A call that times out is cancelled, so unlike a thread it gives its
+    permit back straight away.
+    """
+
+    def __init__(self, max_concurrent: int, max_wait: float):
+        """Initialize the permit pool."""
+        self.max_wait = max_wait
+        self._permits = asyncio.Semaphore(max_concurrent)
+
+    async def run(self, call: Awaitable[Any], timeout: float) -> Any:
+        """Await ``call`` if a permit is free within ``max_wait``.
+
+        Raises:
+            StorageUnavailable: If no permit is available
+            TimeoutError: If ``timeout`` expires
+        """
+        try:
+            await asyncio.wait_for(self._permits.acquire(), self.max_wait)
+        except TimeoutError:
+            if asyncio.iscoroutine(call):
+                call.close()
+            raise StorageUnavailable('Too many concurrent media storage operations.')
+        try:
+            return await asyncio.wait_for(call, timeout)
+        finally:
+            self._permits.release()
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_bulkhead: Optional[Bulkhead] = None
+_async_bulkheads: "WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncBulkhead]" = WeakKeyDictionary()
+_registry_lock = threading.Lock()
+
+def get_circuit_breaker(name: str) -> CircuitBreaker:
+    """Return the process-wide breaker for ``name``, creating it from settings."""
+    with _registry_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = _breakers[name] = CircuitBreaker(name, **settings.STORAGE_CIRCUIT_BREAKER)
+        return breaker
+
+def get_bulkhead() -> Bulkhead:
+    """Return the process-wide storage bulkhead, creating it from settings."""
+    global _bulkhead
+    with _registry_lock:
+        if _bulkhead is None:
+            _bulkhead = Bulkhead(settings.STORAGE_MAX_CONCURRENCY, settings.STORAGE_BULKHEAD_WAIT)
+        return _bulkhead
+
+def get_async_bulkhead() -> AsyncBulkhead:
+    """Return the storage bulkhead of the running event loop, creating it from settings."""
+    loop = asyncio.get_running_loop()
+    bulkhead = _async_bulkheads.get(loop)
+    if bulkhead is None:
+        bulkhead = _async_bulkheads[loop] = AsyncBulkhead(
+            settings.STORAGE_MAX_CONCURRENCY, settings.STORAGE_BULKHEAD_WAIT
+        )
+    return bulkhead
+
+def is_service_failure(exc: BaseException) -> bool:
+    """Return whether an exception means the service itself is unhealthy.
+
+    Transport errors, timeouts and 5xx responses count against the breaker.
+    Client errors such as a missing object mean the service answered fine.
+    """
+    if isinstance(exc, (
+        StorageUnavailable,
+        TimeoutError,
+        ConnectionError,
+        httpx.TransportError,
+        requests.ConnectionError,
+        requests.Timeout,
+    )):
+        return True
+    if BotocoreTransportError is not None and isinstance(exc, BotocoreTransportError):
+        return True
+    status_code = getattr(exc, 'status_code', None)
+    response = getattr(exc, 'response', None)
+    if status_code is None and isinstance(response, dict):
+        # botocore ClientError
+        status_code = response.get('ResponseMetadata', {}).get('HTTPStatusCode')
+    elif status_code is None and response is not None:
+        status_code = getattr(response, 'status_code', None)
+    if status_code is None and exc.args and isinstance(exc.args[0], dict):
+        status_code = exc.args[0].get('statusCode')
+    try:
+        return int(status_code) >= 500
+    except (TypeError, ValueError):
+        return False
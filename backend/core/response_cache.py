@@ -0,0 +1,87 @@
+"""
+Versioned caching of list responses.
+
+Cached responses are keyed on the versions of the scopes they were built
+from, e.g. ``instructor:12``. Writes bump a scope's version instead of
+hunting down every cached page that might contain the changed row, so
+invalidation is a single cache increment and stale entries simply stop being
+read and expire.
+"""
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from rest_framework.response import Response
+from typing import List, Optional
+from urllib.parse import urlencode
+import hashlib
+import time
+
+def cache_is_shared() -> bool:
+    """Return whether every worker reads the same cache, as versioned invalidation requires.
+
+    A version bumped in one process is invisible to the others on a
+    per-process cache, so they would keep serving stale responses.
+    """
+    if settings.LIST_CACHE_ALLOW_LOCAL_MEMORY:
+        return True
+    return not isinstance(caches['default'], (LocMemCache, DummyCache))
+
+def _version_key(scope: str) -> str:
+    return f'content-version:{scope}'
+
+def _fresh_version() -> int:
+    # Unique even if a scope's version was evicted, so old entries never match again
+    return time.time_ns()
+
+def get_versions(scopes: List[str]) -> List[int]:
+    """Return the current version of each scope, starting any that are unset."""
+    keys = [_version_key(scope) for scope in scopes]
+    versions = cache.get_many(keys)
+    missing = {key: _fresh_version() for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, None)
+        versions.update(missing)
+    return [versions[key] for key in keys]
+
+def bump_version(scope: str) -> None:
+    """Invalidate every cached response built from ``scope``."""
+    try:
+        cache.incr(_version_key(scope))
+    except ValueError:
+        cache.set(_version_key(scope), _fresh_version(), None)
+
+class VersionedListCacheMixin:
+    """Serve ``list`` responses from the cache until one of their scopes changes.
+
+    Viewsets implement ``get_cache_scopes`` to name the scopes the requesting
+    user's list depends on, or return None to skip caching. Entries are
+    per user and per query string, and store serialized data, so content
+    negotiation still happens on every request. Nothing is cached unless the
+    cache is shared between workers.
+    """
+
+    def get_cache_scopes(self) -> Optional[List[str]]:
+        raise NotImplementedError
+
+    def get_list_cache_key(self, scopes: List[str]) -> str:
+        versions = '.'.join(str(version) for version in get_versions(scopes))
+        # Sorted so the same filters in a different order share an entry
+        params = hashlib.md5(
+            urlencode(sorted(self.request.query_params.lists()), doseq=True).encode(),
+            usedforsecurity=False
+        ).hexdigest()
+        return f'list:{self.basename}:{self.request.user.pk}:{params}:{versions}'
+
+    def list(self, request, *args, **kwargs):
+        scopes = self.get_cache_scopes() if cache_is_shared() else None
+        if not scopes:
+            return super().list(request, *args, **kwargs)
+        cache_key = self.get_list_cache_key(scopes)
+        data = cache.get(cache_key)
+        if data is not None:
+            return Response(data)
+        response = super().list(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(cache_key, response.data, settings.LIST_CACHE_TIMEOUT)
+        return response
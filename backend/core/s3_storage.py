@@ -0,0 +1,287 @@
+"""
+SupabaseStorage interface over any S3-compatible object store (AWS S3, MinIO,
+Cloudflare R2, ...).
+
+Select it with ``MEDIA_STORAGE_BACKEND = 'core.s3_storage.S3Storage'``. Calls
+go through the same timeouts, circuit breaker and concurrency limit as the
+Supabase client. Files larger than one part are sent as multipart uploads
+whose parts are transferred in parallel.
+"""
+from boto3.session import Session
+from botocore.config import Config
+from botocore.exceptions import ClientError
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+from core.metrics import observe_storage_bytes
+from core.storage import SupabaseStorage
+import os
+
+# S3 rejects multipart parts smaller than this, except for the last one
+MIN_PART_SIZE = 5 * 1024 * 1024
+
+# Most keys a single DeleteObjects request accepts
+MAX_DELETE_BATCH = 1000
+
+# Buckets already confirmed to exist by this worker process; kept apart from
+# the Supabase backend's, which may use the same bucket name
+_verified_buckets = set()
+
+def _is_missing(error: ClientError) -> bool:
+    return error.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NoSuchBucket', 'NotFound')
+
+class S3Storage(SupabaseStorage):
+    """Storage service backed by an S3-compatible bucket."""
+
+    def __init__(self, client: Optional[Any] = None):
+        """Initialize the S3 client from the ``AWS_*`` settings."""
+        self.client = client or Session().client(
+            's3',
+            endpoint_url=settings.AWS_S3_ENDPOINT_URL,
+            region_name=settings.AWS_S3_REGION_NAME,
+            aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+            aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+            config=Config(
+                signature_version='s3v4',
+                s3={'addressing_style': settings.AWS_S3_ADDRESSING_STYLE},
+                read_timeout=max(settings.STORAGE_TIMEOUTS.values()),
+                # A connection for every storage call the bulkhead lets through
+                max_pool_connections=max(10, settings.STORAGE_MAX_CONCURRENCY),
+                # Retry once; persistent failures are left to the circuit breaker
+                retries={'max_attempts': 2, 'mode': 'standard'}
+            )
+        )
+        self.bucket_name = settings.AWS_STORAGE_BUCKET_NAME
+        self.part_size = settings.S3_MULTIPART_PART_SIZE
+        self.max_concurrency = settings.S3_MULTIPART_CONCURRENCY
+        if self.part_size < MIN_PART_SIZE:
+            raise ImproperlyConfigured('S3_MULTIPART_PART_SIZE must be at least 5MB')
+        self._ensure_bucket_exists()
+
+    def _ensure_bucket_exists(self):
+        """Ensure the media bucket exists."""
+        if self.bucket_name in _verified_buckets:
+            return
+        try:
+            self._call('bucket', self.client.head_bucket, Bucket=self.bucket_name)
+        except ClientError as e:
+            if not _is_missing(e):
+                raise
+            self._call('bucket', self.client.create_bucket, Bucket=self.bucket_name)
+        _verified_buckets.add(self.bucket_name)
+
+    def put_file(self, file_path: str, file_data: Union[bytes, str], content_type: str, upsert: bool = False) -> None:
+        """Upload to an exact path in the bucket.
+
+        S3 always replaces existing objects; ``upsert`` is accepted for
+        compatibility, and generated paths are unique anyway.
+
+        Args:
+            file_path: Destination key in the bucket
+            file_data: The file data in bytes, or the path of a local file to stream
+            content_type: Content type stored with the object
+            upsert: Ignored, see above
+        """
+        size = os.path.getsize(file_data) if isinstance(file_data, str) else len(file_data)
+        if size <= self.part_size:
+            if isinstance(file_data, str):
+                with open(file_data, 'rb') as f:
+                    file_data = f.read()
+            self._call(
+                'upload',
+                self.client.put_object,
+                Bucket=self.bucket_name,
+                Key=file_path,
+                Body=file_data,
+                ContentType=content_type
+            )
+        else:
+            self._multipart_upload(file_path, file_data, size, content_type)
+        observe_storage_bytes('upload', self.bucket_name, size, 'out')
+
+    def _multipart_upload(self, file_path: str, file_data: Union[bytes, str], size: int, content_type: str) -> None:
+        """Upload a large file in parts, ``max_concurrency`` parts at a time.
+
+        Each part is read only when its transfer starts, so at most
+        ``max_concurrency`` parts are held in memory. The upload is aborted if
+        any part fails, so no orphaned parts are left behind.
+        """
+        upload_id = self._call(
+            'upload',
+            self.client.create_multipart_upload,
+            Bucket=self.bucket_name,
+            Key=file_path,
+            ContentType=content_type
+        )['UploadId']
+
+        def read_part(offset: int) -> bytes:
+            if not isinstance(file_data, str):
+                return memoryview(file_data)[offset:offset + self.part_size].tobytes()
+            # Separate handles let parts be read in parallel
+            with open(file_data, 'rb') as f:
+                f.seek(offset)
+                return f.read(self.part_size)
+
+        def upload_part(part_number: int) -> Dict[str, Any]:
+            response = self._call(
+                'upload_part',
+                self.client.upload_part,
+                Bucket=self.bucket_name,
+                Key=file_path,
+                UploadId=upload_id,
+                PartNumber=part_number,
+                Body=read_part((part_number - 1) * self.part_size)
+            )
+            return {'PartNumber': part_number, 'ETag': response['ETag']}
+
+        part_count = -(-size // self.part_size)
+        executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix='s3-part')
+        try:
+            try:
+                parts = list(executor.map(upload_part, range(1, part_count + 1)))
+            finally:
+                # After a failure, skip the parts that have not started
+                executor.shutdown(cancel_futures=True)
+            self._call(
+                'upload',
+                self.client.complete_multipart_upload,
+                Bucket=self.bucket_name,
+                Key=file_path,
+                UploadId=upload_id,
+                MultipartUpload={'Parts': parts}
+            )
+        except Exception:
+            try:
+                self.client.abort_multipart_upload(Bucket=self.bucket_name, Key=file_path, UploadId=upload_id)
+            except Exception as e:
+                print(f"Error aborting multipart upload of {file_path}: {str(e)}")
+            raise
+
+    def _sign(self, file_path: str, expires_in: int) -> str:
+        """Presign a download URL; signing happens locally without a request."""
+        return self.client.generate_presigned_url(
+            'get_object',
+            Params={'Bucket': self.bucket_name, 'Key': file_path},
+            ExpiresIn=expires_in
+        )
+
+    def _sign_many(self, file_paths: List[str], expires_in: int) -> List[Dict]:
+        """Presign download URLs for several files."""
+        return [
+            {'path': path, 'signedURL': self._sign(path, expires_in), 'error': None}
+            for path in file_paths
+        ]
+
+    def _sign_upload(self, file_path: str, policy: Dict) -> str:
+        """Presign a PUT URL the client uploads the file to directly."""
+        return self.client.generate_presigned_url(
+            'put_object',
+            Params={'Bucket': self.bucket_name, 'Key': file_path, 'ContentType': policy['content_type']},
+            ExpiresIn=settings.UPLOAD_POLICY_EXPIRATION
+        )
+
+    def delete_file(self, file_path: str) -> bool:
+        """Delete a file from the bucket."""
+        return self.delete_files([file_path])
+
+    def delete_files(self, file_paths: Iterable[str]) -> bool:
+        """Delete files from the bucket, up to 1000 per request."""
+        file_paths = list(file_paths)
+        try:
+            for start in range(0, len(file_paths), MAX_DELETE_BATCH):
+                response = self._call(
+                    'delete',
+                    self.client.delete_objects,
+                    Bucket=self.bucket_name,
+                    Delete={
+                        'Objects': [{'Key': path} for path in file_paths[start:start + MAX_DELETE_BATCH]],
+                        'Quiet': True
+                    }
+                )
+                if response.get('Errors'):
+                    print(f"Error deleting {len(response['Errors'])} files: {response['Errors'][0].get('Message')}")
+                    return False
+            return True
+        except Exception as e:
+            print(f"Error deleting {len(file_paths)} files: {str(e)}")
+            return False
+
+    def list_files(self, prefix: str, limit: int = 100, offset: int = 0) -> List[Dict]:
+        """List one page of entries directly under a prefix, shaped like Supabase's.
+
+        S3 has no offsets, so the listing is read up to ``offset + limit``
+        entries. Folder entries are returned with ``id`` set to ``None``.
+        """
+        prefix = f"{prefix.strip('/')}/" if prefix.strip('/') else ''
+        entries: List[Dict] = []
+        request = {'Bucket': self.bucket_name, 'Prefix': prefix, 'Delimiter': '/'}
+        while True:
+            page = self._call('list', self.client.list_objects_v2, **request)
+            for folder in page.get('CommonPrefixes', []):
+                entries.append({'name': folder['Prefix'][len(prefix):].rstrip('/'), 'id': None})
+            for obj in page.get('Contents', []):
+                entries.append({
+                    'name': obj['Key'][len(prefix):],
+                    'id': obj['Key'],
+                    'created_at': obj['LastModified'].isoformat(),
+                    'metadata': {'size': obj['Size'], 'eTag': obj['ETag']},
+                })
+            if len(entries) >= offset + limit or not page.get('IsTruncated'):
+                break
+            request['ContinuationToken'] = page['NextContinuationToken']
+        entries.sort(key=lambda entry: entry['name'])
+        return entries[offset:offset + limit]
+
+    def _head(self, file_path: str) -> Optional[Dict]:
+        """Return an object's S3 metadata, or None if it does not exist."""
+        try:
+            return self._call('default', self.client.head_object, Bucket=self.bucket_name, Key=file_path)
+        except ClientError as e:
+            if _is_missing(e):
+                return None
+            raise
+
+    def get_file_metadata(self, file_path: str) -> Optional[Dict]:
+        """Get metadata for a file."""
+        try:
+            head = self._head(file_path)
+        except Exception as e:
+            print(f"Error getting file metadata for {file_path}: {str(e)}")
+            return None
+        if head is None:
+            return None
+        return {
+            'url': self.get_signed_url(file_path),
+            'path': file_path,
+            'size': head['ContentLength'],
+            'content_type': head.get('ContentType'),
+        }
+
+    def verify_upload(
+        self,
+        upload_id: str,
+        file_path: str,
+        instructor_id: int
+    ) -> Tuple[bool, Optional[Dict]]:
+        """Verify that a direct upload reached the bucket and get its metadata."""
+        if not file_path.startswith(f"{instructor_id}/"):
+            return False, None
+        try:
+            head = self._head(file_path)
+            if head is None:
+                return False, None
+            thumbnail_url = None
+            if file_path.split('/')[1] in ['image', 'video']:
+                thumbnail_url = self._generate_thumbnail_url(file_path)
+            return True, {
+                'file_path': file_path,
+                'size': head['ContentLength'],
+                'url': self._get_signed_url(file_path),
+                'thumbnail_url': thumbnail_url,
+                'upload_id': upload_id,
+                'verified_at': head['LastModified'].isoformat()
+            }
+        except Exception as e:
+            print(f"Error verifying upload {upload_id}: {str(e)}")
+            return False, None
@@ -58,6 +58,7 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "core.middleware.ServerTimingMiddleware",
 ]
 
 ROOT_URLCONF = "core.urls"
@@ -89,6 +90,20 @@ DATABASES = {
 }
 
 
+# Cache
+# Versioned list caching and content ETags need a cache every worker shares;
+# set REDIS_URL in production. The local-memory fallback is per process.
+
+REDIS_URL = os.getenv("REDIS_URL", "")
+CACHES = {
+    "default": (
+        {"BACKEND": "django.core.cache.backends.redis.RedisCache", "LOCATION": REDIS_URL}
+        if REDIS_URL
+        else {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    )
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -142,7 +157,7 @@ SUPABASE_KEY = os.environ.get('SUPABASE_KEY', '')
 SUPABASE_SERVICE_KEY = os.getenv("SUPABASE_SERVICE_KEY", "")
 
 # Media Storage Settings
-MEDIA_STORAGE_BACKEND = 'core.storage.SupabaseStorage'
+MEDIA_STORAGE_BACKEND = os.getenv('MEDIA_STORAGE_BACKEND', 'core.storage.SupabaseStorage')
 MEDIA_ASSET_TYPES = {
     'image': ['image/jpeg', 'image/png', 'image/gif', 'image/webp'],
     'video': ['video/mp4', 'video/webm', 'video/quicktime'],
@@ -161,6 +176,66 @@ MAX_FILE_SIZES = {
 # Signed URL expiration time (in seconds)
 SIGNED_URL_EXPIRATION = 3600  # 1 hour
 
+# Total bytes of media each instructor may keep in storage
+INSTRUCTOR_STORAGE_QUOTA = 5 * 1024 * 1024 * 1024  # 5GB
+
+# S3-compatible storage, used when MEDIA_STORAGE_BACKEND is
+# 'core.s3_storage.S3Storage'. Names follow django-storages.
+AWS_STORAGE_BUCKET_NAME = os.getenv("AWS_STORAGE_BUCKET_NAME", "media-assets")
+AWS_S3_ENDPOINT_URL = os.getenv("AWS_S3_ENDPOINT_URL") or None  # e.g. a MinIO URL; None for AWS
+AWS_S3_REGION_NAME = os.getenv("AWS_S3_REGION_NAME", "us-east-1")
+AWS_S3_ADDRESSING_STYLE = os.getenv("AWS_S3_ADDRESSING_STYLE", "path")
+AWS_ACCESS_KEY_ID = os.getenv("AWS_ACCESS_KEY_ID") or None  # None uses boto3's credential chain
+AWS_SECRET_ACCESS_KEY = os.getenv("AWS_SECRET_ACCESS_KEY") or None
+
+# Multipart uploads: files above one part are split into parts of this size
+# (S3 requires at least 5MB) and this many parts are sent at once
+S3_MULTIPART_PART_SIZE = int(os.getenv("S3_MULTIPART_PART_SIZE", str(8 * 1024 * 1024)))
+S3_MULTIPART_CONCURRENCY = int(os.getenv("S3_MULTIPART_CONCURRENCY", "4"))
+
+# Storage resilience: per-operation timeouts (in seconds), circuit breaker
+# thresholds, and the number of concurrent storage calls per worker process
+STORAGE_TIMEOUTS = {
+    'default': 10,
+    'bucket': 5,
+    'upload': 120,
+    'sign': 3,
+    'list': 10,
+    'delete': 10,
+    'download': 30,
+    'upload_part': 60,
+}
+STORAGE_CIRCUIT_BREAKER = {
+    'failure_rate': 0.5,  # Open when half of the recent calls failed
+    'window': 20,  # Number of recent calls considered
+    'min_calls': 5,  # Calls needed before the rate is trusted
+    'reset_timeout': 30,  # Seconds to fail fast before a trial call
+}
+STORAGE_MAX_CONCURRENCY = int(os.getenv("STORAGE_MAX_CONCURRENCY", "8"))
+STORAGE_BULKHEAD_WAIT = 0.5  # Seconds to wait for a free slot before failing
+STORAGE_ASYNC_MAX_CONNECTIONS = int(os.getenv("STORAGE_ASYNC_MAX_CONNECTIONS", "50"))
+STORAGE_ASYNC_CONCURRENCY = 16  # Concurrent requests per asyncio.gather batch
+
+# Shared secret a metrics scraper sends in the X-Metrics-Token header
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
+# Direct upload policy expiration time (in seconds)
+UPLOAD_POLICY_EXPIRATION = 3600  # 1 hour
+
+# Days to keep completed or failed UploadProgress rows
+UPLOAD_PROGRESS_RETENTION_DAYS = int(os.getenv("UPLOAD_PROGRESS_RETENTION_DAYS", "30"))
+
+# Waveform peak payload caching (in seconds); payloads only change when recomputed
+WAVEFORM_CACHE_TIMEOUT = 60 * 60 * 24  # 1 day
+
+# Cached content list responses (in seconds); writes invalidate them by
+# version, so this only bounds how long unread entries linger
+LIST_CACHE_TIMEOUT = 60 * 60  # 1 hour
+
+# Cache content lists even on a local-memory cache, which is only safe with a
+# single worker process, e.g. runserver or tests
+LIST_CACHE_ALLOW_LOCAL_MEMORY = os.getenv("LIST_CACHE_ALLOW_LOCAL_MEMORY", "False") == "True"
+
 # Django REST Framework settings
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
@@ -171,4 +246,19 @@ REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticatedOrReadOnly",
     ],
+    "DEFAULT_PAGINATION_CLASS": "core.pagination.CreatedCursorPagination",
+    "DEFAULT_RENDERER_CLASSES": [
+        "core.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "core.parsers.ORJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
 }
+
+# Rows per page of list endpoints; clients may ask for up to the maximum
+# with ?page_size=
+API_PAGE_SIZE = 50
+API_MAX_PAGE_SIZE = 200
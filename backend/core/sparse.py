@@ -0,0 +1,85 @@
+"""
+Sparse fieldsets and opt-in expansion of nested relations.
+
+``?fields=id,name`` limits a response to the named fields, and
+``?expand=exercises.media_assets`` includes nested relations that a
+serializer lists in ``Meta.expandable_fields``, which are left out
+otherwise. Dotted paths reach into nested serializers, so
+``?expand=exercises&fields=id,exercises.name`` returns routine IDs with the
+names of their exercises. Viewsets use the same paths to decide which
+relations to prefetch (see ``core.prefetch``).
+"""
+from rest_framework.permissions import SAFE_METHODS
+from typing import Dict, List, Optional, Tuple
+
+FieldTree = Dict[str, 'FieldTree']
+
+def parse_paths(value: str) -> FieldTree:
+    """Parse comma-separated dotted paths into a tree of field names."""
+    tree: FieldTree = {}
+    for path in value.split(','):
+        node = tree
+        for name in filter(None, (part.strip() for part in path.split('.'))):
+            node = node.setdefault(name, {})
+    return tree
+
+def requested_trees(request) -> Tuple[Optional[FieldTree], FieldTree]:
+    """Return the ``fields`` tree, or None for all fields, and the ``expand`` tree of a request."""
+    if request is None:
+        return None, {}
+    fields = request.query_params.get('fields')
+    return (parse_paths(fields) if fields else None), parse_paths(request.query_params.get('expand', ''))
+
+def _flatten(expand: FieldTree, fields: Optional[FieldTree], prefix: str) -> List[str]:
+    paths = []
+    for name, children in expand.items():
+        if fields is not None and name not in fields:
+            continue
+        path = f'{prefix}{name}'
+        paths.append(path)
+        paths.extend(_flatten(children, (fields or {}).get(name) or None, f'{path}.'))
+    return paths
+
+def expanded_paths(request) -> List[str]:
+    """Return the dotted relation paths a request expands, parents before children.
+
+    Expansions whose field is excluded by ``fields`` are dropped.
+    """
+    fields, expand = requested_trees(request)
+    return _flatten(expand, fields, '')
+
+class SparseFieldsMixin:
+    """Serializer mixin honouring ``?fields=`` and ``?expand=`` on reads.
+
+    The outermost serializer reads both from the request in its context and
+    hands each nested serializer its part of the trees. Writes keep every
+    field, so neither parameter can drop input a serializer validates.
+    """
+    _sparse_configured = False
+
+    def configure_sparse(self, fields: Optional[FieldTree], expand: FieldTree) -> None:
+        self._requested_fields = fields
+        self._expand = expand
+        self._sparse_configured = True
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if not self._sparse_configured:
+            request = self.context.get('request')
+            if request is not None and request.method not in SAFE_METHODS:
+                return fields
+            self.configure_sparse(*requested_trees(request))
+        expandable = getattr(self.Meta, 'expandable_fields', ())
+        for name in list(fields):
+            if (name in expandable and name not in self._expand) or (
+                self._requested_fields is not None and name not in self._requested_fields
+            ):
+                del fields[name]
+                continue
+            nested = getattr(fields[name], 'child', fields[name])
+            if isinstance(nested, SparseFieldsMixin):
+                nested.configure_sparse(
+                    (self._requested_fields or {}).get(name) or None,
+                    self._expand.get(name, {})
+                )
+        return fields
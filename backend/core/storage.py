@@ -1,43 +1,99 @@
 from supabase import create_client, Client
+from supabase.lib.client_options import ClientOptions
 from django.conf import settings
-from typing import Optional, Tuple, Dict, List
+from django.core.cache import cache
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from typing import Any, BinaryIO, Callable, Optional, Tuple, Dict, List, Iterable, Union
+from core.resilience import StorageUnavailable, get_bulkhead, get_circuit_breaker, is_service_failure
+from core.images import image_placeholder
+from core.metrics import observe_storage_bytes, observe_storage_call
 import os
 import mimetypes
 from datetime import datetime, timedelta
+import hashlib
 import json
+import time
 import uuid
+import requests
+
+# Buckets already confirmed to exist by this worker process
+_verified_buckets = set()
+
+def signed_url_cache_key(bucket_name: str, file_path: str, expires_in: int) -> str:
+    """Return the cache key of a file's signed URL, shared by the sync and async clients."""
+    return f'storage:signed:{bucket_name}:{hashlib.md5(file_path.encode()).hexdigest()}:{expires_in}'
 
 class SupabaseStorage:
     """Service for handling file operations with Supabase Storage."""
     
-    def __init__(self):
+    def __init__(self, client: Optional[Client] = None):
         """Initialize Supabase client."""
-        self.client: Client = create_client(
+        self.client: Client = client or create_client(
             settings.SUPABASE_URL,
-            settings.SUPABASE_KEY
+            settings.SUPABASE_KEY,
+            options=ClientOptions(storage_client_timeout=max(settings.STORAGE_TIMEOUTS.values()))
         )
         self.bucket_name = 'media-assets'
         self._ensure_bucket_exists()
     
     def _ensure_bucket_exists(self):
         """Ensure the media assets bucket exists."""
+        if self.bucket_name in _verified_buckets:
+            return
         try:
-            self.client.storage.get_bucket(self.bucket_name)
+            self._call('bucket', self.client.storage.get_bucket, self.bucket_name)
+        except StorageUnavailable:
+            # Leave the check for a later instance once storage recovers
+            return
         except Exception:
             # Create bucket if it doesn't exist
-            self.client.storage.create_bucket(
+            self._call(
+                'bucket',
+                self.client.storage.create_bucket,
                 self.bucket_name,
                 {'public': False}  # Private bucket for security
             )
+        _verified_buckets.add(self.bucket_name)
     
-    def _generate_file_path(self, file_name: str, instructor_id: int, asset_type: str) -> str:
+    def _call(self, operation: str, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run a storage request under the operation's timeout, the bucket's
+        circuit breaker and the per-worker concurrency limit.
+        
+        Raises:
+            StorageUnavailable: If the breaker is open, the worker is at its
+                concurrency limit, or the request times out
+        """
+        breaker = get_circuit_breaker(f'storage:{self.bucket_name}')
+        if not breaker.allow_request():
+            observe_storage_call(operation, self.bucket_name, 'rejected', 0.0)
+            raise StorageUnavailable()
+        
+        timeout = settings.STORAGE_TIMEOUTS.get(operation, settings.STORAGE_TIMEOUTS['default'])
+        started = time.perf_counter()
+        try:
+            result = get_bulkhead().run(func, timeout, *args, **kwargs)
+        except Exception as e:
+            observe_storage_call(operation, self.bucket_name, 'error', time.perf_counter() - started)
+            if is_service_failure(e):
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+            raise
+        observe_storage_call(operation, self.bucket_name, 'ok', time.perf_counter() - started)
+        breaker.record_success()
+        return result
+    
+    @staticmethod
+    def _generate_file_path(file_name: str, instructor_id: int, asset_type: str) -> str:
         """Generate a unique file path for storage."""
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         # Sanitize filename and create path: instructor_id/asset_type/timestamp_filename
         safe_filename = ''.join(c for c in file_name if c.isalnum() or c in '._- ')
         return f"{instructor_id}/{asset_type}/{timestamp}_{safe_filename}"
     
-    def _get_content_type(self, file_name: str) -> str:
+    @staticmethod
+    def _get_content_type(file_name: str) -> str:
         """Get the content type of a file."""
         content_type, _ = mimetypes.guess_type(file_name)
         return content_type or 'application/octet-stream'
@@ -66,11 +122,7 @@ class SupabaseStorage:
         content_type = content_type or self._get_content_type(file_name)
         
         # Upload file
-        self.client.storage.from_(self.bucket_name).upload(
-            file_path,
-            file_data,
-            {'content-type': content_type}
-        )
+        self.put_file(file_path, file_data, content_type)
         
         # Generate signed URL for temporary access
         signed_url = self._get_signed_url(file_path)
@@ -84,6 +136,8 @@ class SupabaseStorage:
             'file_name': file_name,
             'content_type': content_type,
             'file_size': len(file_data),
+            'content_hash': hashlib.sha256(file_data).hexdigest(),
+            'blurhash': image_placeholder(file_data) if asset_type == 'image' else None,
             'url': signed_url,
             'thumbnail_url': thumbnail_url,
             'path': file_path
@@ -91,13 +145,172 @@ class SupabaseStorage:
         
         return file_path, metadata
     
+    def put_file(self, file_path: str, file_data: Union[bytes, str], content_type: str, upsert: bool = False) -> None:
+        """Upload to an exact path in storage.
+        
+        Args:
+            file_path: Destination path in the bucket
+            file_data: The file data in bytes, or the path of a local file to stream
+            content_type: Content type stored with the object
+            upsert: Whether to overwrite an existing object at the path
+        """
+        self._call(
+            'upload',
+            self.client.storage.from_(self.bucket_name).upload,
+            file_path,
+            file_data,
+            {'content-type': content_type, 'x-upsert': 'true' if upsert else 'false'}
+        )
+        size = os.path.getsize(file_data) if isinstance(file_data, str) else len(file_data)
+        observe_storage_bytes('upload', self.bucket_name, size, 'out')
+    
+    def get_signed_url(self, file_path: str, expires_in: int = 3600) -> str:
+        """Return a signed URL for a file as a string."""
+        return self._get_signed_url(file_path, expires_in)
+    
     def _get_signed_url(self, file_path: str, expires_in: int = 3600) -> str:
-        """Generate a signed URL for temporary file access."""
-        return self.client.storage.from_(self.bucket_name).create_signed_url(
+        """Generate a signed URL for temporary file access.
+        
+        Signed URLs are cached and reused for the first half of their
+        lifetime. If storage is unavailable, a cached URL that has not yet
+        expired is served instead of failing.
+        """
+        cache_key = signed_url_cache_key(self.bucket_name, file_path, expires_in)
+        cached = cache.get(cache_key)
+        if cached and cached['fresh_until'] > time.time():
+            return cached['url']
+        
+        try:
+            signed_url = self._sign(file_path, expires_in)
+        except Exception as e:
+            if cached and is_service_failure(e):
+                return cached['url']
+            raise
+        
+        # Stop serving the URL a little before storage stops honouring it
+        margin = min(60, expires_in // 10)
+        cache.set(
+            cache_key,
+            {'url': signed_url, 'fresh_until': time.time() + expires_in / 2},
+            expires_in - margin
+        )
+        return signed_url
+    
+    def get_signed_urls(self, file_paths: Iterable[str], expires_in: int = 3600) -> Dict[str, Optional[str]]:
+        """Return signed URLs for many files, signing uncached ones in one request.
+
+        Shares the cache of ``get_signed_url``. Paths storage refuses to sign
+        map to ``None``.
+        """
+        path_keys = {path: signed_url_cache_key(self.bucket_name, path, expires_in) for path in file_paths}
+        cached = cache.get_many(path_keys.values())
+        urls: Dict[str, Optional[str]] = {}
+        stale: Dict[str, str] = {}
+        for path, key in path_keys.items():
+            entry = cached.get(key)
+            if entry and entry['fresh_until'] > time.time():
+                urls[path] = entry['url']
+            elif entry:
+                stale[path] = entry['url']
+
+        to_sign = [path for path in path_keys if path not in urls]
+        if not to_sign:
+            return urls
+        try:
+            signed = self._sign_many(to_sign, expires_in)
+        except Exception as e:
+            if is_service_failure(e):
+                return {**urls, **{path: stale.get(path) for path in to_sign}}
+            raise
+
+        margin = min(60, expires_in // 10)
+        fresh = {}
+        for item in signed:
+            if item.get('error') or not item.get('signedURL'):
+                continue
+            urls[item['path']] = item['signedURL']
+            fresh[path_keys[item['path']]] = {'url': item['signedURL'], 'fresh_until': time.time() + expires_in / 2}
+        cache.set_many(fresh, expires_in - margin)
+        return {path: urls.get(path) for path in path_keys}
+
+    def _sign(self, file_path: str, expires_in: int) -> str:
+        """Ask storage to sign a download URL for one file."""
+        # Always a string, so the cache shared with get_signed_urls holds URLs only
+        return self._signed_url_string(self._call(
+            'sign',
+            self.client.storage.from_(self.bucket_name).create_signed_url,
             file_path,
             expires_in
+        ))
+    
+    def _sign_many(self, file_paths: List[str], expires_in: int) -> List[Dict]:
+        """Ask storage to sign download URLs for several files.
+        
+        Returns:
+            One ``{'path', 'signedURL', 'error'}`` dictionary per file
+        """
+        return self._call(
+            'sign',
+            self.client.storage.from_(self.bucket_name).create_signed_urls,
+            file_paths,
+            expires_in
         )
     
+    @staticmethod
+    def _signed_url_string(signed: Any) -> str:
+        """Extract the URL from a ``create_signed_url`` result."""
+        if isinstance(signed, dict):
+            return signed.get('signedURL') or signed.get('signedUrl')
+        return signed
+    
+    def open_download(self, file_path: str, byte_range: Optional[str] = None) -> requests.Response:
+        """Open a streaming download of a file through a signed URL.
+        
+        Args:
+            file_path: The file path in storage
+            byte_range: Optional HTTP ``Range`` header value, e.g. ``"bytes=0-1023"``
+            
+        Returns:
+            The streaming response; the caller must close it
+        """
+        url = self.get_signed_url(file_path)
+        headers = {'Range': byte_range} if byte_range else {}
+        timeout = settings.STORAGE_TIMEOUTS.get('download', settings.STORAGE_TIMEOUTS['default'])
+        
+        def request() -> requests.Response:
+            response = requests.get(url, headers=headers, stream=True, timeout=timeout)
+            try:
+                response.raise_for_status()
+            except requests.HTTPError:
+                response.close()
+                raise
+            return response
+        
+        return self._call('download', request)
+    
+    def iter_download(
+        self,
+        file_path: str,
+        chunk_size: int = 1024 * 1024,
+        byte_range: Optional[str] = None
+    ) -> Iterable[bytes]:
+        """Yield a file's content in chunks without holding it all in memory."""
+        response = self.open_download(file_path, byte_range)
+        try:
+            for chunk in response.iter_content(chunk_size):
+                observe_storage_bytes('download', self.bucket_name, len(chunk), 'in')
+                yield chunk
+        finally:
+            response.close()
+    
+    def download_to(self, file_path: str, fileobj: BinaryIO, chunk_size: int = 1024 * 1024) -> int:
+        """Stream a file into ``fileobj`` and return the number of bytes written."""
+        size = 0
+        for chunk in self.iter_download(file_path, chunk_size):
+            fileobj.write(chunk)
+            size += len(chunk)
+        return size
+    
     def _generate_thumbnail_url(self, file_path: str) -> Optional[str]:
         """Generate a thumbnail URL for images and videos.
         This is a placeholder - implement actual thumbnail generation
@@ -109,12 +322,49 @@ class SupabaseStorage:
     def delete_file(self, file_path: str) -> bool:
         """Delete a file from Supabase Storage."""
         try:
-            self.client.storage.from_(self.bucket_name).remove([file_path])
+            self._call('delete', self.client.storage.from_(self.bucket_name).remove, [file_path])
             return True
         except Exception as e:
             print(f"Error deleting file {file_path}: {str(e)}")
             return False
     
+    def delete_files(self, file_paths: Iterable[str]) -> bool:
+        """Delete a batch of files from Supabase Storage in a single request."""
+        file_paths = list(file_paths)
+        if not file_paths:
+            return True
+        try:
+            self._call('delete', self.client.storage.from_(self.bucket_name).remove, file_paths)
+            return True
+        except Exception as e:
+            print(f"Error deleting {len(file_paths)} files: {str(e)}")
+            return False
+    
+    def list_files(self, prefix: str, limit: int = 100, offset: int = 0) -> List[Dict]:
+        """List one page of raw storage entries directly under a prefix.
+        
+        Entries are sorted by name so consecutive pages are stable. Folder
+        entries are returned with ``id`` set to ``None``.
+        
+        Args:
+            prefix: Folder prefix to list, e.g. ``"12/video/"``
+            limit: Maximum number of entries in the page
+            offset: Number of entries to skip
+            
+        Returns:
+            List of entry dictionaries as returned by Supabase
+        """
+        return self._call(
+            'list',
+            self.client.storage.from_(self.bucket_name).list,
+            prefix.rstrip('/'),
+            {
+                'limit': limit,
+                'offset': offset,
+                'sortBy': {'column': 'name', 'order': 'asc'},
+            }
+        )
+    
     def get_file_metadata(self, file_path: str) -> Optional[Dict]:
         """Get metadata for a file."""
         try:
@@ -175,23 +425,26 @@ class SupabaseStorage:
             'file_path': file_path,
             'content_type': content_type,
             'max_size_bytes': max_size_bytes or settings.MAX_FILE_SIZES.get(asset_type),
-            'expires_at': (datetime.now() + timedelta(hours=1)).isoformat(),
+            'expires_at': (timezone.now() + timedelta(seconds=settings.UPLOAD_POLICY_EXPIRATION)).isoformat(),
             'bucket': self.bucket_name,
             'asset_type': asset_type,
             'instructor_id': instructor_id
         }
         
-        # Sign the policy with Supabase
-        signed_policy = self.client.storage.from_(self.bucket_name).create_signed_upload_url(
-            file_path,
-            policy['expires_at']
-        )
-        
         # Add signed URL to policy
-        policy['signed_url'] = signed_policy
+        policy['signed_url'] = self._sign_upload(file_path, policy)
         
         return policy
     
+    def _sign_upload(self, file_path: str, policy: Dict) -> Any:
+        """Sign the URL a client uploads a file to directly."""
+        return self._call(
+            'sign',
+            self.client.storage.from_(self.bucket_name).create_signed_upload_url,
+            file_path,
+            policy['expires_at']
+        )
+    
     def verify_upload(
         self,
         upload_id: str,
@@ -213,8 +466,17 @@ class SupabaseStorage:
             if not file_path.startswith(f"{instructor_id}/"):
                 return False, None
             
-            # Get file metadata
-            file_info = self.client.storage.from_(self.bucket_name).get_public_url(file_path)
+            # Find the object to confirm it exists and read its size
+            folder, name = file_path.rsplit('/', 1)
+            entries = self._call(
+                'list',
+                self.client.storage.from_(self.bucket_name).list,
+                folder,
+                {'limit': 100, 'search': name}
+            )
+            entry = next((entry for entry in entries if entry.get('name') == name), None)
+            if entry is None:
+                return False, None
             
             # Generate signed URL
             signed_url = self._get_signed_url(file_path)
@@ -226,6 +488,7 @@ class SupabaseStorage:
             
             metadata = {
                 'file_path': file_path,
+                'size': (entry.get('metadata') or {}).get('size', 0),
                 'url': signed_url,
                 'thumbnail_url': thumbnail_url,
                 'upload_id': upload_id,
@@ -263,15 +526,13 @@ class SupabaseStorage:
                 prefix = f"{prefix}{asset_type}/"
             
             # List files
-            files = self.client.storage.from_(self.bucket_name).list(
-                prefix,
-                limit=limit,
-                offset=offset
-            )
+            files = self.list_files(prefix, limit=limit, offset=offset)
             
             # Get metadata for each file
             results = []
             for file_info in files:
+                if file_info.get('id') is None:
+                    continue
                 file_path = f"{prefix}{file_info['name']}"
                 signed_url = self._get_signed_url(file_path)
                 
@@ -331,4 +592,7 @@ class SupabaseStorage:
                 print(f"Error deleting file {file_path}: {str(e)}")
                 results['failed'].append(file_path)
         
-        return results 
\ No newline at end of file
+        return results 
+def get_storage() -> SupabaseStorage:
+    """Return a client for the storage backend named by ``MEDIA_STORAGE_BACKEND``."""
+    return import_string(settings.MEDIA_STORAGE_BACKEND)()
@@ -3,7 +3,7 @@ from .models import (
     Routine, Exercise, ClientInstructorRelationship,
     BreathingExercise, MeditationSession, CombinedRoutine,
     MediaAsset, ExerciseProgress, Achievement, ClientAchievement,
-    UploadProgress
+    UploadProgress, StorageUsage, ClientFeedItem
 )
 
 @admin.register(Routine)
@@ -44,10 +44,23 @@ class CombinedRoutineAdmin(admin.ModelAdmin):
 
 @admin.register(MediaAsset)
 class MediaAssetAdmin(admin.ModelAdmin):
-    list_display = ("name", "asset_type", "file_size", "is_active", "created_at")
-    search_fields = ("name",)
+    list_display = ("name", "asset_type", "instructor", "file_size", "is_active", "created_at")
+    search_fields = ("name", "instructor__email")
     list_filter = ("asset_type", "is_active")
 
+@admin.register(StorageUsage)
+class StorageUsageAdmin(admin.ModelAdmin):
+    list_display = ("instructor", "asset_type", "asset_count", "total_bytes", "updated_at")
+    search_fields = ("instructor__email",)
+    list_filter = ("asset_type",)
+    ordering = ("-total_bytes",)
+
+@admin.register(ClientFeedItem)
+class ClientFeedItemAdmin(admin.ModelAdmin):
+    list_display = ("client", "content_type", "object_id", "created_at")
+    search_fields = ("client__email",)
+    list_filter = ("content_type",)
+
 @admin.register(ExerciseProgress)
 class ExerciseProgressAdmin(admin.ModelAdmin):
     list_display = ("client", "exercise", "breathing_exercise", "meditation_session", "completed_at", "duration_seconds")
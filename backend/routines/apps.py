@@ -2,4 +2,7 @@ from django.apps import AppConfig
 
 class RoutinesConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
-    name = "routines" 
\ No newline at end of file
+    name = "routines"
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,213 @@
+"""Async versions of the storage-bound media actions, for serving under ASGI.
+
+These are plain Django async views rather than DRF viewset actions, since DRF
+views run synchronously. Authentication reuses the Supabase JWT backend.
+"""
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpRequest, JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_http_methods
+from rest_framework import exceptions, status
+from functools import wraps
+from typing import Any, Awaitable, Callable, Optional
+from core.async_storage import AsyncSupabaseStorage
+from core.resilience import StorageUnavailable
+from users.authentication import SupabaseJWTAuthentication
+from users.models import UserProfile
+from .media import delete_assets, find_references, is_referenced
+from .models import MediaAsset
+from .usage import remaining_quota
+import json
+
+AsyncView = Callable[..., Awaitable[JsonResponse]]
+
+async def _authenticate(request: HttpRequest) -> Optional[UserProfile]:
+    """Return the profile for the request's bearer token, if it is valid."""
+    try:
+        result = await sync_to_async(SupabaseJWTAuthentication().authenticate)(request)
+    except exceptions.AuthenticationFailed:
+        return None
+    return result[0] if result else None
+
+def instructor_required(view: AsyncView) -> AsyncView:
+    """Authenticate the request and only let instructors and admins through."""
+    @wraps(view)
+    async def wrapper(request: HttpRequest, *args: Any, **kwargs: Any) -> JsonResponse:
+        user = await _authenticate(request)
+        if user is None:
+            return JsonResponse(
+                {'error': 'Authentication credentials were not provided or are invalid'},
+                status=status.HTTP_401_UNAUTHORIZED
+            )
+        if user.role not in ['instructor', 'admin']:
+            return JsonResponse(
+                {'error': 'Only instructors can manage media'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        request.user = user
+        try:
+            return await view(request, *args, **kwargs)
+        except StorageUnavailable as e:
+            return JsonResponse({'error': str(e.detail)}, status=e.status_code)
+    return wrapper
+
+@csrf_exempt
+@require_http_methods(['GET'])
+@instructor_required
+async def list_uploads(request: HttpRequest) -> JsonResponse:
+    """List the instructor's uploaded files with signed URLs."""
+    try:
+        limit = min(int(request.GET.get('limit', 100)), 1000)
+        offset = int(request.GET.get('offset', 0))
+    except ValueError:
+        return JsonResponse(
+            {'error': 'limit and offset must be integers'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    storage = AsyncSupabaseStorage()
+    uploads = await storage.list_uploads(
+        instructor_id=request.user.id,
+        asset_type=request.GET.get('asset_type'),
+        limit=limit,
+        offset=offset
+    )
+    return JsonResponse(uploads, safe=False)
+
+@csrf_exempt
+@require_http_methods(['POST'])
+@instructor_required
+async def signed_urls(request: HttpRequest) -> JsonResponse:
+    """Sign URLs for a batch of media assets concurrently.
+
+    Expected payload: ``{"asset_ids": [1, 2, 3]}``
+    """
+    try:
+        asset_ids = [int(asset_id) for asset_id in json.loads(request.body).get('asset_ids', [])]
+    except (ValueError, TypeError, AttributeError):
+        return JsonResponse(
+            {'error': 'asset_ids must be a list of integers'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    paths = {
+        asset_id: path
+        async for asset_id, path in MediaAsset.objects.filter(
+            id__in=asset_ids,
+            instructor=request.user,
+            is_active=True,
+            supabase_path__isnull=False
+        ).values_list('id', 'supabase_path')
+    }
+    urls = await AsyncSupabaseStorage().get_signed_urls(paths.values(), expires_in=settings.SIGNED_URL_EXPIRATION)
+    return JsonResponse({str(asset_id): urls[path] for asset_id, path in paths.items()})
+
+@csrf_exempt
+@require_http_methods(['POST'])
+@instructor_required
+async def upload(request: HttpRequest) -> JsonResponse:
+    """Upload a file and create its MediaAsset."""
+    file_obj = request.FILES.get('file')
+    if not file_obj:
+        return JsonResponse({'error': 'No file provided'}, status=status.HTTP_400_BAD_REQUEST)
+
+    asset_type = next(
+        (
+            type_name for type_name, allowed_types in settings.MEDIA_ASSET_TYPES.items()
+            if file_obj.content_type in allowed_types
+        ),
+        None
+    )
+    if not asset_type:
+        return JsonResponse(
+            {'error': f'Unsupported file type: {file_obj.content_type}'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    max_size = settings.MAX_FILE_SIZES.get(asset_type)
+    if max_size and file_obj.size > max_size:
+        return JsonResponse(
+            {'error': f'File size exceeds maximum allowed size for {asset_type}'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    if file_obj.size > await sync_to_async(remaining_quota)(request.user):
+        return JsonResponse({'error': 'Storage quota exceeded'}, status=status.HTTP_403_FORBIDDEN)
+
+    storage = AsyncSupabaseStorage()
+    metadata = await storage.upload_file(
+        file_data=file_obj.read(),
+        file_name=file_obj.name,
+        instructor_id=request.user.id,
+        asset_type=asset_type,
+        content_type=file_obj.content_type
+    )
+    asset = await MediaAsset.objects.acreate(
+        name=file_obj.name,
+        asset_type=asset_type,
+        instructor=request.user,
+        file_size=metadata['file_size'],
+        content_hash=metadata['content_hash'],
+        blurhash=metadata['blurhash'] or '',
+        supabase_path=metadata['path'],
+        supabase_bucket=storage.bucket_name
+    )
+    return JsonResponse(
+        {
+            'id': asset.id,
+            'name': asset.name,
+            'asset_type': asset.asset_type,
+            'file_size': asset.file_size,
+            'blurhash': asset.blurhash,
+            'url': metadata['url'],
+            'created_at': asset.created_at.isoformat()
+        },
+        status=status.HTTP_201_CREATED
+    )
+
+@csrf_exempt
+@require_http_methods(['POST'])
+@instructor_required
+async def delete_uploads(request: HttpRequest) -> JsonResponse:
+    """Delete several of the instructor's files in one storage request.
+
+    Like ``MediaAssetViewSet.bulk_delete``, nothing is deleted while an asset
+    stored at one of the paths is in use, unless ``force`` is set. Assets are
+    kept when their files cannot be deleted.
+
+    Expected payload: ``{"file_paths": ["12/image/..."], "force": false}``
+    """
+    try:
+        payload = json.loads(request.body)
+        file_paths = list(payload.get('file_paths', []))
+    except (ValueError, TypeError, AttributeError):
+        return JsonResponse(
+            {'error': 'file_paths must be a list'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    owned = [path for path in file_paths if isinstance(path, str) and path.startswith(f'{request.user.id}/')]
+    rejected = [path for path in file_paths if path not in owned]
+
+    assets = MediaAsset.objects.filter(supabase_path__in=owned)
+    asset_paths = {pk: path async for pk, path in assets.values_list('pk', 'supabase_path')}
+    references = await sync_to_async(find_references)(list(asset_paths))
+    in_use = {asset_id: refs for asset_id, refs in references.items() if is_referenced(refs)}
+    force = payload.get('force')
+    if in_use and force is not True and force not in ('1', 'true'):
+        return JsonResponse(
+            {'error': 'Some media assets are still in use', 'in_use': in_use},
+            status=status.HTTP_409_CONFLICT
+        )
+
+    deleted, failed = await sync_to_async(delete_assets)(assets.filter(pk__in=list(asset_paths)))
+    # Files without an asset are not referenced by anything
+    unlinked = [path for path in owned if path not in asset_paths.values()]
+    if unlinked and not await AsyncSupabaseStorage().delete_files(unlinked):
+        rejected += unlinked
+        unlinked = []
+    return JsonResponse({
+        'successful': [asset_paths[pk] for pk in deleted] + unlinked,
+        'failed': [asset_paths[pk] for pk in failed] + rejected
+    })
@@ -0,0 +1,408 @@
+"""
+Audio decoding, waveform peak extraction and cue synthesis for audio media.
+
+PCM WAV files are decoded with the standard library and NumPy. Other formats
+are decoded with ``soundfile`` when it is installed.
+"""
+from typing import BinaryIO, Iterator, List, Optional, Tuple
+import math
+import struct
+import wave
+import numpy as np
+
+try:
+    import soundfile as sf
+except ImportError:
+    sf = None
+
+WAVEFORM_MAGIC = b'AOYW'
+WAVEFORM_VERSION = 1
+
+# Peak counts per resolution level, finest first; each level is 4x coarser
+PEAK_LEVELS = (4096, 1024, 256)
+
+# magic, version, level count, sample rate, frames per peak at the finest level
+_HEADER = struct.Struct('<4sBBII')
+_LEVEL_HEADER = struct.Struct('<I')
+
+# Frames decoded per block, which bounds memory use for long recordings
+BLOCK_FRAMES = 1 << 16
+
+Peaks = Tuple[np.ndarray, np.ndarray]
+
+class UnsupportedAudioFormat(ValueError):
+    """Raised when an audio file cannot be decoded in this environment."""
+
+class DecodedAudio:
+    """Stream of float32 sample blocks in ``[-1, 1]``, shaped ``(frames, channels)``."""
+
+    def __init__(self, sample_rate: int, channels: int, frames: int, blocks: Iterator[np.ndarray]):
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.frames = frames
+        self.blocks = blocks
+
+class Waveform:
+    """Multi-resolution min/max peaks of an audio file."""
+
+    def __init__(self, sample_rate: int, channels: int, frames: int, samples_per_peak: int, levels: List[Peaks]):
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.frames = frames
+        self.samples_per_peak = samples_per_peak
+        self.levels = levels
+
+    @property
+    def duration_seconds(self) -> float:
+        return self.frames / self.sample_rate if self.sample_rate else 0.0
+
+def _pcm_to_float(data: bytes, sample_width: int, channels: int) -> np.ndarray:
+    """Convert little-endian integer PCM to float32 samples."""
+    if sample_width == 1:
+        samples = (np.frombuffer(data, dtype=np.uint8).astype(np.float32) - 128) / 128
+    elif sample_width == 2:
+        samples = np.frombuffer(data, dtype='<i2').astype(np.float32) / 32768
+    elif sample_width == 3:
+        raw = np.frombuffer(data, dtype=np.uint8).reshape(-1, 3)
+        padded = np.zeros((len(raw), 4), dtype=np.uint8)
+        padded[:, 1:] = raw
+        # Shifting back down sign-extends the 24-bit value
+        samples = (padded.view('<i4').ravel() >> 8).astype(np.float32) / (1 << 23)
+    elif sample_width == 4:
+        samples = np.frombuffer(data, dtype='<i4').astype(np.float32) / (1 << 31)
+    else:
+        raise UnsupportedAudioFormat(f"Unsupported WAV sample width: {sample_width} bytes")
+    return samples.reshape(-1, channels)
+
+def _decode_wav(fileobj: BinaryIO) -> Optional[DecodedAudio]:
+    """Decode an integer PCM WAV file, or return None if it is not one."""
+    try:
+        reader = wave.open(fileobj, 'rb')
+    except (wave.Error, EOFError):
+        fileobj.seek(0)
+        return None
+
+    channels = reader.getnchannels()
+    sample_width = reader.getsampwidth()
+    if sample_width not in (1, 2, 3, 4):
+        raise UnsupportedAudioFormat(f"Unsupported WAV sample width: {sample_width} bytes")
+
+    def blocks() -> Iterator[np.ndarray]:
+        with reader:
+            while True:
+                data = reader.readframes(BLOCK_FRAMES)
+                if not data:
+                    return
+                yield _pcm_to_float(data, sample_width, channels)
+
+    return DecodedAudio(reader.getframerate(), channels, reader.getnframes(), blocks())
+
+def _decode_soundfile(fileobj: BinaryIO) -> DecodedAudio:
+    """Decode any format supported by libsndfile."""
+    try:
+        sound = sf.SoundFile(fileobj)
+    except RuntimeError as e:
+        raise UnsupportedAudioFormat(str(e))
+
+    def blocks() -> Iterator[np.ndarray]:
+        with sound:
+            for block in sound.blocks(blocksize=BLOCK_FRAMES, dtype='float32', always_2d=True):
+                yield block
+
+    return DecodedAudio(sound.samplerate, sound.channels, sound.frames, blocks())
+
+def decode_audio(fileobj: BinaryIO) -> DecodedAudio:
+    """Open a seekable audio file for block-wise decoding.
+
+    Raises:
+        UnsupportedAudioFormat: If no available decoder understands the file
+    """
+    decoded = _decode_wav(fileobj)
+    if decoded is not None:
+        return decoded
+    if sf is None:
+        raise UnsupportedAudioFormat("Only PCM WAV audio can be decoded without soundfile installed")
+    return _decode_soundfile(fileobj)
+
+def _downsample(peaks: Peaks, factor: int) -> Peaks:
+    """Merge every ``factor`` neighbouring peaks into one."""
+    mins, maxs = peaks
+    if not len(mins):
+        return peaks
+    starts = np.arange(0, len(mins), factor)
+    return np.minimum.reduceat(mins, starts), np.maximum.reduceat(maxs, starts)
+
+def compute_waveform(fileobj: BinaryIO, levels: Tuple[int, ...] = PEAK_LEVELS) -> Waveform:
+    """Compute min/max peaks at each resolution in ``levels`` without loading the whole file.
+
+    The finest level has at most ``levels[0]`` peaks, each covering the same
+    number of frames across all channels. Coarser levels are derived from it.
+    """
+    audio = decode_audio(fileobj)
+    samples_per_peak = max(1, math.ceil(audio.frames / levels[0]))
+    mins: List[np.ndarray] = []
+    maxs: List[np.ndarray] = []
+    carry = np.empty((0, audio.channels), dtype=np.float32)
+
+    for block in audio.blocks:
+        if len(carry):
+            block = np.concatenate([carry, block])
+        usable = len(block) - len(block) % samples_per_peak
+        carry = block[usable:]
+        if usable:
+            frames = block[:usable].reshape(-1, samples_per_peak * audio.channels)
+            mins.append(frames.min(axis=1))
+            maxs.append(frames.max(axis=1))
+    if len(carry):
+        mins.append(np.array([carry.min()]))
+        maxs.append(np.array([carry.max()]))
+
+    finest = (
+        np.concatenate(mins) if mins else np.empty(0, dtype=np.float32),
+        np.concatenate(maxs) if maxs else np.empty(0, dtype=np.float32),
+    )
+    peaks = [finest]
+    for previous, count in zip(levels, levels[1:]):
+        peaks.append(_downsample(peaks[-1], previous // count))
+
+    return Waveform(audio.sample_rate, audio.channels, audio.frames, samples_per_peak, peaks)
+
+def _quantize(values: np.ndarray) -> np.ndarray:
+    return np.clip(np.round(values * 127), -127, 127).astype(np.int8)
+
+def encode_waveform(waveform: Waveform) -> bytes:
+    """Serialize peaks into the compact binary sidecar format.
+
+    A header is followed by one block per level, finest first: a ``uint32``
+    peak count, then ``int8`` min/max pairs scaled to ``[-127, 127]``.
+    """
+    parts = [_HEADER.pack(
+        WAVEFORM_MAGIC,
+        WAVEFORM_VERSION,
+        len(waveform.levels),
+        waveform.sample_rate,
+        waveform.samples_per_peak
+    )]
+    for mins, maxs in waveform.levels:
+        parts.append(_LEVEL_HEADER.pack(len(mins)))
+        parts.append(np.column_stack([_quantize(mins), _quantize(maxs)]).tobytes())
+    return b''.join(parts)
+
+def decode_waveform(payload: bytes) -> Tuple[int, int, List[np.ndarray]]:
+    """Parse a sidecar into ``(sample_rate, samples_per_peak, levels)``.
+
+    Each level is an ``int8`` array of shape ``(peaks, 2)`` holding min and max.
+    """
+    magic, version, level_count, sample_rate, samples_per_peak = _HEADER.unpack_from(payload)
+    if magic != WAVEFORM_MAGIC or version != WAVEFORM_VERSION:
+        raise ValueError("Not a waveform payload")
+
+    offset = _HEADER.size
+    levels = []
+    for _ in range(level_count):
+        (count,) = _LEVEL_HEADER.unpack_from(payload, offset)
+        offset += _LEVEL_HEADER.size
+        levels.append(np.frombuffer(payload, dtype=np.int8, count=count * 2, offset=offset).reshape(count, 2))
+        offset += count * 2
+    return sample_rate, samples_per_peak, levels
+
+# Breath cue synthesis
+
+CUE_SAMPLE_RATE = 22050
+
+# Tone pitch in Hz at the start of each breath phase
+CUE_PITCHES = {'inhale': 528.0, 'hold': 440.0, 'exhale': 396.0}
+
+# Per cue style: partial frequency ratios, partial amplitudes, decay time
+# constant and tone length in seconds
+CUE_STYLES = {
+    'minimal': ((1.0,), (1.0,), 0.12, 0.4),
+    'guided': ((1.0, 2.0, 3.0), (1.0, 0.5, 0.25), 0.35, 1.2),
+    # Inharmonic partials give a singing bowl character
+    'nature': ((1.0, 2.76, 5.4), (1.0, 0.6, 0.3), 0.8, 2.5),
+}
+
+def synthesize_cue(pitch: float, style: str, sample_rate: int = CUE_SAMPLE_RATE) -> np.ndarray:
+    """Synthesize one decaying cue tone as float32 samples."""
+    ratios, amplitudes, decay, length = CUE_STYLES[style]
+    t = np.arange(int(length * sample_rate), dtype=np.float32) / sample_rate
+    partials = np.sin(2 * np.pi * pitch * np.outer(ratios, t)) * np.asarray(amplitudes, dtype=np.float32)[:, None]
+    tone = partials.sum(axis=0) * np.exp(-t / decay)
+    # A short attack ramp avoids an audible click at the onset
+    attack = min(len(tone), int(0.005 * sample_rate))
+    tone[:attack] *= np.linspace(0, 1, attack, dtype=np.float32)
+    return (0.8 * tone / np.abs(tone).max()).astype(np.float32)
+
+def render_breathing_cycle(
+    inhale: int,
+    hold: int,
+    exhale: int,
+    style: str = 'minimal',
+    sample_rate: int = CUE_SAMPLE_RATE
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Render one breath cycle with a cue at the start of every phase.
+
+    Returns ``(first, steady)``: the first cycle, and the cycle as heard once
+    the previous cycle's ringing tones carry over into it.
+    """
+    cycle_length = (inhale + hold + exhale) * sample_rate
+    track = np.zeros(2 * cycle_length, dtype=np.float32)
+    onset = 0
+    for phase, seconds in (('inhale', inhale), ('hold', hold), ('exhale', exhale)):
+        if seconds:
+            # Tones never ring longer than a cycle, so they only spill into the next one
+            tone = synthesize_cue(CUE_PITCHES[phase], style, sample_rate)[:cycle_length]
+            track[onset:onset + len(tone)] += tone
+        onset += seconds * sample_rate
+
+    first, carry = track[:cycle_length], track[cycle_length:]
+    return np.clip(first, -1, 1), np.clip(first + carry, -1, 1)
+
+def encode_pcm16(samples: np.ndarray) -> bytes:
+    """Convert float samples in ``[-1, 1]`` to little-endian 16-bit PCM."""
+    return (np.clip(samples, -1, 1) * 32767).astype('<i2').tobytes()
+
+def write_breathing_cues(
+    fileobj: BinaryIO,
+    inhale: int,
+    hold: int,
+    exhale: int,
+    cycles: int,
+    style: str = 'minimal',
+    sample_rate: int = CUE_SAMPLE_RATE
+) -> float:
+    """Write a mono 16-bit WAV cue track for a breathing pattern.
+
+    Only one cycle is rendered and then repeated, so memory use does not
+    grow with the number of cycles. Returns the duration in seconds.
+    """
+    if inhale + hold + exhale <= 0 or cycles <= 0:
+        raise ValueError("Breathing pattern must have a positive duration")
+    first, steady = render_breathing_cycle(inhale, hold, exhale, style, sample_rate)
+    steady_frames = encode_pcm16(steady)
+
+    with wave.open(fileobj, 'wb') as writer:
+        writer.setnchannels(1)
+        writer.setsampwidth(2)
+        writer.setframerate(sample_rate)
+        writer.writeframes(encode_pcm16(first))
+        for _ in range(cycles - 1):
+            writer.writeframes(steady_frames)
+    return len(first) * cycles / sample_rate
+
+# Meditation mixing
+
+# Background level under the voice, and while the voice is silent
+DUCKED_GAIN = 10 ** (-15 / 20)
+BACKGROUND_GAIN = 10 ** (-6 / 20)
+
+# Voice level (RMS) above which the background is ducked
+VOICE_THRESHOLD = 0.02
+
+# Ducking is decided per window; attack and release are smoothing factors per window
+DUCK_WINDOW_SECONDS = 0.05
+DUCK_ATTACK = 0.5
+DUCK_RELEASE = 0.05
+
+def _convert_channels(block: np.ndarray, channels: int) -> np.ndarray:
+    """Down- or up-mix a ``(frames, channels)`` block."""
+    if block.shape[1] == channels:
+        return block
+    mono = block.mean(axis=1, keepdims=True)
+    return np.repeat(mono, channels, axis=1)
+
+class _BlockReader:
+    """Reads exactly sized blocks from an iterator of variable-sized blocks."""
+
+    def __init__(self, blocks: Iterator[np.ndarray], channels: int):
+        self.blocks = blocks
+        self.channels = channels
+        self._buffer = np.empty((0, channels), dtype=np.float32)
+
+    def read(self, frames: int) -> np.ndarray:
+        """Return up to ``frames`` frames; fewer only once the source is exhausted."""
+        parts = [self._buffer]
+        available = len(self._buffer)
+        while available < frames:
+            block = next(self.blocks, None)
+            if block is None:
+                break
+            block = _convert_channels(block, self.channels)
+            parts.append(block)
+            available += len(block)
+        data = np.concatenate(parts)
+        self._buffer = data[frames:]
+        return data[:frames]
+
+def _looped_blocks(fileobj: BinaryIO) -> Iterator[np.ndarray]:
+    """Decode a file over and over, for backgrounds shorter than the voice."""
+    while True:
+        fileobj.seek(0)
+        audio = decode_audio(fileobj)
+        if not audio.frames:
+            return
+        yield from audio.blocks
+
+def _duck_gains(voice: np.ndarray, window: int, gain: float) -> np.ndarray:
+    """Per-window background gains for a voice block, smoothed from ``gain``."""
+    windows = math.ceil(len(voice) / window)
+    padded = np.zeros((windows * window, voice.shape[1]), dtype=np.float32)
+    padded[:len(voice)] = voice
+    rms = np.sqrt(np.mean(padded.reshape(windows, -1) ** 2, axis=1))
+    targets = np.where(rms > VOICE_THRESHOLD, DUCKED_GAIN, 1.0)
+
+    gains = np.empty(windows, dtype=np.float32)
+    for i, target in enumerate(targets):
+        gain += (target - gain) * (DUCK_ATTACK if target < gain else DUCK_RELEASE)
+        gains[i] = gain
+    return gains
+
+def write_meditation_mix(fileobj: BinaryIO, voice_file: BinaryIO, background_file: BinaryIO) -> float:
+    """Mix a guided voice over a background track into a 16-bit WAV.
+
+    The background is looped to the voice's length and ducked while the voice
+    is speaking. Both inputs are streamed in blocks, so memory use does not
+    depend on their length. Returns the duration in seconds.
+
+    Raises:
+        UnsupportedAudioFormat: If an input cannot be decoded or the sample rates differ
+    """
+    voice = decode_audio(voice_file)
+    background = decode_audio(background_file)
+    sample_rate = voice.sample_rate
+    channels = min(2, max(voice.channels, background.channels))
+    if background.sample_rate != sample_rate:
+        raise UnsupportedAudioFormat(
+            f"Background sample rate {background.sample_rate} Hz does not match the voice ({sample_rate} Hz)"
+        )
+
+    voice_reader = _BlockReader(voice.blocks, channels)
+    background_reader = _BlockReader(_looped_blocks(background_file), channels)
+    window = max(1, int(sample_rate * DUCK_WINDOW_SECONDS))
+    block_frames = window * max(1, BLOCK_FRAMES // window)
+    gain = 1.0
+
+    with wave.open(fileobj, 'wb') as writer:
+        writer.setnchannels(channels)
+        writer.setsampwidth(2)
+        writer.setframerate(sample_rate)
+        while True:
+            voice_block = voice_reader.read(block_frames)
+            if not len(voice_block):
+                break
+            background_block = background_reader.read(len(voice_block))
+            if len(background_block) < len(voice_block):
+                background_block = np.concatenate([
+                    background_block,
+                    np.zeros((len(voice_block) - len(background_block), channels), dtype=np.float32)
+                ])
+
+            gains = _duck_gains(voice_block, window, gain)
+            # Interpolate between window gains, starting from the previous block's last gain
+            positions = np.concatenate([[0], (np.arange(len(gains)) + 1) * window - 1])
+            sample_gains = np.interp(np.arange(len(voice_block)), positions, np.concatenate([[gain], gains]))
+            gain = float(gains[-1])
+
+            mixed = voice_block + background_block * (BACKGROUND_GAIN * sample_gains)[:, None]
+            writer.writeframes(encode_pcm16(mixed))
+    return voice.frames / sample_rate if sample_rate else 0.0
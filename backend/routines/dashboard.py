@@ -0,0 +1,84 @@
+"""
+Everything the client app's home screen shows, in one payload.
+
+Content comes from the client's feed and every section is a single
+``values()`` query, so the whole dashboard costs a fixed number of queries
+however much the client has been assigned or practised.
+"""
+from django.db.models import Avg, Count, F, Q, QuerySet, Sum
+from typing import Any, Dict, List
+from users.models import UserProfile
+from .feed import visible_ids
+from .models import (
+    BreathingExercise, ClientAchievement, ClientInstructorRelationship, CombinedRoutine,
+    ExerciseProgress, MeditationSession, Routine
+)
+
+def progress_stats(progress: QuerySet) -> Dict[str, Any]:
+    """Return practice totals over a progress queryset in one query."""
+    totals = progress.aggregate(
+        total_exercises=Count('id'),
+        total_duration=Sum('duration_seconds'),
+        average_difficulty=Avg('difficulty_rating'),
+        exercise=Count('id', filter=Q(exercise__isnull=False)),
+        breathing=Count('id', filter=Q(breathing_exercise__isnull=False)),
+        meditation=Count('id', filter=Q(meditation_session__isnull=False)),
+    )
+    return {
+        'total_exercises': totals['total_exercises'],
+        'total_duration': totals['total_duration'] or 0,
+        'average_difficulty': totals['average_difficulty'] or 0,
+        'by_type': {key: totals[key] for key in ('exercise', 'breathing', 'meditation')},
+    }
+
+def build_dashboard(client: UserProfile) -> Dict[str, Any]:
+    """Return a client's instructors, practice content, stats and achievements."""
+    relationships: List[Dict[str, Any]] = list(
+        ClientInstructorRelationship.objects.filter(client=client)
+        .values('id', 'instructor_id', 'instructor__email')
+    )
+
+    dashboard: Dict[str, Any] = {
+        'instructors': [
+            {'id': relationship['instructor_id'], 'email': relationship['instructor__email']}
+            for relationship in relationships
+        ],
+        'routines': [],
+        'breathing_exercises': [],
+        'meditation_sessions': [],
+        'combined_routines': [],
+    }
+    if relationships:
+        dashboard['routines'] = list(
+            Routine.objects.filter(id__in=visible_ids(client, 'routine'))
+            .annotate(exercise_count=Count('exercises'))
+            .order_by('-created_at', '-id')
+            .values('id', 'name', 'description', 'instructor_id', 'exercise_count', 'updated_at')
+        )
+        dashboard['breathing_exercises'] = list(
+            BreathingExercise.objects.filter(id__in=visible_ids(client, 'breathing'))
+            .values(
+                'id', 'name', 'instructor_id', 'pattern_type', 'inhale_duration', 'hold_duration',
+                'exhale_duration', 'cycles', 'difficulty_level', 'updated_at'
+            )
+        )
+        dashboard['meditation_sessions'] = list(
+            MeditationSession.objects.filter(id__in=visible_ids(client, 'meditation'))
+            .values('id', 'name', 'instructor_id', 'session_type', 'duration_minutes', 'difficulty_level', 'updated_at')
+        )
+        dashboard['combined_routines'] = list(
+            CombinedRoutine.objects.filter(id__in=visible_ids(client, 'combined'))
+            .order_by('-created_at', '-id')
+            .values('id', 'name', 'description', 'instructor_id', 'updated_at')
+        )
+
+    dashboard['stats'] = progress_stats(ExerciseProgress.objects.filter(client=client))
+    dashboard['achievements'] = list(
+        ClientAchievement.objects.filter(client=client)
+        .order_by('-earned_at', '-id')
+        .values(
+            'id', 'achievement_id', 'earned_at',
+            name=F('achievement__name'), icon_url=F('achievement__icon_url')
+        )
+    )
+    return dashboard
@@ -0,0 +1,206 @@
+"""
+Streaming ZIP export of a combined routine and its media for offline practice.
+
+The archive is produced incrementally: each media file is copied from local
+media or storage in chunks and every chunk is handed to the response as soon
+as it is written, so neither the archive nor a whole file is ever buffered.
+"""
+from django.db.models import Prefetch
+from django.utils import timezone
+from typing import Any, Dict, Iterator, List, Optional
+from core.storage import SupabaseStorage, get_storage
+from .models import CombinedRoutine, Exercise, MediaAsset
+import json
+import os
+import zipfile
+
+MANIFEST_VERSION = 1
+
+CHUNK_SIZE = 1024 * 1024
+
+class _StreamSink:
+    """Unseekable file object collecting what ``zipfile`` writes until drained."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+def load_combined_routine(combined_routine_id: int) -> CombinedRoutine:
+    """Load a combined routine with everything the export needs in a fixed number of queries."""
+    return CombinedRoutine.objects.prefetch_related(
+        Prefetch(
+            'routines__exercises',
+            queryset=Exercise.objects.order_by('order').prefetch_related('media_assets')
+        ),
+        'breathing_exercises__media_assets',
+        'meditation_sessions__guided_audio',
+        'meditation_sessions__background_audio',
+    ).get(pk=combined_routine_id)
+
+def _media_ids(assets) -> List[int]:
+    return [asset.id for asset in assets if asset.is_active]
+
+def build_manifest(combined: CombinedRoutine) -> Dict[str, Any]:
+    """Describe a prefetched combined routine, referring to media by asset ID."""
+    return {
+        'version': MANIFEST_VERSION,
+        'exported_at': timezone.now().isoformat(),
+        'combined_routine': {
+            'id': combined.id,
+            'name': combined.name,
+            'description': combined.description,
+            'transition_notes': combined.transition_notes,
+        },
+        'routines': [
+            {
+                'id': routine.id,
+                'name': routine.name,
+                'description': routine.description,
+                'exercises': [
+                    {
+                        'id': exercise.id,
+                        'name': exercise.name,
+                        'instructions': exercise.instructions,
+                        'order': exercise.order,
+                        'media': _media_ids(exercise.media_assets.all()),
+                    }
+                    for exercise in routine.exercises.all()
+                ],
+            }
+            for routine in combined.routines.all()
+        ],
+        'breathing_exercises': [
+            {
+                'id': exercise.id,
+                'name': exercise.name,
+                'description': exercise.description,
+                'inhale_duration': exercise.inhale_duration,
+                'hold_duration': exercise.hold_duration,
+                'exhale_duration': exercise.exhale_duration,
+                'cycles': exercise.cycles,
+                'pattern_type': exercise.pattern_type,
+                'has_visual_cue': exercise.has_visual_cue,
+                'has_audio_cue': exercise.has_audio_cue,
+                'cue_style': exercise.cue_style,
+                'difficulty_level': exercise.difficulty_level,
+                'media': _media_ids(exercise.media_assets.all()),
+            }
+            for exercise in combined.breathing_exercises.all()
+        ],
+        'meditation_sessions': [
+            {
+                'id': session.id,
+                'name': session.name,
+                'description': session.description,
+                'duration_minutes': session.duration_minutes,
+                'session_type': session.session_type,
+                'guided_script': session.guided_script,
+                'focus_points': session.focus_points,
+                'ambient_sound_type': session.ambient_sound_type,
+                'difficulty_level': session.difficulty_level,
+                'guided_audio': session.guided_audio_id,
+                'background_audio': session.background_audio_id,
+            }
+            for session in combined.meditation_sessions.all()
+        ],
+    }
+
+def collect_assets(combined: CombinedRoutine) -> List[MediaAsset]:
+    """Return every active asset a prefetched combined routine refers to, once each."""
+    assets: Dict[int, MediaAsset] = {}
+    for routine in combined.routines.all():
+        for exercise in routine.exercises.all():
+            assets.update((asset.id, asset) for asset in exercise.media_assets.all())
+    for exercise in combined.breathing_exercises.all():
+        assets.update((asset.id, asset) for asset in exercise.media_assets.all())
+    for session in combined.meditation_sessions.all():
+        for asset in (session.guided_audio, session.background_audio):
+            if asset is not None:
+                assets[asset.id] = asset
+    return [asset for _, asset in sorted(assets.items()) if asset.is_active]
+
+def _archive_name(asset: MediaAsset) -> str:
+    source = asset.file.name if asset.file else asset.supabase_path
+    return f'media/{asset.id}/{os.path.basename(source)}'
+
+def _open_chunks(asset: MediaAsset, storage: SupabaseStorage) -> Iterator[bytes]:
+    """Start reading an asset, failing before any of it is archived if it is unavailable."""
+    if asset.file:
+        fileobj = asset.file.open('rb')
+
+        def local_chunks() -> Iterator[bytes]:
+            with fileobj:
+                yield from iter(lambda: fileobj.read(CHUNK_SIZE), b'')
+        return local_chunks()
+
+    response = storage.open_download(asset.supabase_path)
+
+    def remote_chunks() -> Iterator[bytes]:
+        with response:
+            yield from response.iter_content(CHUNK_SIZE)
+    return remote_chunks()
+
+def iter_bundle(combined: CombinedRoutine, storage: Optional[SupabaseStorage] = None) -> Iterator[bytes]:
+    """Yield a ZIP archive of a prefetched combined routine's media and manifest.
+
+    Media are stored uncompressed, since audio, video and images are already
+    compressed. The manifest comes last so it only lists files that made it
+    into the archive; assets that could not be read are listed as missing.
+    """
+    return (chunk for chunk in _write_bundle(combined, storage) if chunk)
+
+def _write_bundle(combined: CombinedRoutine, storage: Optional[SupabaseStorage]) -> Iterator[bytes]:
+    manifest = build_manifest(combined)
+    media: List[Dict[str, Any]] = []
+    missing: List[int] = []
+    sink = _StreamSink()
+
+    with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_STORED) as archive:
+        for asset in collect_assets(combined):
+            if not asset.file and not asset.supabase_path:
+                missing.append(asset.id)
+                continue
+            if not asset.file and storage is None:
+                storage = get_storage()
+            try:
+                chunks = _open_chunks(asset, storage)
+            except Exception as e:
+                print(f"Skipping asset {asset.id} in export: {str(e)}")
+                missing.append(asset.id)
+                continue
+
+            name = _archive_name(asset)
+            info = zipfile.ZipInfo(name, date_time=timezone.localtime(asset.created_at).timetuple()[:6])
+            with archive.open(info, 'w') as entry:
+                for chunk in chunks:
+                    entry.write(chunk)
+                    yield sink.drain()
+            yield sink.drain()
+
+            media.append({
+                'id': asset.id,
+                'name': asset.name,
+                'asset_type': asset.asset_type,
+                'path': name,
+                'file_size': asset.file_size,
+                'duration_seconds': asset.duration_seconds,
+                'content_hash': asset.content_hash,
+            })
+
+        manifest['media'] = media
+        manifest['missing_media'] = missing
+        archive.writestr('manifest.json', json.dumps(manifest, indent=2), compress_type=zipfile.ZIP_DEFLATED)
+        yield sink.drain()
+    # Closing the archive writes the central directory
+    yield sink.drain()
@@ -0,0 +1,122 @@
+"""
+Per-client feed of visible content, maintained incrementally.
+
+A client sees the active routines assigned to them and the active breathing
+exercises, meditation sessions and combined routines of their instructors.
+Rather than resolving that through relationships on every request, each
+visible item is stored as a ``ClientFeedItem`` row. Signals resync the
+affected client or item whenever assignments, relationships or activation
+change, and client list queries read the feed by index.
+"""
+from django.db import transaction
+from django.db.models import Model, QuerySet
+from typing import Dict, Iterable, Optional, Set, Tuple
+from users.models import UserProfile
+from .models import (
+    BreathingExercise, ClientFeedItem, ClientInstructorRelationship, CombinedRoutine,
+    MeditationSession, Routine
+)
+
+# Content kinds every client sees from all of their instructors
+INSTRUCTOR_CONTENT = {
+    'breathing': BreathingExercise,
+    'meditation': MeditationSession,
+    'combined': CombinedRoutine,
+}
+
+FEED_MODELS = {'routine': Routine, **INSTRUCTOR_CONTENT}
+
+FeedKey = Tuple[int, str, int]
+
+def content_type_of(model) -> Optional[str]:
+    """Return the feed content type of a content model, or None if it has none."""
+    for content_type, feed_model in FEED_MODELS.items():
+        if model is feed_model:
+            return content_type
+    return None
+
+def visible_ids(client: UserProfile, content_type: str) -> QuerySet:
+    """Return the IDs of a kind of content a client can see, for use as a subquery."""
+    return ClientFeedItem.objects.filter(client=client, content_type=content_type).values('object_id')
+
+def _visible(relationships: QuerySet) -> Set[FeedKey]:
+    """Return what the clients of ``relationships`` should see, in one query per content kind."""
+    assignments = ClientInstructorRelationship.routines.through.objects.filter(
+        clientinstructorrelationship__in=relationships,
+        routine__is_active=True
+    ).values_list('clientinstructorrelationship__client_id', 'routine_id')
+    visible = {(client_id, 'routine', routine_id) for client_id, routine_id in assignments}
+    for content_type, model in INSTRUCTOR_CONTENT.items():
+        rows = model.objects.filter(
+            instructor__instructor_relationships__in=relationships,
+            is_active=True
+        ).values_list('instructor__instructor_relationships__client_id', 'pk')
+        visible.update((client_id, content_type, object_id) for client_id, object_id in rows)
+    return visible
+
+def _apply(items: QuerySet, visible: Set[FeedKey], add: bool = True) -> int:
+    """Make the feed rows in ``items`` match ``visible``, returning the rows changed."""
+    current: Dict[FeedKey, int] = {
+        (client_id, content_type, object_id): pk
+        for pk, client_id, content_type, object_id in items.values_list(
+            'pk', 'client_id', 'content_type', 'object_id'
+        )
+    }
+    stale = [pk for key, pk in current.items() if key not in visible]
+    missing = [key for key in visible if key not in current] if add else []
+    with transaction.atomic():
+        if stale:
+            ClientFeedItem.objects.filter(pk__in=stale).delete()
+        if missing:
+            ClientFeedItem.objects.bulk_create(
+                (
+                    ClientFeedItem(client_id=client_id, content_type=content_type, object_id=object_id)
+                    for client_id, content_type, object_id in missing
+                ),
+                ignore_conflicts=True
+            )
+    return len(stale) + len(missing)
+
+def sync_client(client_id: int, add: bool = True) -> int:
+    """Recompute one client's feed after their relationships or assignments change.
+
+    Pass ``add=False`` when access can only have been lost, e.g. while a
+    relationship is being deleted, so nothing is written for a client that
+    may be in the middle of being deleted too.
+    """
+    relationships = ClientInstructorRelationship.objects.filter(client_id=client_id)
+    return _apply(ClientFeedItem.objects.filter(client_id=client_id), _visible(relationships), add)
+
+def sync_content(content_type: str, obj: Model) -> int:
+    """Recompute which clients see one piece of content after it is saved."""
+    clients: Iterable[int] = ()
+    if obj.is_active:
+        if content_type == 'routine':
+            clients = ClientInstructorRelationship.objects.filter(routines=obj).values_list('client_id', flat=True)
+        else:
+            clients = ClientInstructorRelationship.objects.filter(
+                instructor_id=obj.instructor_id
+            ).values_list('client_id', flat=True)
+    return _apply(
+        ClientFeedItem.objects.filter(content_type=content_type, object_id=obj.pk),
+        {(client_id, content_type, obj.pk) for client_id in clients}
+    )
+
+def remove_content(content_type: str, object_id: int) -> None:
+    """Drop a deleted piece of content from every feed."""
+    ClientFeedItem.objects.filter(content_type=content_type, object_id=object_id).delete()
+
+def rebuild_feed(client: Optional[UserProfile] = None) -> int:
+    """Recompute feeds from relationships and content, returning the rows changed.
+
+    Needed after bulk updates that bypass signals, such as
+    ``QuerySet.update(is_active=...)``. This reads every relationship in
+    scope, so it is meant for backfills and repairs rather than request
+    handling.
+    """
+    relationships = ClientInstructorRelationship.objects.all()
+    items = ClientFeedItem.objects.all()
+    if client is not None:
+        relationships = relationships.filter(client=client)
+        items = items.filter(client=client)
+    return _apply(items, _visible(relationships))
@@ -2,25 +2,46 @@ from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
-from django.db.models import Q, Sum, Avg, Count, Max
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse, StreamingHttpResponse
+from django.db.models import OuterRef, Prefetch, Q, Sum, Avg, Count, Max
 from .models import (
     Routine, Exercise, BreathingExercise, MeditationSession,
     CombinedRoutine, MediaAsset, ExerciseProgress, Achievement,
-    ClientAchievement, ClientInstructorRelationship, UploadProgress
+    ClientAchievement, ClientInstructorRelationship, UploadProgress, MediaWaveform
 )
 from .serializers import (
     RoutineSerializer, ExerciseSerializer, BreathingExerciseSerializer,
     MeditationSessionSerializer, CombinedRoutineSerializer, MediaAssetSerializer,
     ExerciseProgressSerializer, AchievementSerializer, ClientAchievementSerializer,
-    ClientInstructorRelationshipSerializer, UploadProgressSerializer
+    ClientInstructorRelationshipSerializer, UploadProgressSerializer,
+    RoutineCreateSerializer, RoutineSummarySerializer, BreathingExerciseSummarySerializer,
+    MeditationSessionSummarySerializer, CombinedRoutineSummarySerializer
 )
 from users.models import UserProfile
 from users.permissions import IsInstructorOrAdmin
+from core.pagination import CompletedCursorPagination, EarnedCursorPagination
+from core.prefetch import PrefetchPlan, PrefetchPlanMixin, SubqueryCount, SummaryListMixin, nest_plans
+from core.parsers import ORJSONParser
+from core.renderers import IgnoreClientContentNegotiation, ORJSONRenderer, PassthroughRenderer
+from core.conditional import ConditionalGetMixin
+from core.response_cache import VersionedListCacheMixin, cache_is_shared, get_versions
+from core.storage import get_storage
+from .renders import find_breathing_cue_track, find_meditation_mix
+from .dashboard import progress_stats
+from .export import iter_bundle, load_combined_routine
+from .feed import visible_ids
+from .media import delete_assets, find_references, is_referenced, readable_media
+from .progress import progress_values, serialize_progress
+from .usage import get_usage, remaining_quota
+from .versions import content_scopes
 from django.utils import timezone
 from datetime import timedelta
 import json
-from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
-from django.core.exceptions import ValidationError
+import hashlib
+from rest_framework.parsers import MultiPartParser, FormParser
+from rest_framework.exceptions import PermissionDenied, ValidationError
 from django.conf import settings
 import os
 from supabase import create_client
@@ -39,17 +60,94 @@ class IsInstructorOrReadOnly(permissions.BasePermission):
             return True
         return obj.instructor == request.user
 
-class RoutineViewSet(viewsets.ModelViewSet):
+# What each optional expansion of the content serializers loads
+ROUTINE_EXPAND_PLANS = {
+    'exercises': PrefetchPlan(prefetch_related=[Prefetch('exercises', queryset=Exercise.objects.order_by('order'))]),
+    'exercises.media_assets': PrefetchPlan(prefetch_related=['exercises__media_assets']),
+}
+BREATHING_EXPAND_PLANS = {
+    'media_assets': PrefetchPlan(prefetch_related=['media_assets']),
+}
+MEDITATION_EXPAND_PLANS = {
+    'guided_audio': PrefetchPlan(select_related=['guided_audio']),
+    'background_audio': PrefetchPlan(select_related=['background_audio']),
+}
+INSTRUCTOR_PLAN = PrefetchPlan(select_related=['instructor'])
+
+# List rows skip large text and JSON columns and count relations in SQL.
+# created_at stays loaded because cursor pagination reads it.
+SUMMARY_COLUMNS = ['id', 'name', 'instructor', 'created_at', 'updated_at', 'is_active']
+ROUTINE_SUMMARY_PLAN = PrefetchPlan(
+    only=SUMMARY_COLUMNS,
+    annotate={
+        'exercise_count': SubqueryCount(Exercise.objects.filter(routine=OuterRef('pk')).values('pk')),
+        'media_count': SubqueryCount(
+            Exercise.media_assets.through.objects.filter(exercise__routine=OuterRef('pk')).values('pk')
+        ),
+    }
+)
+BREATHING_SUMMARY_PLAN = PrefetchPlan(
+    only=SUMMARY_COLUMNS + [
+        'pattern_type', 'difficulty_level', 'inhale_duration', 'hold_duration', 'exhale_duration', 'cycles'
+    ],
+    annotate={
+        'media_count': SubqueryCount(
+            BreathingExercise.media_assets.through.objects.filter(breathingexercise=OuterRef('pk')).values('pk')
+        ),
+    }
+)
+MEDITATION_SUMMARY_PLAN = PrefetchPlan(
+    only=SUMMARY_COLUMNS + [
+        'session_type', 'difficulty_level', 'duration_minutes', 'guided_audio', 'background_audio'
+    ]
+)
+COMBINED_SUMMARY_PLAN = PrefetchPlan(
+    only=SUMMARY_COLUMNS,
+    annotate={
+        f'{kind}_count': SubqueryCount(through.objects.filter(combinedroutine=OuterRef('pk')).values('pk'))
+        for kind, through in (
+            ('routine', CombinedRoutine.routines.through),
+            ('breathing', CombinedRoutine.breathing_exercises.through),
+            ('meditation', CombinedRoutine.meditation_sessions.through),
+        )
+    }
+)
+
+def _with_instructor(relation: str, model) -> PrefetchPlan:
+    return PrefetchPlan(prefetch_related=[Prefetch(relation, queryset=model.objects.select_related('instructor'))])
+
+class ContentCacheMixin(ConditionalGetMixin, VersionedListCacheMixin):
+    """Cache content lists, and validate conditional GETs, by the user's content versions."""
+
+    def get_cache_scopes(self):
+        if not hasattr(self, '_cache_scopes'):
+            self._cache_scopes = content_scopes(self.request.user)
+        return self._cache_scopes
+
+    def get_version_tag(self):
+        # Without a shared cache, versions are per worker; use the watermark instead
+        scopes = self.get_cache_scopes() if cache_is_shared() else None
+        return '.'.join(str(version) for version in get_versions(scopes)) if scopes else None
+
+class RoutineViewSet(ContentCacheMixin, SummaryListMixin, PrefetchPlanMixin, viewsets.ModelViewSet):
     queryset = Routine.objects.all()
+    serializer_class = RoutineSerializer
+    summary_serializer_class = RoutineSummarySerializer
     permission_classes = [IsInstructorOrReadOnly]
+    prefetch_plans = {
+        'list': INSTRUCTOR_PLAN,
+        'retrieve': INSTRUCTOR_PLAN,
+    }
+    summary_plan = ROUTINE_SUMMARY_PLAN
+    expand_plans = ROUTINE_EXPAND_PLANS
     
     def get_serializer_class(self):
         if self.action in ['create', 'update', 'partial_update']:
             return RoutineCreateSerializer
-        return RoutineSerializer
+        return super().get_serializer_class()
     
     def perform_create(self, serializer):
-        serializer.save(instructor=self.request.user.userprofile)
+        serializer.save(instructor=self.request.user)
     
     def get_queryset(self):
         queryset = Routine.objects.all()
@@ -58,30 +156,31 @@ class RoutineViewSet(viewsets.ModelViewSet):
         if not user.is_authenticated:
             return queryset.filter(is_active=True)
         
-        user_profile = user.userprofile
-        
-        if user_profile.is_instructor:
+        if user.role in ['instructor', 'admin']:
             # Instructors see their own routines
-            return queryset.filter(instructor=user_profile)
+            return queryset.filter(instructor=user)
         else:
-            # Clients see routines assigned to them
-            client_relationships = ClientInstructorRelationship.objects.filter(client=user_profile)
-            return queryset.filter(
-                assigned_clients__in=client_relationships,
-                is_active=True
-            ).distinct()
+            # Clients see active routines assigned to them
+            return queryset.filter(id__in=visible_ids(user, 'routine'))
 
-class ClientInstructorRelationshipViewSet(viewsets.ModelViewSet):
+class ClientInstructorRelationshipViewSet(PrefetchPlanMixin, viewsets.ModelViewSet):
     serializer_class = ClientInstructorRelationshipSerializer
     permission_classes = [permissions.IsAuthenticated]
+    prefetch_plans = {
+        'default': PrefetchPlan(select_related=['client', 'instructor']),
+    }
+    expand_plans = {
+        'routines': _with_instructor('routines', Routine),
+        **nest_plans('routines', ROUTINE_EXPAND_PLANS),
+    }
     
     def get_queryset(self):
-        user_profile = self.request.user.userprofile
+        user = self.request.user
         
-        if user_profile.is_instructor:
-            return ClientInstructorRelationship.objects.filter(instructor=user_profile)
+        if user.role in ['instructor', 'admin']:
+            return ClientInstructorRelationship.objects.filter(instructor=user)
         else:
-            return ClientInstructorRelationship.objects.filter(client=user_profile)
+            return ClientInstructorRelationship.objects.filter(client=user)
     
     @action(detail=True, methods=['post'])
     def assign_routine(self, request, pk=None):
@@ -125,10 +224,10 @@ class MediaAssetViewSet(viewsets.ModelViewSet):
     """ViewSet for managing media assets."""
     serializer_class = MediaAssetSerializer
     permission_classes = [IsInstructorOrAdmin]
-    parser_classes = [MultiPartParser, FormParser, JSONParser]
+    parser_classes = [MultiPartParser, FormParser, ORJSONParser]
     
     def get_queryset(self):
-        return MediaAsset.objects.filter(instructor=self.request.user.userprofile)
+        return MediaAsset.objects.filter(instructor=self.request.user)
     
     @action(detail=False, methods=['post'])
     def get_upload_policy(self, request):
@@ -136,6 +235,7 @@ class MediaAssetViewSet(viewsets.ModelViewSet):
         file_name = request.data.get('file_name')
         asset_type = request.data.get('asset_type')
         content_type = request.data.get('content_type')
+        file_size = request.data.get('file_size', 0)
         
         if not file_name or not asset_type:
             return Response(
@@ -144,17 +244,33 @@ class MediaAssetViewSet(viewsets.ModelViewSet):
             )
         
         # Validate asset type
-        if asset_type not in dict(MediaAsset.ASSET_TYPES):
+        if asset_type not in dict(MediaAsset.ASSET_TYPE_CHOICES):
             return Response(
-                {'error': f'Invalid asset type. Must be one of: {", ".join(dict(MediaAsset.ASSET_TYPES).keys())}'},
+                {'error': f'Invalid asset type. Must be one of: {", ".join(dict(MediaAsset.ASSET_TYPE_CHOICES).keys())}'},
                 status=status.HTTP_400_BAD_REQUEST
             )
         
+        try:
+            file_size = int(file_size)
+        except (TypeError, ValueError):
+            return Response(
+                {'error': 'file_size must be a number of bytes'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        # Reject uploads that would not fit before handing out a policy
+        remaining = remaining_quota(request.user)
+        if remaining <= 0 or file_size > remaining:
+            return Response(
+                {'error': 'Storage quota exceeded', 'remaining_bytes': max(remaining, 0)},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
         # Generate upload policy
-        storage = SupabaseStorage()
+        storage = get_storage()
         policy = storage.generate_upload_policy(
             file_name=file_name,
-            instructor_id=request.user.userprofile.id,
+            instructor_id=request.user.id,
             asset_type=asset_type,
             content_type=content_type
         )
@@ -162,14 +278,26 @@ class MediaAssetViewSet(viewsets.ModelViewSet):
         # Create progress tracking
         progress = UploadProgress.create_for_direct_upload(
             policy=policy,
-            instructor=request.user.userprofile
+            instructor=request.user
         )
         
         # Add progress ID to policy response
-        policy['progress_id'] = str(progress.upload_id)
+        policy['progress_id'] = progress.pk
         
         return Response(policy)
     
+    @action(detail=False, methods=['get'])
+    def usage(self, request):
+        """Get the instructor's storage usage by asset type and remaining quota."""
+        by_type = get_usage(request.user)
+        used = sum(usage['bytes'] for usage in by_type.values())
+        return Response({
+            'by_type': by_type,
+            'total_bytes': used,
+            'quota_bytes': settings.INSTRUCTOR_STORAGE_QUOTA,
+            'remaining_bytes': max(settings.INSTRUCTOR_STORAGE_QUOTA - used, 0)
+        })
+    
     @action(detail=False, methods=['post'])
     def update_progress(self, request):
         """Update upload progress for direct uploads."""
@@ -234,8 +362,9 @@ class MediaAssetViewSet(viewsets.ModelViewSet):
         status_filter = request.query_params.get('status')
         asset_type = request.query_params.get('asset_type')
         
+        # Upload paths start with the instructor's ID
         queryset = UploadProgress.objects.filter(
-            instructor=request.user.userprofile
+            file_path__startswith=f"{request.user.id}/"
         )
         
         if status_filter:
@@ -243,8 +372,9 @@ class MediaAssetViewSet(viewsets.ModelViewSet):
         if asset_type:
             queryset = queryset.filter(asset_type=asset_type)
         
-        serializer = UploadProgressSerializer(queryset, many=True)
-        return Response(serializer.data)
+        page = self.paginate_queryset(queryset)
+        serializer = UploadProgressSerializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
     
     @action(detail=False, methods=['post'])
     def verify_upload(self, request):
@@ -258,78 +388,72 @@ class MediaAssetViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        try:
-            progress = UploadProgress.objects.get(
-                upload_id=upload_id,
-                instructor=request.user.userprofile
-            )
-        except UploadProgress.DoesNotExist:
+        # Upload paths start with the instructor's ID
+        progress = UploadProgress.objects.filter(
+            file_path=file_path,
+            file_path__startswith=f"{request.user.id}/"
+        ).first()
+        if progress is None:
             return Response(
                 {'error': 'Upload progress not found'},
                 status=status.HTTP_404_NOT_FOUND
             )
         
-        # Update progress status
-        progress.update_progress(
-            status='verifying',
-            uploaded_size=progress.total_size
-        )
+        # Claim the upload, so sweep_uploads cannot expire it while it is verified
+        claimed = UploadProgress.objects.filter(
+            pk=progress.pk, status__in=['pending', 'uploading']
+        ).update(status='processing', updated_at=timezone.now())
+        if not claimed:
+            return Response(
+                {'error': f'Upload is already {progress.status}'},
+                status=status.HTTP_409_CONFLICT
+            )
+        
+        def fail(message: str, response_status: int) -> Response:
+            UploadProgress.objects.filter(pk=progress.pk).update(
+                status='failed', error_message=message, updated_at=timezone.now()
+            )
+            return Response({'error': message}, status=response_status)
         
         try:
-            # Verify upload
-            storage = SupabaseStorage()
+            storage = get_storage()
             success, metadata = storage.verify_upload(
                 upload_id=upload_id,
                 file_path=file_path,
-                instructor_id=request.user.userprofile.id
+                instructor_id=request.user.id
             )
-            
             if not success:
-                progress.update_progress(
-                    status='failed',
-                    error_message='Upload verification failed'
+                return fail('Upload verification failed', status.HTTP_400_BAD_REQUEST)
+            
+            # The policy was checked against the declared size; hold the stored one to the quota too
+            if metadata['size'] > remaining_quota(request.user):
+                storage.delete_file(file_path)
+                return fail('Storage quota exceeded', status.HTTP_403_FORBIDDEN)
+            
+            with transaction.atomic():
+                asset = MediaAsset.objects.create(
+                    name=os.path.splitext(os.path.basename(file_path))[0],
+                    asset_type=progress.asset_type,
+                    instructor=request.user,
+                    file_size=metadata['size'],
+                    thumbnail_url=metadata.get('thumbnail_url') or '',
+                    supabase_path=file_path,
+                    supabase_bucket=storage.bucket_name
                 )
-                return Response(
-                    {'error': 'Upload verification failed'},
-                    status=status.HTTP_400_BAD_REQUEST
+                UploadProgress.objects.filter(pk=progress.pk).update(
+                    status='completed', progress=100, updated_at=timezone.now()
                 )
             
-            # Create MediaAsset
-            asset = MediaAsset.objects.create(
-                name=os.path.splitext(os.path.basename(file_path))[0],
-                asset_type=file_path.split('/')[1],  # Get type from path
-                file_path=file_path,
-                url=metadata['url'],
-                thumbnail_url=metadata['thumbnail_url'],
-                file_size=metadata.get('size', 0),
-                instructor=request.user.userprofile
-            )
-            
-            # Update progress status
-            progress.update_progress(
-                status='completed',
-                file_path=file_path
+            return Response(
+                MediaAssetSerializer(asset, context=self.get_serializer_context()).data,
+                status=status.HTTP_201_CREATED
             )
             
-            return Response(MediaAssetSerializer(asset).data)
-            
         except Exception as e:
-            progress.update_progress(
-                status='failed',
-                error_message=str(e)
-            )
-            return Response(
-                {'error': f'Error creating media asset: {str(e)}'},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
+            return fail(f'Error creating media asset: {str(e)}', status.HTTP_500_INTERNAL_SERVER_ERROR)
     
     def perform_create(self, serializer):
-        """Handle file upload and create media asset."""
-        # Check if this is a direct upload verification
-        if self.action == 'verify_upload':
-            return
-        
-        # Handle traditional file upload
+        """Upload the posted file to storage and create its media asset."""
         file_obj = self.request.FILES.get('file')
         if not file_obj:
             raise ValidationError('No file provided')
@@ -352,74 +476,157 @@ class MediaAssetViewSet(viewsets.ModelViewSet):
                 f'File size exceeds maximum allowed size for {asset_type}'
             )
         
+        if file_obj.size > remaining_quota(self.request.user):
+            raise PermissionDenied('Storage quota exceeded')
+        
         # Create progress tracking
         progress = UploadProgress.create_for_traditional_upload(
             file_obj=file_obj,
-            instructor=self.request.user.userprofile,
+            instructor=self.request.user,
             asset_type=asset_type
         )
         
         try:
-            # Read file data
-            file_data = file_obj.read()
-            
-            # Update progress
-            progress.update_progress(
-                uploaded_size=len(file_data),
-                status='uploading'
-            )
-            
-            # Create media asset
-            asset = MediaAsset.create_from_upload(
-                file_data=file_data,
+            storage = get_storage()
+            file_path, metadata = storage.upload_file(
+                file_data=file_obj.read(),
                 file_name=file_obj.name,
-                instructor=self.request.user.userprofile,
-                asset_type=asset_type
+                instructor_id=self.request.user.id,
+                asset_type=asset_type,
+                content_type=content_type
             )
-            
-            # Update progress
-            progress.update_progress(
-                status='completed',
-                file_path=asset.file_path
+            serializer.save(
+                instructor=self.request.user,
+                asset_type=asset_type,
+                file_size=metadata['file_size'],
+                content_hash=metadata['content_hash'],
+                blurhash=metadata['blurhash'] or '',
+                thumbnail_url=metadata['thumbnail_url'] or '',
+                supabase_path=file_path,
+                supabase_bucket=storage.bucket_name
+            )
+            UploadProgress.objects.filter(pk=progress.pk).update(
+                status='completed', progress=100, file_path=file_path, updated_at=timezone.now()
             )
-            
-            serializer.instance = asset
-            
         except Exception as e:
-            progress.update_progress(
-                status='failed',
-                error_message=str(e)
+            UploadProgress.objects.filter(pk=progress.pk).update(
+                status='failed', error_message=str(e), updated_at=timezone.now()
             )
             raise
     
+    def destroy(self, request, *args, **kwargs):
+        """Delete a media asset, refusing while it is in use unless ``force`` is set."""
+        asset = self.get_object()
+        references = find_references([asset.pk])[asset.pk]
+        if is_referenced(references) and request.query_params.get('force') not in ('1', 'true'):
+            return Response(
+                {'error': 'Media asset is still in use', 'references': references},
+                status=status.HTTP_409_CONFLICT
+            )
+        self.perform_destroy(asset)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+    
     def perform_destroy(self, instance):
         """Delete media asset and its file from storage."""
         instance.delete()
     
+    @action(detail=False, methods=['get'], url_path='where-used')
+    def where_used(self, request):
+        """List the exercises and sessions using each of the given assets."""
+        try:
+            ids = [int(asset_id) for asset_id in request.query_params.get('ids', '').split(',') if asset_id]
+        except ValueError:
+            return Response(
+                {'error': 'ids must be a comma-separated list of asset IDs'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        owned = self.get_queryset().filter(pk__in=ids).values_list('pk', flat=True)
+        return Response(find_references(owned))
+    
+    @action(detail=False, methods=['post'], url_path='bulk-delete')
+    def bulk_delete(self, request):
+        """Delete several assets at once.
+        
+        Nothing is deleted while any of the assets is in use, unless ``force``
+        is set, in which case the references are dropped with the assets.
+        Assets whose stored files could not be deleted are kept and listed
+        under ``failed``.
+        """
+        ids = request.data.get('ids')
+        try:
+            ids = [int(asset_id) for asset_id in ids]
+        except (TypeError, ValueError):
+            ids = None
+        if not ids:
+            return Response(
+                {'error': 'ids must be a non-empty list of asset IDs'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        assets = self.get_queryset().filter(pk__in=ids)
+        references = find_references(assets.values_list('pk', flat=True))
+        in_use = {asset_id: refs for asset_id, refs in references.items() if is_referenced(refs)}
+        force = request.data.get('force')
+        if in_use and force is not True and force not in ('1', 'true'):
+            return Response(
+                {'error': 'Some media assets are still in use', 'in_use': in_use},
+                status=status.HTTP_409_CONFLICT
+            )
+        deleted, failed = delete_assets(assets.filter(pk__in=list(references)))
+        return Response({
+            'deleted': deleted,
+            'failed': failed,
+            'not_found': [asset_id for asset_id in ids if asset_id not in references]
+        })
+    
     @action(detail=True, methods=['post'])
     def refresh_url(self, request, pk=None):
         """Refresh the signed URL for a media asset."""
         asset = self.get_object()
         asset.refresh_url()
         return Response(self.get_serializer(asset).data)
+    
+    @action(
+        detail=True,
+        methods=['get'],
+        permission_classes=[permissions.IsAuthenticated],
+        renderer_classes=[ORJSONRenderer, PassthroughRenderer]
+    )
+    def waveform(self, request, pk=None):
+        """Serve the precomputed waveform peaks of an audio asset as binary."""
+        # Check access before the cache, which is shared between users
+        get_object_or_404(readable_media(request.user).only('pk'), pk=pk)
+        cache_key = f'waveform:{pk}'
+        cached = cache.get(cache_key)
+        if cached is None:
+            waveform = get_object_or_404(MediaWaveform.objects.only('peaks'), asset_id=pk)
+            peaks = bytes(waveform.peaks)
+            cached = {'peaks': peaks, 'etag': f'"{hashlib.md5(peaks).hexdigest()}"'}
+            cache.set(cache_key, cached, settings.WAVEFORM_CACHE_TIMEOUT)
+        
+        if cached['etag'] in request.headers.get('If-None-Match', ''):
+            response = HttpResponse(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = HttpResponse(cached['peaks'], content_type='application/octet-stream')
+        response['ETag'] = cached['etag']
+        response['Cache-Control'] = 'private, max-age=86400'
+        return response
 
-class BreathingExerciseViewSet(viewsets.ModelViewSet):
+class BreathingExerciseViewSet(ContentCacheMixin, SummaryListMixin, PrefetchPlanMixin, viewsets.ModelViewSet):
     """ViewSet for managing breathing exercises."""
     serializer_class = BreathingExerciseSerializer
+    summary_serializer_class = BreathingExerciseSummarySerializer
     permission_classes = [IsInstructorOrReadOnly]
+    prefetch_plans = {'default': INSTRUCTOR_PLAN}
+    summary_plan = BREATHING_SUMMARY_PLAN
+    expand_plans = BREATHING_EXPAND_PLANS
     
     def get_queryset(self):
         user = self.request.user
         if user.role in ['instructor', 'admin']:
             return BreathingExercise.objects.filter(instructor=user)
         else:
-            # Clients see exercises from their instructors
-            relationships = ClientInstructorRelationship.objects.filter(client=user)
-            instructor_ids = relationships.values_list('instructor_id', flat=True)
-            return BreathingExercise.objects.filter(
-                instructor_id__in=instructor_ids,
-                is_active=True
-            )
+            # Clients see active exercises from their instructors
+            return BreathingExercise.objects.filter(id__in=visible_ids(user, 'breathing'))
     
     def perform_create(self, serializer):
         serializer.save(instructor=self.request.user)
@@ -438,24 +645,57 @@ class BreathingExerciseViewSet(viewsets.ModelViewSet):
         media = get_object_or_404(MediaAsset, id=media_id, instructor=request.user)
         exercise.media_assets.add(media)
         return Response(self.get_serializer(exercise).data)
+    
+    @action(detail=True, methods=['get'])
+    def cue_track(self, request, pk=None):
+        """Get the pre-rendered audio cue track for the exercise's breathing pattern.
+        
+        Cue tracks are rendered offline by the render_breathing_cues command,
+        so until one exists for the current pattern the response is 202.
+        """
+        exercise = self.get_object()
+        if not exercise.has_audio_cue:
+            return Response(
+                {'error': 'Audio cues are disabled for this exercise'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if exercise.get_total_duration() <= 0:
+            return Response(
+                {'error': 'Breathing pattern must have a positive duration'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        asset = find_breathing_cue_track(exercise)
+        if asset is None:
+            return Response(
+                {'message': 'The cue track for this breathing pattern has not been rendered yet'},
+                status=status.HTTP_202_ACCEPTED
+            )
+        
+        storage = get_storage()
+        return Response({
+            'id': asset.id,
+            'url': storage.get_signed_url(asset.supabase_path, settings.SIGNED_URL_EXPIRATION),
+            'duration_seconds': asset.duration_seconds,
+            'file_size': asset.file_size
+        })
 
-class MeditationSessionViewSet(viewsets.ModelViewSet):
+class MeditationSessionViewSet(ContentCacheMixin, SummaryListMixin, PrefetchPlanMixin, viewsets.ModelViewSet):
     """ViewSet for managing meditation sessions."""
     serializer_class = MeditationSessionSerializer
+    summary_serializer_class = MeditationSessionSummarySerializer
     permission_classes = [IsInstructorOrReadOnly]
+    prefetch_plans = {'default': INSTRUCTOR_PLAN}
+    summary_plan = MEDITATION_SUMMARY_PLAN
+    expand_plans = MEDITATION_EXPAND_PLANS
     
     def get_queryset(self):
         user = self.request.user
         if user.role in ['instructor', 'admin']:
             return MeditationSession.objects.filter(instructor=user)
         else:
-            # Clients see sessions from their instructors
-            relationships = ClientInstructorRelationship.objects.filter(client=user)
-            instructor_ids = relationships.values_list('instructor_id', flat=True)
-            return MeditationSession.objects.filter(
-                instructor_id__in=instructor_ids,
-                is_active=True
-            )
+            # Clients see active sessions from their instructors
+            return MeditationSession.objects.filter(id__in=visible_ids(user, 'meditation'))
     
     def perform_create(self, serializer):
         serializer.save(instructor=self.request.user)
@@ -479,24 +719,53 @@ class MeditationSessionViewSet(viewsets.ModelViewSet):
         )
         session.audio_assets.add(media)
         return Response(self.get_serializer(session).data)
+    
+    @action(detail=True, methods=['get'])
+    def mixed_audio(self, request, pk=None):
+        """Get the guided audio pre-mixed over the background audio.
+        
+        Mixes are rendered offline by the render_meditation_mixes command, so
+        clients should fall back to playing both tracks until one exists.
+        """
+        session = self.get_object()
+        asset = find_meditation_mix(session)
+        if asset is None:
+            return Response(
+                {'error': 'No mixed audio has been rendered for this session yet'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        storage = get_storage()
+        return Response({
+            'id': asset.id,
+            'url': storage.get_signed_url(asset.supabase_path, settings.SIGNED_URL_EXPIRATION),
+            'duration_seconds': asset.duration_seconds,
+            'file_size': asset.file_size
+        })
 
-class CombinedRoutineViewSet(viewsets.ModelViewSet):
+class CombinedRoutineViewSet(ContentCacheMixin, SummaryListMixin, PrefetchPlanMixin, viewsets.ModelViewSet):
     """ViewSet for managing combined routines."""
     serializer_class = CombinedRoutineSerializer
+    summary_serializer_class = CombinedRoutineSummarySerializer
     permission_classes = [IsInstructorOrReadOnly]
+    prefetch_plans = {'default': INSTRUCTOR_PLAN}
+    summary_plan = COMBINED_SUMMARY_PLAN
+    expand_plans = {
+        'routines': _with_instructor('routines', Routine),
+        **nest_plans('routines', ROUTINE_EXPAND_PLANS),
+        'breathing_exercises': _with_instructor('breathing_exercises', BreathingExercise),
+        **nest_plans('breathing_exercises', BREATHING_EXPAND_PLANS),
+        'meditation_sessions': _with_instructor('meditation_sessions', MeditationSession),
+        **nest_plans('meditation_sessions', MEDITATION_EXPAND_PLANS),
+    }
     
     def get_queryset(self):
         user = self.request.user
         if user.role in ['instructor', 'admin']:
             return CombinedRoutine.objects.filter(instructor=user)
         else:
-            # Clients see routines from their instructors
-            relationships = ClientInstructorRelationship.objects.filter(client=user)
-            instructor_ids = relationships.values_list('instructor_id', flat=True)
-            return CombinedRoutine.objects.filter(
-                instructor_id__in=instructor_ids,
-                is_active=True
-            )
+            # Clients see active routines from their instructors
+            return CombinedRoutine.objects.filter(id__in=visible_ids(user, 'combined'))
     
     def perform_create(self, serializer):
         serializer.save(instructor=self.request.user)
@@ -529,11 +798,20 @@ class CombinedRoutineViewSet(viewsets.ModelViewSet):
             )
         
         return Response(self.get_serializer(routine).data)
+    
+    @action(detail=True, methods=['get'], content_negotiation_class=IgnoreClientContentNegotiation)
+    def export(self, request, pk=None):
+        """Stream a ZIP of the combined routine's manifest and media for offline use."""
+        combined = load_combined_routine(self.get_object().pk)
+        response = StreamingHttpResponse(iter_bundle(combined), content_type='application/zip')
+        response['Content-Disposition'] = f'attachment; filename="routine-{combined.pk}.zip"'
+        return response
 
 class ExerciseProgressViewSet(viewsets.ModelViewSet):
     """ViewSet for tracking exercise progress."""
     serializer_class = ExerciseProgressSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = CompletedCursorPagination
     
     def get_queryset(self):
         user = self.request.user
@@ -546,6 +824,11 @@ class ExerciseProgressViewSet(viewsets.ModelViewSet):
             # Clients see their own progress
             return ExerciseProgress.objects.filter(client=user)
     
+    def list(self, request, *args, **kwargs):
+        # Built from values() rows; the output matches ExerciseProgressSerializer
+        page = self.paginate_queryset(progress_values(self.filter_queryset(self.get_queryset())))
+        return self.get_paginated_response(serialize_progress(page))
+    
     def perform_create(self, serializer):
         serializer.save(client=self.request.user)
     
@@ -562,19 +845,7 @@ class ExerciseProgressViewSet(viewsets.ModelViewSet):
             # Get stats for the client
             progress = ExerciseProgress.objects.filter(client=user)
         
-        stats = {
-            'total_exercises': progress.count(),
-            'total_duration': progress.aggregate(total=models.Sum('duration_seconds'))['total'] or 0,
-            'average_difficulty': progress.exclude(difficulty_rating__isnull=True)
-                .aggregate(avg=models.Avg('difficulty_rating'))['avg'] or 0,
-            'by_type': {
-                'exercise': progress.filter(exercise__isnull=False).count(),
-                'breathing': progress.filter(breathing_exercise__isnull=False).count(),
-                'meditation': progress.filter(meditation_session__isnull=False).count(),
-            }
-        }
-        
-        return Response(stats)
+        return Response(progress_stats(progress))
 
 class AchievementViewSet(viewsets.ReadOnlyModelViewSet):
     """ViewSet for viewing achievements."""
@@ -586,6 +857,7 @@ class ClientAchievementViewSet(viewsets.ModelViewSet):
     """ViewSet for managing client achievements."""
     serializer_class = ClientAchievementSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = EarnedCursorPagination
     
     def get_queryset(self):
         user = self.request.user
@@ -0,0 +1,31 @@
+"""
+Helpers shared by the benchmark commands.
+
+Benchmarks generate their data inside a transaction that is rolled back, so
+they can run against any database without leaving rows behind.
+"""
+from django.db import transaction
+from typing import Any, Callable, Tuple
+import time
+
+class Rollback(Exception):
+    """Raised to discard the benchmark data."""
+
+def run_rolled_back(func: Callable[[], None]) -> None:
+    """Run ``func`` in a transaction and discard everything it wrote."""
+    try:
+        with transaction.atomic():
+            func()
+            raise Rollback
+    except Rollback:
+        pass
+
+def best_time(func: Callable[[], Any], repeat: int) -> Tuple[float, Any]:
+    """Call ``func`` ``repeat`` times and return the fastest time in seconds with the last result."""
+    best, result = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
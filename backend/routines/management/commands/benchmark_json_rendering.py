@@ -0,0 +1,101 @@
+from core.parsers import ORJSONParser
+from core.renderers import ORJSONRenderer
+from django.core.management.base import BaseCommand, CommandError
+from io import BytesIO
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from routines.dashboard import build_dashboard
+from routines.management.benchmark import best_time, run_rolled_back
+from routines.models import (
+    BreathingExercise, ClientInstructorRelationship, CombinedRoutine, Exercise, ExerciseProgress,
+    MeditationSession, Routine
+)
+from routines.progress import progress_values, serialize_progress
+from routines.serializers import CombinedRoutineSerializer
+from users.models import UserProfile
+import json
+import uuid
+
+class Command(BaseCommand):
+    help = "Compare DRF's JSON renderer and parser with the orjson ones on representative API payloads"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', type=int, default=20, help='Combined routines to generate; other content grows with it')
+        parser.add_argument('--repeat', type=int, default=5, help='Runs per renderer; the fastest is reported')
+
+    def handle(self, *args, **options):
+        run_rolled_back(lambda: self._run(options['scale'], options['repeat']))
+
+    def _payloads(self, scale: int):
+        instructor = UserProfile.objects.create(
+            role='instructor', email=f'bench-{uuid.uuid4()}@example.com', supabase_id=uuid.uuid4()
+        )
+        client = UserProfile.objects.create(
+            role='client', email=f'bench-{uuid.uuid4()}@example.com', supabase_id=uuid.uuid4()
+        )
+        relationship = ClientInstructorRelationship.objects.create(client=client, instructor=instructor)
+        routines = []
+        for i in range(scale):
+            routine = Routine.objects.create(name=f'Flow {i}', description='Slow flow ' * 20, instructor=instructor)
+            Exercise.objects.bulk_create(
+                Exercise(routine=routine, name=f'Pose {j}', instructions='Breathe and hold. ' * 10, order=j)
+                for j in range(8)
+            )
+            routines.append(routine)
+        relationship.routines.set(routines)
+        breathing = [BreathingExercise.objects.create(name=f'Breath {i}', instructor=instructor) for i in range(scale)]
+        meditations = [MeditationSession.objects.create(name=f'Calm {i}', instructor=instructor) for i in range(scale)]
+        for i in range(scale):
+            combined = CombinedRoutine.objects.create(name=f'Session {i}', instructor=instructor)
+            combined.routines.set(routines[i:i + 3])
+            combined.breathing_exercises.set(breathing[i:i + 2])
+            combined.meditation_sessions.set(meditations[i:i + 2])
+        ExerciseProgress.objects.bulk_create(
+            ExerciseProgress(client=client, duration_seconds=60 + i, difficulty_rating=i % 5 + 1, breathing_exercise=breathing[i % scale])
+            for i in range(scale * 50)
+        )
+
+        request = Request(APIRequestFactory().get(
+            '/', {'expand': 'routines.exercises,breathing_exercises,meditation_sessions'}
+        ))
+        combined = CombinedRoutineSerializer(
+            CombinedRoutine.objects.filter(instructor=instructor).select_related('instructor').prefetch_related(
+                'routines__exercises', 'breathing_exercises', 'meditation_sessions'
+            ),
+            many=True,
+            context={'request': request}
+        ).data
+        progress = serialize_progress(progress_values(
+            ExerciseProgress.objects.filter(client=client).order_by('-completed_at', '-id')
+        ))
+        return {
+            'expanded combined routines': combined,
+            'progress list': progress,
+            'client dashboard': build_dashboard(client),
+        }
+
+    def _run(self, scale: int, repeat: int) -> None:
+        stdlib_renderer, fast_renderer = JSONRenderer(), ORJSONRenderer()
+        stdlib_parser, fast_parser = JSONParser(), ORJSONParser()
+        self.stdout.write(f'Best of {repeat}')
+        for name, data in self._payloads(scale).items():
+            stdlib_time, expected = best_time(lambda: stdlib_renderer.render(data), repeat)
+            fast_time, actual = best_time(lambda: fast_renderer.render(data), repeat)
+            if json.loads(expected) != json.loads(actual):
+                raise CommandError(f'The orjson renderer output differs for the {name}')
+            stdlib_parse_time, parsed = best_time(lambda: stdlib_parser.parse(BytesIO(expected)), repeat)
+            fast_parse_time, fast_parsed = best_time(lambda: fast_parser.parse(BytesIO(expected)), repeat)
+            if parsed != fast_parsed:
+                raise CommandError(f'The orjson parser output differs for the {name}')
+            self.stdout.write(f'{name}, {len(expected) / 1024:.0f} KiB')
+            self.stdout.write(
+                f'  render: json {stdlib_time * 1000:.2f} ms, orjson {fast_time * 1000:.2f} ms'
+                f' ({stdlib_time / fast_time:.1f}x)'
+            )
+            self.stdout.write(
+                f'  parse:  json {stdlib_parse_time * 1000:.2f} ms, orjson {fast_parse_time * 1000:.2f} ms'
+                f' ({stdlib_parse_time / fast_parse_time:.1f}x)'
+            )
+        self.stdout.write(self.style.SUCCESS('Identical output for every payload'))
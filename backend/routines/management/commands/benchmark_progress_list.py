@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand, CommandError
+from routines.management.benchmark import best_time, run_rolled_back
+from routines.models import (
+    BreathingExercise, ExerciseProgress, Exercise, MeditationSession, Routine
+)
+from routines.progress import progress_values, serialize_progress
+from routines.serializers import ExerciseProgressSerializer
+from users.models import UserProfile
+import uuid
+
+class Command(BaseCommand):
+    help = 'Compare ExerciseProgressSerializer with the values() fast path on generated progress rows'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=2000, help='Number of progress rows to generate')
+        parser.add_argument('--repeat', type=int, default=5, help='Runs per path; the fastest is reported')
+
+    def handle(self, *args, **options):
+        run_rolled_back(lambda: self._run(options['rows'], options['repeat']))
+
+    def _run(self, rows: int, repeat: int) -> None:
+        instructor = UserProfile.objects.create(
+            role='instructor', email=f'bench-{uuid.uuid4()}@example.com', supabase_id=uuid.uuid4()
+        )
+        client = UserProfile.objects.create(
+            role='client', email=f'bench-{uuid.uuid4()}@example.com', supabase_id=uuid.uuid4()
+        )
+        routine = Routine.objects.create(name='Benchmark', instructor=instructor)
+        targets = []
+        for i in range(10):
+            targets.append({'exercise': Exercise.objects.create(routine=routine, name=f'Pose {i}', order=i)})
+            targets.append({'breathing_exercise': BreathingExercise.objects.create(name=f'Breath {i}', instructor=instructor)})
+            targets.append({'meditation_session': MeditationSession.objects.create(name=f'Calm {i}', instructor=instructor)})
+        ExerciseProgress.objects.bulk_create(
+            ExerciseProgress(client=client, duration_seconds=60 + i, notes='', **targets[i % len(targets)])
+            for i in range(rows)
+        )
+        queryset = ExerciseProgress.objects.filter(client=client).order_by('-completed_at', '-id')
+
+        serializer_time, expected = best_time(
+            lambda: ExerciseProgressSerializer(
+                queryset.select_related('exercise', 'breathing_exercise', 'meditation_session'), many=True
+            ).data,
+            repeat
+        )
+        fast_time, actual = best_time(lambda: serialize_progress(progress_values(queryset)), repeat)
+
+        if [dict(row) for row in expected] != actual:
+            raise CommandError('The fast path output differs from ExerciseProgressSerializer')
+        self.stdout.write(f'{rows} rows, best of {repeat}')
+        self.stdout.write(f'  serializer: {serializer_time * 1000:.1f} ms')
+        self.stdout.write(f'  values():   {fast_time * 1000:.1f} ms')
+        self.stdout.write(self.style.SUCCESS(f'Identical output, {serializer_time / fast_time:.1f}x faster'))
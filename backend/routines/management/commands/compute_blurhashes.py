@@ -0,0 +1,58 @@
+from django.core.management.base import BaseCommand, CommandError
+from core.images import image_placeholder
+from core.storage import get_storage
+from routines.media import SPOOL_MAX_SIZE, fetch_asset
+from routines.models import MediaAsset
+import tempfile
+
+class Command(BaseCommand):
+    help = 'Compute BlurHash placeholders for image assets uploaded without one'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit',
+            type=int,
+            help='Process at most this many assets'
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Recompute placeholders that already exist'
+        )
+
+    def handle(self, *args, **options):
+        assets = MediaAsset.objects.filter(asset_type='image', is_active=True).order_by('pk')
+        if not options['force']:
+            assets = assets.filter(blurhash='')
+        if options['limit'] is not None:
+            if options['limit'] < 1:
+                raise CommandError('--limit must be positive')
+            assets = assets[:options['limit']]
+
+        storage = None
+        computed = failed = 0
+        for asset in assets.iterator():
+            if not asset.file and not asset.supabase_path:
+                continue
+            if not asset.file and storage is None:
+                storage = get_storage()
+            try:
+                with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE) as image:
+                    fetch_asset(asset, image, storage)
+                    image.seek(0)
+                    blurhash = image_placeholder(image)
+            except Exception as e:
+                failed += 1
+                self.stderr.write(f'Asset {asset.pk} ({asset.name}): {e}')
+                continue
+            if blurhash is None:
+                failed += 1
+                self.stderr.write(f'Asset {asset.pk} ({asset.name}): not a readable image')
+                continue
+            # Update in the database so MediaAsset.save() does not re-upload local files
+            MediaAsset.objects.filter(pk=asset.pk).update(blurhash=blurhash)
+            computed += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Computed {computed} placeholders, {failed} failed'
+        ))
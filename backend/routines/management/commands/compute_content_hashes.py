@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand, CommandError
+from core.storage import get_storage
+from routines.media import hash_asset
+from routines.models import MediaAsset
+
+class Command(BaseCommand):
+    help = 'Fill in the SHA-256 content hash of media assets that do not have one yet'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit',
+            type=int,
+            help='Hash at most this many assets'
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Recompute hashes that already exist'
+        )
+
+    def handle(self, *args, **options):
+        assets = MediaAsset.objects.filter(is_active=True).order_by('pk')
+        if not options['force']:
+            assets = assets.filter(content_hash='')
+        if options['limit'] is not None:
+            if options['limit'] < 1:
+                raise CommandError('--limit must be positive')
+            assets = assets[:options['limit']]
+
+        storage = None
+        hashed = failed = 0
+        for asset in assets.iterator():
+            if not asset.file and not asset.supabase_path:
+                continue
+            if not asset.file and storage is None:
+                storage = get_storage()
+            try:
+                content_hash = hash_asset(asset, storage)
+            except Exception as e:
+                failed += 1
+                self.stderr.write(f'Asset {asset.pk} ({asset.name}): {e}')
+                continue
+            # Update in the database so MediaAsset.save() does not re-upload local files
+            MediaAsset.objects.filter(pk=asset.pk).update(content_hash=content_hash)
+            hashed += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Hashed {hashed} assets, {failed} failed'
+        ))
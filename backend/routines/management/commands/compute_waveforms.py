@@ -0,0 +1,83 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.core.cache import cache
+from core.storage import SupabaseStorage, get_storage
+from routines.audio import UnsupportedAudioFormat, compute_waveform, encode_waveform
+from routines.models import MediaAsset, MediaWaveform
+from routines.media import SPOOL_MAX_SIZE, fetch_asset
+import tempfile
+
+class Command(BaseCommand):
+    help = 'Precompute waveform peaks for audio assets that do not have them yet'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--asset-id',
+            type=int,
+            action='append',
+            dest='asset_ids',
+            help='Only process this asset (can be given several times)'
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            help='Process at most this many assets'
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Recompute waveforms that already exist'
+        )
+
+    def handle(self, *args, **options):
+        assets = MediaAsset.objects.filter(asset_type='audio', is_active=True).order_by('pk')
+        if options['asset_ids']:
+            assets = assets.filter(pk__in=options['asset_ids'])
+        if not options['force']:
+            assets = assets.filter(waveform__isnull=True)
+        if options['limit'] is not None:
+            if options['limit'] < 1:
+                raise CommandError('--limit must be positive')
+            assets = assets[:options['limit']]
+
+        storage = None
+        computed = failed = 0
+        for asset in assets.iterator():
+            if not asset.file and not asset.supabase_path:
+                continue
+            if not asset.file and storage is None:
+                storage = get_storage()
+            try:
+                self._compute(asset, storage)
+                computed += 1
+            except Exception as e:
+                failed += 1
+                self.stderr.write(f'Asset {asset.pk} ({asset.name}): {e}')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Computed {computed} waveforms, {failed} failed'
+        ))
+
+    def _compute(self, asset: MediaAsset, storage: SupabaseStorage) -> None:
+        """Decode one asset, store its peaks and drop the cached payload."""
+        with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE) as audio_file:
+            fetch_asset(asset, audio_file, storage)
+            audio_file.seek(0)
+            try:
+                waveform = compute_waveform(audio_file)
+            except (UnsupportedAudioFormat, EOFError) as e:
+                raise CommandError(f'Cannot decode audio: {e}')
+
+        MediaWaveform.objects.update_or_create(
+            asset=asset,
+            defaults={
+                'peaks': encode_waveform(waveform),
+                'sample_rate': waveform.sample_rate,
+                'channels': waveform.channels,
+                'samples_per_peak': waveform.samples_per_peak,
+            }
+        )
+        # Update in the database so MediaAsset.save() does not re-upload local files
+        MediaAsset.objects.filter(pk=asset.pk, duration_seconds__isnull=True).update(
+            duration_seconds=round(waveform.duration_seconds)
+        )
+        cache.delete(f'waveform:{asset.pk}')
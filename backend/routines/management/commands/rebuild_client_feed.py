@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand, CommandError
+from routines.feed import rebuild_feed
+from users.models import UserProfile
+
+class Command(BaseCommand):
+    help = 'Recompute clients\' content feeds from their relationships and assignments'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--client-id',
+            type=int,
+            help='Only rebuild the feed of this client profile'
+        )
+
+    def handle(self, *args, **options):
+        client = None
+        if options['client_id'] is not None:
+            try:
+                client = UserProfile.objects.get(pk=options['client_id'])
+            except UserProfile.DoesNotExist:
+                raise CommandError(f"Client profile {options['client_id']} does not exist")
+
+        rows = rebuild_feed(client)
+        self.stdout.write(self.style.SUCCESS(f'Updated {rows} feed entries'))
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand, CommandError
+from routines.usage import rebuild_usage
+from users.models import UserProfile
+
+class Command(BaseCommand):
+    help = 'Recompute instructors\' storage usage totals from their media assets'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--instructor-id',
+            type=int,
+            help='Only rebuild the totals of this instructor profile'
+        )
+
+    def handle(self, *args, **options):
+        instructor = None
+        if options['instructor_id'] is not None:
+            try:
+                instructor = UserProfile.objects.get(pk=options['instructor_id'])
+            except UserProfile.DoesNotExist:
+                raise CommandError(f"Instructor profile {options['instructor_id']} does not exist")
+
+        rows = rebuild_usage(instructor)
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {rows} usage totals'))
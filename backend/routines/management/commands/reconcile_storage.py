@@ -0,0 +1,180 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from datetime import timedelta
+from typing import Dict, Iterator, List, Optional, Tuple
+from core.storage import SupabaseStorage, get_storage
+from routines.models import MediaAsset
+import json
+import os
+
+class Command(BaseCommand):
+    help = (
+        'Find storage objects under {instructor_id}/{asset_type}/ that no MediaAsset '
+        'references, and report or delete them'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--delete',
+            action='store_true',
+            help='Delete orphaned objects (default is to only report them)'
+        )
+        parser.add_argument(
+            '--page-size',
+            type=int,
+            default=500,
+            help='Number of storage entries listed and compared per page'
+        )
+        parser.add_argument(
+            '--min-age-hours',
+            type=int,
+            default=24,
+            help='Ignore objects younger than this, so in-flight direct uploads are kept'
+        )
+        parser.add_argument(
+            '--checkpoint',
+            default=os.path.join(settings.BASE_DIR, '.reconcile_storage_checkpoint.json'),
+            help='File used to record progress so an interrupted run can resume'
+        )
+        parser.add_argument(
+            '--restart',
+            action='store_true',
+            help='Ignore any existing checkpoint and start from the beginning'
+        )
+
+    def handle(self, *args, **options):
+        page_size = options['page_size']
+        if page_size < 1:
+            raise CommandError('--page-size must be positive')
+
+        delete = options['delete']
+        checkpoint_path = options['checkpoint']
+        cutoff = timezone.now() - timedelta(hours=options['min_age_hours'])
+
+        storage = get_storage()
+        checkpoint = None if options['restart'] else self._load_checkpoint(checkpoint_path, storage.bucket_name)
+        if checkpoint:
+            self.stdout.write(f"Resuming from {checkpoint['prefix']} at offset {checkpoint['offset']}")
+
+        totals = {'scanned': 0, 'orphans': 0, 'orphan_bytes': 0, 'deleted': 0}
+
+        for prefix in self._iter_prefixes(storage, page_size):
+            offset = 0
+            if checkpoint:
+                if self._prefix_key(prefix) < self._prefix_key(checkpoint['prefix']):
+                    continue
+                if prefix == checkpoint['prefix']:
+                    offset = checkpoint['offset']
+                checkpoint = None
+
+            while True:
+                entries = storage.list_files(prefix, limit=page_size, offset=offset)
+                if not entries:
+                    break
+
+                files = [entry for entry in entries if entry.get('id') is not None]
+                orphans = self._find_orphans(prefix, files, cutoff)
+                totals['scanned'] += len(files)
+                totals['orphans'] += len(orphans)
+                totals['orphan_bytes'] += sum(size for _, size in orphans)
+
+                for path, size in orphans:
+                    self.stdout.write(f"{'Deleting' if delete else 'Orphan'}: {path} ({size} bytes)")
+
+                deleted = 0
+                if delete and orphans:
+                    if storage.delete_files([path for path, _ in orphans]):
+                        deleted = len(orphans)
+                    else:
+                        self.stdout.write(self.style.ERROR(f'Failed to delete orphans under {prefix}'))
+                totals['deleted'] += deleted
+
+                # Deleted objects no longer occupy a slot in the name-ordered
+                # listing, so the next page starts that many entries earlier.
+                offset += len(entries) - deleted
+                self._save_checkpoint(checkpoint_path, storage.bucket_name, prefix, offset)
+
+                if len(entries) < page_size:
+                    break
+
+        self._clear_checkpoint(checkpoint_path)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Scanned {totals['scanned']} objects, found {totals['orphans']} orphans "
+            f"({totals['orphan_bytes']} bytes), deleted {totals['deleted']}"
+        ))
+
+    def _iter_prefixes(self, storage: SupabaseStorage, page_size: int) -> Iterator[str]:
+        """Yield ``{instructor_id}/{asset_type}/`` prefixes in a stable order."""
+        instructor_ids = sorted(
+            int(name) for name in self._iter_folder_names(storage, '', page_size) if name.isdigit()
+        )
+        for instructor_id in instructor_ids:
+            asset_types = sorted(self._iter_folder_names(storage, f'{instructor_id}/', page_size))
+            for asset_type in asset_types:
+                yield f'{instructor_id}/{asset_type}/'
+
+    def _iter_folder_names(self, storage: SupabaseStorage, prefix: str, page_size: int) -> Iterator[str]:
+        """Yield the names of folders directly under a prefix."""
+        offset = 0
+        while True:
+            entries = storage.list_files(prefix, limit=page_size, offset=offset)
+            for entry in entries:
+                if entry.get('id') is None:
+                    yield entry['name']
+            if len(entries) < page_size:
+                return
+            offset += len(entries)
+
+    def _find_orphans(self, prefix: str, files: List[Dict], cutoff) -> List[Tuple[str, int]]:
+        """Return ``(path, size)`` for old enough files in a page with no MediaAsset."""
+        paths = [f"{prefix}{entry['name']}" for entry in files]
+        known = set(
+            MediaAsset.objects.filter(supabase_path__in=paths).values_list('supabase_path', flat=True)
+        )
+
+        orphans = []
+        for path, entry in zip(paths, files):
+            if path in known:
+                continue
+            created_at = parse_datetime(entry.get('created_at') or '')
+            if created_at and created_at > cutoff:
+                continue
+            size = (entry.get('metadata') or {}).get('size', 0)
+            orphans.append((path, size))
+        return orphans
+
+    def _prefix_key(self, prefix: str) -> Tuple[int, str]:
+        """Sort key matching the order prefixes are visited in."""
+        instructor_id, asset_type = prefix.strip('/').split('/', 1)
+        return int(instructor_id), asset_type
+
+    def _load_checkpoint(self, path: str, bucket: str) -> Optional[Dict]:
+        """Load a checkpoint for this bucket, if one exists."""
+        try:
+            with open(path) as f:
+                checkpoint = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, json.JSONDecodeError) as e:
+            raise CommandError(f'Unreadable checkpoint {path}: {str(e)}')
+
+        if checkpoint.get('bucket') != bucket:
+            return None
+        return checkpoint
+
+    def _save_checkpoint(self, path: str, bucket: str, prefix: str, offset: int) -> None:
+        """Atomically record the position of the next page to process."""
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'bucket': bucket, 'prefix': prefix, 'offset': offset}, f)
+        os.replace(tmp_path, path)
+
+    def _clear_checkpoint(self, path: str) -> None:
+        """Remove the checkpoint after a complete run."""
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
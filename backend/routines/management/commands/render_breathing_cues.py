@@ -0,0 +1,56 @@
+from django.core.management.base import BaseCommand, CommandError
+from core.storage import get_storage
+from routines.models import BreathingExercise
+from routines.renders import find_breathing_cue_track, get_breathing_cue_track
+
+class Command(BaseCommand):
+    help = (
+        'Render audio cue tracks for breathing exercises '
+        'whose current pattern has not been rendered yet'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--exercise-id',
+            type=int,
+            action='append',
+            dest='exercise_ids',
+            help='Only process this exercise (can be given several times)'
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            help='Render at most this many cue tracks'
+        )
+
+    def handle(self, *args, **options):
+        limit = options['limit']
+        if limit is not None and limit < 1:
+            raise CommandError('--limit must be positive')
+
+        exercises = BreathingExercise.objects.filter(is_active=True, has_audio_cue=True).order_by('pk')
+        if options['exercise_ids']:
+            exercises = exercises.filter(pk__in=options['exercise_ids'])
+
+        storage = None
+        rendered = failed = 0
+        for exercise in exercises.iterator():
+            if limit is not None and rendered >= limit:
+                break
+            # Exercises with the same pattern share one track
+            if find_breathing_cue_track(exercise):
+                continue
+            storage = storage or get_storage()
+            try:
+                get_breathing_cue_track(exercise, storage)
+                rendered += 1
+            except ValueError as e:
+                failed += 1
+                self.stderr.write(f'Exercise {exercise.pk} ({exercise.name}): invalid pattern: {e}')
+            except Exception as e:
+                failed += 1
+                self.stderr.write(f'Exercise {exercise.pk} ({exercise.name}): {e}')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Rendered {rendered} breathing cue tracks, {failed} failed'
+        ))
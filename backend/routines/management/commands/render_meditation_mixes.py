@@ -0,0 +1,60 @@
+from django.core.management.base import BaseCommand, CommandError
+from core.storage import get_storage
+from routines.audio import UnsupportedAudioFormat
+from routines.models import MeditationSession
+from routines.renders import find_meditation_mix, get_meditation_mix
+
+class Command(BaseCommand):
+    help = (
+        'Pre-mix guided audio over background audio for meditation sessions '
+        'whose current tracks have not been mixed yet'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--session-id',
+            type=int,
+            action='append',
+            dest='session_ids',
+            help='Only process this session (can be given several times)'
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            help='Render at most this many mixes'
+        )
+
+    def handle(self, *args, **options):
+        limit = options['limit']
+        if limit is not None and limit < 1:
+            raise CommandError('--limit must be positive')
+
+        sessions = MeditationSession.objects.filter(
+            is_active=True,
+            guided_audio__isnull=False,
+            background_audio__isnull=False
+        ).select_related('guided_audio', 'background_audio').order_by('pk')
+        if options['session_ids']:
+            sessions = sessions.filter(pk__in=options['session_ids'])
+
+        storage = None
+        rendered = failed = 0
+        for session in sessions.iterator():
+            if limit is not None and rendered >= limit:
+                break
+            if find_meditation_mix(session):
+                continue
+            storage = storage or get_storage()
+            try:
+                get_meditation_mix(session, storage)
+                rendered += 1
+            except (UnsupportedAudioFormat, EOFError) as e:
+                failed += 1
+                self.stderr.write(f'Session {session.pk} ({session.name}): cannot mix audio: {e}')
+            except Exception as e:
+                failed += 1
+                self.stderr.write(f'Session {session.pk} ({session.name}): {e}')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Rendered {rendered} meditation mixes, {failed} failed'
+        ))
@@ -0,0 +1,121 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from datetime import timedelta
+from core.storage import get_storage
+from routines.models import UploadProgress
+from typing import List, Tuple
+
+ACTIVE_STATUSES = ['pending', 'uploading']
+FINISHED_STATUSES = ['completed', 'failed']
+
+class Command(BaseCommand):
+    help = (
+        'Mark expired pending uploads as failed, delete their partial objects, '
+        'and remove finished upload progress rows past the retention window'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--retention-days',
+            type=int,
+            default=settings.UPLOAD_PROGRESS_RETENTION_DAYS,
+            help='Delete completed and failed rows not updated for this many days'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=500,
+            help='Rows updated or deleted per statement'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report what would be swept'
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        if chunk_size < 1:
+            raise CommandError('--chunk-size must be positive')
+
+        now = timezone.now()
+        expired = self._expire_pending(now, chunk_size, options['dry_run'])
+        removed = self._remove_finished(
+            now - timedelta(days=options['retention_days']),
+            chunk_size,
+            options['dry_run']
+        )
+
+        verb = 'Would sweep' if options['dry_run'] else 'Swept'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} {expired} expired uploads and {removed} finished rows'
+        ))
+
+    def _expire_pending(self, now, chunk_size: int, dry_run: bool) -> int:
+        """Fail uploads whose signed URL expired, one primary key range at a time."""
+        # Rows created before expires_at was recorded fall back to the policy lifetime.
+        legacy_cutoff = now - timedelta(seconds=settings.UPLOAD_POLICY_EXPIRATION)
+        expired = UploadProgress.objects.filter(status__in=ACTIVE_STATUSES).filter(
+            Q(expires_at__lt=now) | Q(expires_at__isnull=True, created_at__lt=legacy_cutoff)
+        ).order_by('pk')
+
+        storage = None
+        total = 0
+        last_pk = 0
+        while True:
+            batch = list(expired.filter(pk__gt=last_pk).values_list('pk', 'file_path')[:chunk_size])
+            if not batch:
+                return total
+
+            last_pk = batch[-1][0]
+            if dry_run:
+                total += len(batch)
+                continue
+
+            failed = self._fail_batch([pk for pk, _ in batch], now)
+            total += len(failed)
+            paths = [path for _, path in failed if path]
+            if paths:
+                storage = storage or get_storage()
+                if not storage.delete_files(paths):
+                    self.stdout.write(self.style.WARNING(f'Could not delete {len(paths)} partial uploads'))
+
+    def _fail_batch(self, pks: List[int], now) -> List[Tuple[int, str]]:
+        """Fail the uploads among ``pks`` that are still active, returning their keys and paths.
+
+        The rows are locked and re-checked before anything is deleted, so an
+        upload that finished after the batch was selected keeps its object.
+        """
+        with transaction.atomic():
+            failed = list(
+                UploadProgress.objects.select_for_update()
+                .filter(pk__in=pks, status__in=ACTIVE_STATUSES)
+                .values_list('pk', 'file_path')
+            )
+            UploadProgress.objects.filter(pk__in=[pk for pk, _ in failed]).update(
+                status='failed',
+                error_message='Upload URL expired before the upload completed',
+                updated_at=now
+            )
+        return failed
+
+    def _remove_finished(self, cutoff, chunk_size: int, dry_run: bool) -> int:
+        """Delete finished rows older than ``cutoff`` in short, separate statements."""
+        finished = UploadProgress.objects.filter(
+            status__in=FINISHED_STATUSES,
+            updated_at__lt=cutoff
+        ).order_by('pk')
+
+        if dry_run:
+            return finished.count()
+
+        total = 0
+        while True:
+            pks = list(finished.values_list('pk', flat=True)[:chunk_size])
+            if not pks:
+                return total
+            UploadProgress.objects.filter(pk__in=pks).delete()
+            total += len(pks)
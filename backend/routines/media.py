@@ -0,0 +1,162 @@
+"""Helpers for reading the content of media assets."""
+from django.db.models import Q, QuerySet
+from typing import Any, BinaryIO, Callable, Dict, Iterable, List, Optional, Tuple
+from core.storage import SupabaseStorage, get_storage
+from users.models import UserProfile
+from .feed import visible_ids
+from .models import BreathingExercise, Exercise, MediaAsset, MeditationSession
+import hashlib
+
+# Downloads larger than this are spooled to disk instead of kept in memory
+SPOOL_MAX_SIZE = 8 * 1024 * 1024
+
+class _HashingWriter:
+    """File-like sink that only hashes what is written to it."""
+
+    def __init__(self):
+        self.digest = hashlib.sha256()
+
+    def write(self, data: bytes) -> int:
+        self.digest.update(data)
+        return len(data)
+
+def fetch_asset(asset: MediaAsset, fileobj: BinaryIO, storage: Optional[SupabaseStorage] = None) -> None:
+    """Copy an asset's content into ``fileobj`` from local media or storage."""
+    if asset.file:
+        with asset.file.open('rb') as source:
+            for chunk in source.chunks():
+                fileobj.write(chunk)
+    else:
+        (storage or get_storage()).download_to(asset.supabase_path, fileobj)
+
+def hash_content(fileobj: BinaryIO, chunk_size: int = 1024 * 1024) -> str:
+    """Return the hex SHA-256 of a file's remaining content."""
+    writer = _HashingWriter()
+    for chunk in iter(lambda: fileobj.read(chunk_size), b''):
+        writer.write(chunk)
+    return writer.digest.hexdigest()
+
+def hash_asset(asset: MediaAsset, storage: Optional[SupabaseStorage] = None) -> str:
+    """Return the hex SHA-256 of an asset's content, streaming it without storing it."""
+    writer = _HashingWriter()
+    fetch_asset(asset, writer, storage)
+    return writer.digest.hexdigest()
+
+def readable_media(user: UserProfile) -> QuerySet:
+    """Return the active assets a user may download.
+
+    Instructors and admins read their own assets. Clients read the media of
+    the content in their feed, including what its combined routines contain.
+    Membership is resolved with subqueries over the feed and the many-to-many
+    tables, so the whole set is read in a single query.
+    """
+    if user.role in ['instructor', 'admin']:
+        return MediaAsset.objects.filter(instructor=user, is_active=True)
+    combined = visible_ids(user, 'combined')
+    exercise_media = Exercise.media_assets.through.objects.filter(
+        Q(exercise__routine_id__in=visible_ids(user, 'routine'))
+        | Q(exercise__routine__combined_routines__in=combined)
+    ).values('mediaasset_id')
+    breathing_media = BreathingExercise.media_assets.through.objects.filter(
+        Q(breathingexercise_id__in=visible_ids(user, 'breathing'))
+        | Q(breathingexercise__combined_routines__in=combined)
+    ).values('mediaasset_id')
+    sessions = MeditationSession.objects.filter(
+        Q(id__in=visible_ids(user, 'meditation')) | Q(combined_routines__in=combined)
+    )
+    return MediaAsset.objects.filter(
+        Q(pk__in=exercise_media)
+        | Q(pk__in=breathing_media)
+        | Q(pk__in=sessions.values('guided_audio_id'))
+        | Q(pk__in=sessions.values('background_audio_id')),
+        is_active=True
+    )
+
+def build_media_manifest(
+    client: UserProfile,
+    local_url: Callable[[int], str],
+    storage: Optional[SupabaseStorage] = None,
+    expires_in: int = 3600
+) -> List[Dict[str, Any]]:
+    """List a client's assets with content hashes, sizes and download URLs.
+
+    Assets kept in storage get signed URLs, signed together in one request.
+    Local files get ``local_url(asset_id)``. An asset not yet hashed has an
+    empty ``content_hash`` and a missing URL is ``None``.
+    """
+    rows = list(readable_media(client).order_by('pk').values(
+        'id', 'asset_type', 'content_hash', 'file_size', 'duration_seconds', 'file', 'supabase_path'
+    ))
+    remote = [row['supabase_path'] for row in rows if not row['file'] and row['supabase_path']]
+    urls = (storage or get_storage()).get_signed_urls(remote, expires_in) if remote else {}
+    return [
+        {
+            'id': row['id'],
+            'asset_type': row['asset_type'],
+            'content_hash': row['content_hash'],
+            'file_size': row['file_size'],
+            'duration_seconds': row['duration_seconds'],
+            'url': local_url(row['id']) if row['file'] else urls.get(row['supabase_path']),
+        }
+        for row in rows
+    ]
+
+def find_references(asset_ids: Iterable[int]) -> Dict[int, Dict[str, List[int]]]:
+    """Return, for each asset, the IDs of the exercises and sessions using it.
+
+    References from every relation are resolved for the whole batch in three
+    queries, whatever the number of assets. Unused assets map to empty lists.
+    """
+    references = {
+        asset_id: {'exercises': [], 'breathing_exercises': [], 'meditation_sessions': []}
+        for asset_id in asset_ids
+    }
+    if not references:
+        return references
+
+    exercise_links = Exercise.media_assets.through.objects.filter(
+        mediaasset_id__in=references
+    ).values_list('mediaasset_id', 'exercise_id')
+    for asset_id, exercise_id in exercise_links:
+        references[asset_id]['exercises'].append(exercise_id)
+
+    breathing_links = BreathingExercise.media_assets.through.objects.filter(
+        mediaasset_id__in=references
+    ).values_list('mediaasset_id', 'breathingexercise_id')
+    for asset_id, exercise_id in breathing_links:
+        references[asset_id]['breathing_exercises'].append(exercise_id)
+
+    sessions = MeditationSession.objects.filter(
+        Q(guided_audio_id__in=references) | Q(background_audio_id__in=references)
+    ).values_list('id', 'guided_audio_id', 'background_audio_id')
+    for session_id, guided_id, background_id in sessions:
+        for asset_id in {guided_id, background_id} & references.keys():
+            references[asset_id]['meditation_sessions'].append(session_id)
+    return references
+
+def is_referenced(references: Dict[str, List[int]]) -> bool:
+    """Return whether a ``find_references`` entry has any references."""
+    return any(references.values())
+
+def delete_assets(assets: QuerySet, storage: Optional[SupabaseStorage] = None) -> Tuple[List[int], List[int]]:
+    """Delete assets and their stored files in bulk.
+
+    Stored files are removed in one storage request rather than one per asset.
+    If that request fails, assets with stored files are kept, so no row is
+    left pointing at nothing and the deletion can be retried. Exercise links
+    are removed and session tracks cleared by the database cascade, so
+    callers decide beforehand whether references may be dropped.
+
+    Returns:
+        The IDs of the deleted assets and of those kept because their files
+        could not be deleted
+    """
+    rows = list(assets.values_list('pk', 'supabase_path'))
+    paths = [path for _, path in rows if path]
+    if paths and not (storage or get_storage()).delete_files(paths):
+        deleted = [pk for pk, path in rows if not path]
+        failed = [pk for pk, path in rows if path]
+    else:
+        deleted, failed = [pk for pk, _ in rows], []
+    MediaAsset.objects.filter(pk__in=deleted).delete()
+    return deleted, failed
@@ -0,0 +1,42 @@
+# Generated by Django 5.0.2 on 2026-10-19 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("routines", "0006_alter_breathingexercise_options_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="uploadprogress",
+            name="expires_at",
+            field=models.DateTimeField(
+                blank=True, help_text="When the signed upload URL expires", null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="uploadprogress",
+            name="file_path",
+            field=models.CharField(
+                blank=True,
+                default="",
+                help_text="Storage path the upload is written to",
+                max_length=255,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="uploadprogress",
+            index=models.Index(
+                fields=["status", "expires_at"], name="routines_up_status_a75540_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="uploadprogress",
+            index=models.Index(
+                fields=["status", "updated_at"], name="routines_up_status_010bd4_idx"
+            ),
+        ),
+    ]
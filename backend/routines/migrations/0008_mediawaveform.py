@@ -0,0 +1,51 @@
+# Generated by Django 5.0.2 on 2026-10-19 17:57
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("routines", "0007_uploadprogress_file_path_expires_at"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MediaWaveform",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "peaks",
+                    models.BinaryField(
+                        help_text="Multi-resolution min/max peaks in the routines.audio sidecar format"
+                    ),
+                ),
+                ("sample_rate", models.PositiveIntegerField()),
+                ("channels", models.PositiveSmallIntegerField()),
+                (
+                    "samples_per_peak",
+                    models.PositiveIntegerField(
+                        help_text="Frames covered by one peak at the finest level"
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "asset",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="waveform",
+                        to="routines.mediaasset",
+                    ),
+                ),
+            ],
+        ),
+    ]
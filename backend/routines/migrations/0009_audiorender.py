@@ -0,0 +1,52 @@
+# Generated by Django 5.0.2 on 2026-10-19 18:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("routines", "0008_mediawaveform"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AudioRender",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[("breathing_cues", "Breathing Cue Track")],
+                        max_length=32,
+                    ),
+                ),
+                (
+                    "render_key",
+                    models.CharField(
+                        help_text="Hash of the render inputs",
+                        max_length=64,
+                        unique=True,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "asset",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="render",
+                        to="routines.mediaasset",
+                    ),
+                ),
+            ],
+        ),
+    ]
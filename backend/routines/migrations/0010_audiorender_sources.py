@@ -0,0 +1,41 @@
+# Generated by Django 5.0.2 on 2026-10-19 18:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("routines", "0009_audiorender"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="audiorender",
+            name="params",
+            field=models.JSONField(
+                default=dict, help_text="Inputs the render was made from"
+            ),
+        ),
+        migrations.AddField(
+            model_name="audiorender",
+            name="sources",
+            field=models.ManyToManyField(
+                blank=True,
+                help_text="Assets mixed into the render; changing one invalidates it",
+                related_name="derived_renders",
+                to="routines.mediaasset",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="audiorender",
+            name="kind",
+            field=models.CharField(
+                choices=[
+                    ("breathing_cues", "Breathing Cue Track"),
+                    ("meditation_mix", "Meditation Mix"),
+                ],
+                max_length=32,
+            ),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.0.2 on 2026-10-19 18:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("routines", "0010_audiorender_sources"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="mediaasset",
+            name="content_hash",
+            field=models.CharField(
+                blank=True,
+                default="",
+                help_text="SHA-256 of the file content",
+                max_length=64,
+            ),
+        ),
+    ]
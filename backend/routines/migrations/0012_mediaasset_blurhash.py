@@ -0,0 +1,23 @@
+# Generated by Django 5.0.2 on 2026-10-19 18:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("routines", "0011_mediaasset_content_hash"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="mediaasset",
+            name="blurhash",
+            field=models.CharField(
+                blank=True,
+                default="",
+                help_text="BlurHash placeholder for images",
+                max_length=64,
+            ),
+        ),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 5.0.2 on 2026-10-19 18:14
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("routines", "0012_mediaasset_blurhash"),
+        ("users", "0002_userprofile_phone_userprofile_preferences"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="mediaasset",
+            name="instructor",
+            field=models.ForeignKey(
+                blank=True,
+                help_text="Owner whose storage quota the asset counts against; empty for shared renders",
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="media_assets",
+                to="users.userprofile",
+            ),
+        ),
+        migrations.CreateModel(
+            name="StorageUsage",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "asset_type",
+                    models.CharField(
+                        choices=[
+                            ("image", "Image"),
+                            ("video", "Video"),
+                            ("audio", "Audio"),
+                        ],
+                        max_length=16,
+                    ),
+                ),
+                ("total_bytes", models.BigIntegerField(default=0)),
+                ("asset_count", models.IntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "instructor",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="storage_usage",
+                        to="users.userprofile",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("instructor", "asset_type")},
+            },
+        ),
+    ]
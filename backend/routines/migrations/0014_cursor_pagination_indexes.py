@@ -0,0 +1,48 @@
+# Generated by Django 5.0.2 on 2026-10-19 18:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("routines", "0013_storage_usage"),
+        ("users", "0002_userprofile_phone_userprofile_preferences"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="clientachievement",
+            index=models.Index(
+                fields=["client", "-earned_at", "-id"],
+                name="routines_cl_client__df60f2_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="exerciseprogress",
+            index=models.Index(
+                fields=["client", "-completed_at", "-id"],
+                name="routines_ex_client__827ec7_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="mediaasset",
+            index=models.Index(
+                fields=["instructor", "-created_at", "-id"],
+                name="routines_me_instruc_f6b7f6_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="routine",
+            index=models.Index(
+                fields=["instructor", "-created_at", "-id"],
+                name="routines_ro_instruc_55925a_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="uploadprogress",
+            index=models.Index(
+                fields=["-created_at", "-id"], name="routines_up_created_28c8ff_idx"
+            ),
+        ),
+    ]
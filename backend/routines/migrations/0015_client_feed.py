@@ -0,0 +1,60 @@
+# Generated by Django 5.0.2 on 2026-10-19 18:25
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("routines", "0014_cursor_pagination_indexes"),
+        ("users", "0002_userprofile_phone_userprofile_preferences"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ClientFeedItem",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "content_type",
+                    models.CharField(
+                        choices=[
+                            ("routine", "Routine"),
+                            ("breathing", "Breathing Exercise"),
+                            ("meditation", "Meditation Session"),
+                            ("combined", "Combined Routine"),
+                        ],
+                        max_length=16,
+                    ),
+                ),
+                ("object_id", models.PositiveIntegerField()),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "client",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="feed_items",
+                        to="users.userprofile",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["content_type", "object_id"],
+                        name="routines_cl_content_e78ff8_idx",
+                    )
+                ],
+                "unique_together": {("client", "content_type", "object_id")},
+            },
+        ),
+    ]
@@ -0,0 +1,44 @@
+from django.db import migrations
+
+INSTRUCTOR_CONTENT = {
+    "breathing": "BreathingExercise",
+    "meditation": "MeditationSession",
+    "combined": "CombinedRoutine",
+}
+
+
+def backfill_feed(apps, schema_editor):
+    """Fill every client's feed from existing relationships, as routines.feed.rebuild_feed does."""
+    ClientFeedItem = apps.get_model("routines", "ClientFeedItem")
+    Relationship = apps.get_model("routines", "ClientInstructorRelationship")
+
+    assignments = Relationship.routines.through.objects.filter(
+        routine__is_active=True
+    ).values_list("clientinstructorrelationship__client_id", "routine_id")
+    visible = {(client_id, "routine", routine_id) for client_id, routine_id in assignments}
+    for content_type, model_name in INSTRUCTOR_CONTENT.items():
+        rows = apps.get_model("routines", model_name).objects.filter(
+            instructor__instructor_relationships__isnull=False,
+            is_active=True
+        ).values_list("instructor__instructor_relationships__client_id", "pk")
+        visible.update((client_id, content_type, object_id) for client_id, object_id in rows)
+
+    ClientFeedItem.objects.bulk_create(
+        (
+            ClientFeedItem(client_id=client_id, content_type=content_type, object_id=object_id)
+            for client_id, content_type, object_id in visible
+        ),
+        batch_size=1000,
+        ignore_conflicts=True
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("routines", "0015_client_feed"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_feed, migrations.RunPython.noop),
+    ]
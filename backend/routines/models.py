@@ -4,6 +4,7 @@ from typing import Optional
 from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.core.validators import FileExtensionValidator
+from core.images import image_placeholder
 from core.storage import SupabaseStorage
 import os
 import json
@@ -34,12 +35,22 @@ class MediaAsset(models.Model):
     
     name = models.CharField(max_length=128)
     asset_type = models.CharField(max_length=16, choices=ASSET_TYPE_CHOICES)
+    instructor = models.ForeignKey(
+        UserProfile,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="media_assets",
+        help_text="Owner whose storage quota the asset counts against; empty for shared renders"
+    )
     file = models.FileField(upload_to='media_assets/', blank=True, null=True)
     thumbnail_url = models.URLField(blank=True, default="", help_text="URL for video thumbnail or image preview")
     file_size = models.PositiveIntegerField(help_text="File size in bytes")
     duration_seconds = models.PositiveIntegerField(null=True, blank=True, help_text="Duration for video/audio in seconds")
     supabase_path = models.CharField(max_length=255, help_text="Path in Supabase storage", blank=True, null=True)
     supabase_bucket = models.CharField(max_length=64, help_text="Supabase bucket name", blank=True, null=True)
+    content_hash = models.CharField(max_length=64, blank=True, default="", help_text="SHA-256 of the file content")
+    blurhash = models.CharField(max_length=64, blank=True, default="", help_text="BlurHash placeholder for images")
     created_at = models.DateTimeField(auto_now_add=True)
     is_active = models.BooleanField(default=True)
     
@@ -75,11 +86,16 @@ class MediaAsset(models.Model):
                 
                 # Upload file
                 with self.file.open('rb') as f:
-                    supabase.storage.from_(self.supabase_bucket).upload(
-                        self.supabase_path,
-                        f.read(),
-                        {"content-type": self.file.content_type}
-                    )
+                    file_data = f.read()
+                supabase.storage.from_(self.supabase_bucket).upload(
+                    self.supabase_path,
+                    file_data,
+                    {"content-type": self.file.content_type}
+                )
+                
+                # Placeholder shown while the image loads
+                if self.asset_type == 'image' and not self.blurhash:
+                    self.blurhash = image_placeholder(file_data) or ""
                 
                 # Generate thumbnail for videos
                 if self.asset_type == 'video' and not self.thumbnail_url:
@@ -111,6 +127,61 @@ class MediaAsset(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['instructor', '-created_at', '-id']),
+        ]
+
+class MediaWaveform(models.Model):
+    """Precomputed waveform peaks for an audio asset, used to draw player scrubbers."""
+    asset = models.OneToOneField(MediaAsset, on_delete=models.CASCADE, related_name="waveform")
+    peaks = models.BinaryField(help_text="Multi-resolution min/max peaks in the routines.audio sidecar format")
+    sample_rate = models.PositiveIntegerField()
+    channels = models.PositiveSmallIntegerField()
+    samples_per_peak = models.PositiveIntegerField(help_text="Frames covered by one peak at the finest level")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self) -> str:
+        return f"Waveform for {self.asset.name}"
+
+class AudioRender(models.Model):
+    """Server-rendered audio, shared by everything that renders from the same inputs."""
+    KIND_CHOICES = [
+        ('breathing_cues', 'Breathing Cue Track'),
+        ('meditation_mix', 'Meditation Mix'),
+    ]
+
+    kind = models.CharField(max_length=32, choices=KIND_CHOICES)
+    render_key = models.CharField(max_length=64, unique=True, help_text="Hash of the render inputs")
+    params = models.JSONField(default=dict, help_text="Inputs the render was made from")
+    asset = models.OneToOneField(MediaAsset, on_delete=models.CASCADE, related_name="render")
+    sources = models.ManyToManyField(
+        MediaAsset,
+        blank=True,
+        related_name="derived_renders",
+        help_text="Assets mixed into the render; changing one invalidates it"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self) -> str:
+        return f"{self.get_kind_display()} ({self.render_key[:12]})"
+
+class StorageUsage(models.Model):
+    """Running totals of an instructor's stored media for one asset type.
+
+    Kept up to date as assets are created and deleted, so quota checks and
+    reports read a few rows instead of summing every asset.
+    """
+    instructor = models.ForeignKey(UserProfile, on_delete=models.CASCADE, related_name="storage_usage")
+    asset_type = models.CharField(max_length=16, choices=MediaAsset.ASSET_TYPE_CHOICES)
+    total_bytes = models.BigIntegerField(default=0)
+    asset_count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ("instructor", "asset_type")
+
+    def __str__(self) -> str:
+        return f"{self.instructor.email}: {self.asset_count} {self.asset_type} ({self.total_bytes} bytes)"
 
 class Routine(models.Model):
     """Yoga routine created by an instructor and assigned to clients."""
@@ -121,6 +192,11 @@ class Routine(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     is_active = models.BooleanField(default=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['instructor', '-created_at', '-id']),
+        ]
+
     def __str__(self) -> str:
         return f"{self.name} (Instructor: {self.instructor.email})"
 
@@ -320,6 +396,34 @@ class ClientInstructorRelationship(models.Model):
     def __str__(self) -> str:
         return f"Client: {self.client.email} - Instructor: {self.instructor.email}"
 
+class ClientFeedItem(models.Model):
+    """One piece of content a client can currently see.
+
+    Denormalized from relationships, routine assignments and activation, and
+    kept up to date by signals, so a client's list of any content kind is a
+    single indexed lookup instead of a join through their relationships.
+    """
+    CONTENT_TYPE_CHOICES = [
+        ('routine', 'Routine'),
+        ('breathing', 'Breathing Exercise'),
+        ('meditation', 'Meditation Session'),
+        ('combined', 'Combined Routine'),
+    ]
+
+    client = models.ForeignKey(UserProfile, on_delete=models.CASCADE, related_name="feed_items")
+    content_type = models.CharField(max_length=16, choices=CONTENT_TYPE_CHOICES)
+    object_id = models.PositiveIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ("client", "content_type", "object_id")
+        indexes = [
+            models.Index(fields=['content_type', 'object_id']),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.client.email}: {self.content_type} {self.object_id}"
+
 class ExerciseProgress(models.Model):
     """Tracks client progress for any type of exercise."""
     client = models.ForeignKey(UserProfile, on_delete=models.CASCADE, related_name="exercise_progress")
@@ -338,6 +442,9 @@ class ExerciseProgress(models.Model):
             ('client', 'breathing_exercise', 'completed_at'),
             ('client', 'meditation_session', 'completed_at'),
         ]
+        indexes = [
+            models.Index(fields=['client', '-completed_at', '-id']),
+        ]
 
     def __str__(self) -> str:
         exercise_name = (
@@ -377,6 +484,9 @@ class ClientAchievement(models.Model):
 
     class Meta:
         unique_together = ('client', 'achievement')
+        indexes = [
+            models.Index(fields=['client', '-earned_at', '-id']),
+        ]
 
     def __str__(self) -> str:
         return f"{self.client.email} - {self.achievement.name} ({self.earned_at})"
@@ -396,6 +506,8 @@ class UploadProgress(models.Model):
     status = models.CharField(max_length=16, choices=STATUS_CHOICES, default='pending')
     progress = models.PositiveIntegerField(default=0, help_text="Upload progress percentage")
     error_message = models.TextField(blank=True, default="")
+    file_path = models.CharField(max_length=255, blank=True, default="", help_text="Storage path the upload is written to")
+    expires_at = models.DateTimeField(null=True, blank=True, help_text="When the signed upload URL expires")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -404,6 +516,11 @@ class UploadProgress(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'expires_at']),
+            models.Index(fields=['status', 'updated_at']),
+            models.Index(fields=['-created_at', '-id']),
+        ]
     
     @property
     def progress_percentage(self):
@@ -439,12 +556,8 @@ class UploadProgress(models.Model):
         return cls.objects.create(
             file_name=os.path.basename(policy['file_path']),
             asset_type=policy['asset_type'],
-            total_size=policy['max_size_bytes'],
-            metadata={
-                'content_type': policy['content_type'],
-                'bucket': policy['bucket'],
-                'expires_at': policy['expires_at']
-            }
+            file_path=policy['file_path'],
+            expires_at=policy['expires_at']
         )
     
     @classmethod
@@ -453,9 +566,5 @@ class UploadProgress(models.Model):
         return cls.objects.create(
             file_name=file_obj.name,
             asset_type=asset_type,
-            total_size=file_obj.size,
-            metadata={
-                'content_type': file_obj.content_type,
-                'upload_method': 'traditional'
-            }
-        ) 
\ No newline at end of file
+            status='uploading'
+        )
\ No newline at end of file
@@ -0,0 +1,55 @@
+"""
+Fast read path for exercise progress lists.
+
+``ExerciseProgressSerializer`` resolves each row's exercise name and type
+in Python through method fields, and ModelSerializer field dispatch
+dominates the cost of long progress histories. Here the name and type are
+computed by the database and rows are read with ``values()``. They are then
+shaped into exactly what the serializer would return, without building
+model instances or serializer fields per row.
+"""
+from django.db.models import Case, CharField, QuerySet, Value, When
+from django.db.models.functions import Coalesce
+from rest_framework.fields import DateTimeField
+from typing import Any, Dict, Iterable, List
+
+PROGRESS_COLUMNS = (
+    'id', 'client_id', 'exercise_id', 'breathing_exercise_id', 'meditation_session_id',
+    'exercise_name', 'exercise_type', 'completed_at', 'duration_seconds',
+    'notes', 'difficulty_rating', 'feedback',
+)
+
+def progress_values(queryset: QuerySet) -> QuerySet:
+    """Return progress rows as dicts with the exercise name and type annotated."""
+    return queryset.annotate(
+        exercise_name=Coalesce('exercise__name', 'breathing_exercise__name', 'meditation_session__name'),
+        exercise_type=Case(
+            When(exercise__isnull=False, then=Value('exercise')),
+            When(breathing_exercise__isnull=False, then=Value('breathing')),
+            When(meditation_session__isnull=False, then=Value('meditation')),
+            default=None,
+            output_field=CharField()
+        )
+    ).values(*PROGRESS_COLUMNS)
+
+def serialize_progress(rows: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Shape ``progress_values`` rows like ``ExerciseProgressSerializer(many=True).data``."""
+    # The serializer's own field, so timezone handling and formatting match
+    completed_at = DateTimeField().to_representation
+    return [
+        {
+            'id': row['id'],
+            'client': row['client_id'],
+            'exercise': row['exercise_id'],
+            'breathing_exercise': row['breathing_exercise_id'],
+            'meditation_session': row['meditation_session_id'],
+            'exercise_name': row['exercise_name'],
+            'exercise_type': row['exercise_type'],
+            'completed_at': completed_at(row['completed_at']),
+            'duration_seconds': row['duration_seconds'],
+            'notes': row['notes'],
+            'difficulty_rating': row['difficulty_rating'],
+            'feedback': row['feedback'],
+        }
+        for row in rows
+    ]
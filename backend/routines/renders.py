@@ -0,0 +1,172 @@
+"""
+Server-side audio renders stored as shared media assets.
+
+A render is identified by a hash of its kind and inputs, so every exercise or
+session with the same inputs reuses one stored file. Renders live under
+``shared/`` in storage, outside the per-instructor folders.
+"""
+from django.db import IntegrityError, transaction
+from typing import Any, BinaryIO, Callable, Dict, Iterable, Optional
+from core.storage import SupabaseStorage, get_storage
+from .audio import CUE_SAMPLE_RATE, write_breathing_cues, write_meditation_mix
+from .media import SPOOL_MAX_SIZE, fetch_asset, hash_asset, hash_content
+from .models import AudioRender, BreathingExercise, MediaAsset, MeditationSession
+import hashlib
+import json
+import os
+import tempfile
+
+# Bump to re-render everything after changing how audio is synthesized
+RENDER_VERSION = 1
+
+SHARED_RENDER_PREFIX = 'shared/renders'
+
+def render_key(kind: str, params: Dict[str, Any]) -> str:
+    """Hash a render's kind and inputs into a stable key."""
+    payload = json.dumps({'kind': kind, 'version': RENDER_VERSION, 'params': params}, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+def source_fingerprint(asset: MediaAsset) -> str:
+    """Identify the content of a source asset; replacing it changes the content hash."""
+    location = asset.supabase_path or (asset.file.name if asset.file else '')
+    return f'{asset.pk}:{location}:{asset.file_size}:{asset.content_hash}'
+
+def find_render(kind: str, params: Dict[str, Any]) -> Optional[MediaAsset]:
+    """Return the already rendered asset for ``params``, if there is one."""
+    render = AudioRender.objects.select_related('asset').filter(render_key=render_key(kind, params)).first()
+    return render.asset if render else None
+
+def get_or_render(
+    kind: str,
+    params: Dict[str, Any],
+    render: Callable[[BinaryIO], float],
+    name: str,
+    storage: Optional[SupabaseStorage] = None,
+    sources: Iterable[MediaAsset] = ()
+) -> MediaAsset:
+    """Return the asset rendered from ``params``, rendering and uploading it if needed.
+
+    Args:
+        kind: One of ``AudioRender.KIND_CHOICES``
+        params: JSON-serializable render inputs
+        render: Writes the WAV file to the given file object and returns its duration
+        name: Display name for a newly created asset
+        storage: Storage client to upload with
+        sources: Assets the render is made from
+    """
+    key = render_key(kind, params)
+    existing = AudioRender.objects.select_related('asset').filter(render_key=key).first()
+    if existing:
+        return existing.asset
+
+    storage = storage or get_storage()
+    file_path = f'{SHARED_RENDER_PREFIX}/{kind}/{key}.wav'
+    # Render to disk and upload from the path, so long renders never sit in memory
+    with tempfile.NamedTemporaryFile(suffix='.wav') as rendered:
+        duration = render(rendered)
+        rendered.flush()
+        file_size = os.path.getsize(rendered.name)
+        rendered.seek(0)
+        content_hash = hash_content(rendered)
+        # Concurrent renders of the same inputs write identical bytes to the same path
+        storage.put_file(file_path, rendered.name, 'audio/wav', upsert=True)
+
+    try:
+        with transaction.atomic():
+            asset = MediaAsset.objects.create(
+                name=name,
+                asset_type='audio',
+                file_size=file_size,
+                content_hash=content_hash,
+                duration_seconds=round(duration),
+                supabase_path=file_path,
+                supabase_bucket=storage.bucket_name
+            )
+            AudioRender.objects.create(kind=kind, render_key=key, params=params, asset=asset).sources.set(sources)
+    except IntegrityError:
+        return AudioRender.objects.select_related('asset').get(render_key=key).asset
+    return asset
+
+def breathing_cue_params(exercise: BreathingExercise) -> Dict[str, Any]:
+    """Render inputs of an exercise's cue track."""
+    return {
+        'inhale': exercise.inhale_duration,
+        'hold': exercise.hold_duration,
+        'exhale': exercise.exhale_duration,
+        'cycles': exercise.cycles,
+        'style': exercise.cue_style,
+        'sample_rate': CUE_SAMPLE_RATE,
+    }
+
+def get_breathing_cue_track(exercise: BreathingExercise, storage: Optional[SupabaseStorage] = None) -> MediaAsset:
+    """Return the cue track for an exercise's breathing pattern."""
+    params = breathing_cue_params(exercise)
+    return get_or_render(
+        'breathing_cues',
+        params,
+        lambda fileobj: write_breathing_cues(
+            fileobj,
+            params['inhale'],
+            params['hold'],
+            params['exhale'],
+            params['cycles'],
+            params['style'],
+            params['sample_rate']
+        ),
+        f"Breathing cues {params['inhale']}-{params['hold']}-{params['exhale']} x{params['cycles']}",
+        storage
+    )
+
+def find_breathing_cue_track(exercise: BreathingExercise) -> Optional[MediaAsset]:
+    """Return the exercise's cue track if it has been rendered for its current pattern."""
+    return find_render('breathing_cues', breathing_cue_params(exercise))
+
+def meditation_mix_params(session: MeditationSession) -> Optional[Dict[str, Any]]:
+    """Render inputs of a session's mix, or None if it lacks either track."""
+    if not session.guided_audio_id or not session.background_audio_id:
+        return None
+    return {
+        'guided': source_fingerprint(session.guided_audio),
+        'background': source_fingerprint(session.background_audio),
+    }
+
+def find_meditation_mix(session: MeditationSession) -> Optional[MediaAsset]:
+    """Return the session's mix if it has been rendered for its current tracks."""
+    params = meditation_mix_params(session)
+    return find_render('meditation_mix', params) if params else None
+
+def get_meditation_mix(session: MeditationSession, storage: Optional[SupabaseStorage] = None) -> MediaAsset:
+    """Return the session's guided audio mixed over its background, rendering it if needed.
+
+    Raises:
+        ValueError: If the session lacks a guided or background track
+        UnsupportedAudioFormat: If a track cannot be decoded or mixed
+    """
+    if not session.guided_audio_id or not session.background_audio_id:
+        raise ValueError("Session needs both guided and background audio to be mixed")
+    storage = storage or get_storage()
+    guided, background = session.guided_audio, session.background_audio
+    for source in (guided, background):
+        if not source.content_hash:
+            # Hash the track before keying the mix, so filling the hash in later does not change the key
+            source.content_hash = hash_asset(source, storage)
+            MediaAsset.objects.filter(pk=source.pk).update(content_hash=source.content_hash)
+    params = meditation_mix_params(session)
+
+    def render(fileobj: BinaryIO) -> float:
+        with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE) as voice_file, \
+                tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE) as background_file:
+            fetch_asset(guided, voice_file, storage)
+            fetch_asset(background, background_file, storage)
+            voice_file.seek(0)
+            background_file.seek(0)
+            return write_meditation_mix(fileobj, voice_file, background_file)
+
+    return get_or_render(
+        'meditation_mix',
+        params,
+        render,
+        f"{guided.name} + {background.name}",
+        storage,
+        sources=[guided, background]
+    )
@@ -1,18 +1,29 @@
+from django.urls import reverse
 from rest_framework import serializers
 from .models import (
     Routine, Exercise, ClientInstructorRelationship, MediaAsset, BreathingExercise, MeditationSession, CombinedRoutine, ExerciseProgress, Achievement, ClientAchievement, UploadProgress
 )
 from users.serializers import UserProfileSerializer
+from core.sparse import SparseFieldsMixin
 
-class MediaAssetSerializer(serializers.ModelSerializer):
+class MediaAssetSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer for media assets."""
+    url = serializers.SerializerMethodField()
+
     class Meta:
         model = MediaAsset
-        fields = ['id', 'name', 'asset_type', 'url', 'thumbnail_url', 
+        fields = ['id', 'name', 'asset_type', 'url', 'thumbnail_url', 'blurhash',
                  'file_size', 'duration_seconds', 'created_at', 'is_active']
-        read_only_fields = ['id', 'created_at']
+        read_only_fields = ['id', 'blurhash', 'created_at']
+
+    def get_url(self, obj) -> str:
+        # Built from the asset alone, so nested listings need no extra queries
+        # or storage calls; the stream endpoint signs on demand
+        url = reverse('media-stream', kwargs={'pk': obj.pk})
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
 
-class ExerciseSerializer(serializers.ModelSerializer):
+class ExerciseSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer for basic exercises."""
     media_assets = MediaAssetSerializer(many=True, read_only=True)
     
@@ -20,46 +31,45 @@ class ExerciseSerializer(serializers.ModelSerializer):
         model = Exercise
         fields = ['id', 'routine', 'name', 'instructions', 'media_assets', 'order']
         read_only_fields = ['id']
+        expandable_fields = ['media_assets']
 
-class BreathingExerciseSerializer(serializers.ModelSerializer):
+class BreathingExerciseSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer for breathing exercises."""
     media_assets = MediaAssetSerializer(many=True, read_only=True)
-    background_sounds = MediaAssetSerializer(many=True, read_only=True)
     instructor_email = serializers.EmailField(source='instructor.email', read_only=True)
     
     class Meta:
         model = BreathingExercise
         fields = [
             'id', 'name', 'description', 'instructor', 'instructor_email',
-            'pattern', 'timer_seconds', 'media_assets', 'background_sounds',
-            'difficulty_level', 'focus_areas', 'benefits', 'mastery_criteria',
-            'progression_milestones', 'consistency_goals', 'visual_cues',
-            'audio_cues', 'created_at', 'updated_at', 'is_active'
+            'inhale_duration', 'hold_duration', 'exhale_duration', 'cycles',
+            'pattern_type', 'has_visual_cue', 'has_audio_cue', 'cue_style',
+            'media_assets', 'difficulty_level', 'mastery_criteria',
+            'created_at', 'updated_at', 'is_active'
         ]
         read_only_fields = ['id', 'created_at', 'updated_at', 'instructor']
+        expandable_fields = ['media_assets']
 
-class MeditationSessionSerializer(serializers.ModelSerializer):
+class MeditationSessionSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer for meditation sessions."""
-    audio_assets = MediaAssetSerializer(many=True, read_only=True)
-    media_assets = MediaAssetSerializer(many=True, read_only=True)
-    background_sounds = MediaAssetSerializer(many=True, read_only=True)
-    background_visuals = MediaAssetSerializer(many=True, read_only=True)
+    guided_audio = MediaAssetSerializer(read_only=True)
+    background_audio = MediaAssetSerializer(read_only=True)
     instructor_email = serializers.EmailField(source='instructor.email', read_only=True)
     
     class Meta:
         model = MeditationSession
         fields = [
             'id', 'name', 'description', 'instructor', 'instructor_email',
-            'audio_assets', 'script', 'duration_seconds', 'media_assets',
-            'background_sounds', 'background_visuals', 'meditation_type',
-            'difficulty_level', 'focus_points', 'mindfulness_prompts',
-            'guided_sequence', 'transition_points', 'session_goals',
-            'achievement_criteria', 'focus_level_assessment',
-            'progression_path', 'created_at', 'updated_at', 'is_active'
+            'duration_minutes', 'session_type', 'guided_script', 'focus_points',
+            'guided_audio', 'background_audio', 'has_visual_guide',
+            'has_ambient_sounds', 'ambient_sound_type', 'difficulty_level',
+            'focus_level_assessment', 'achievement_criteria',
+            'created_at', 'updated_at', 'is_active'
         ]
         read_only_fields = ['id', 'created_at', 'updated_at', 'instructor']
+        expandable_fields = ['guided_audio', 'background_audio']
 
-class RoutineSerializer(serializers.ModelSerializer):
+class RoutineSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     exercises = ExerciseSerializer(many=True, read_only=True)
     instructor = UserProfileSerializer(read_only=True)
     
@@ -68,10 +78,11 @@ class RoutineSerializer(serializers.ModelSerializer):
         fields = ['id', 'name', 'description', 'instructor', 'exercises', 
                  'created_at', 'updated_at', 'is_active']
         read_only_fields = ['id', 'created_at', 'updated_at', 'instructor']
+        expandable_fields = ['exercises']
 
-class CombinedRoutineSerializer(serializers.ModelSerializer):
+class CombinedRoutineSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer for combined routines."""
-    routines = ExerciseSerializer(many=True, read_only=True)
+    routines = RoutineSerializer(many=True, read_only=True)
     breathing_exercises = BreathingExerciseSerializer(many=True, read_only=True)
     meditation_sessions = MeditationSessionSerializer(many=True, read_only=True)
     instructor_email = serializers.EmailField(source='instructor.email', read_only=True)
@@ -82,8 +93,9 @@ class CombinedRoutineSerializer(serializers.ModelSerializer):
                  'routines', 'breathing_exercises', 'meditation_sessions',
                  'transition_notes', 'created_at', 'updated_at', 'is_active']
         read_only_fields = ['id', 'created_at', 'updated_at', 'instructor']
+        expandable_fields = ['routines', 'breathing_exercises', 'meditation_sessions']
 
-class ClientInstructorRelationshipSerializer(serializers.ModelSerializer):
+class ClientInstructorRelationshipSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     client = UserProfileSerializer(read_only=True)
     instructor = UserProfileSerializer(read_only=True)
     routines = RoutineSerializer(many=True, read_only=True)
@@ -92,6 +104,54 @@ class ClientInstructorRelationshipSerializer(serializers.ModelSerializer):
         model = ClientInstructorRelationship
         fields = ['id', 'client', 'instructor', 'routines', 'created_at']
         read_only_fields = ['id', 'created_at']
+        expandable_fields = ['routines']
+
+class RoutineSummarySerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    """Compact routine for lists; counts come from annotations on the queryset."""
+    exercise_count = serializers.IntegerField(read_only=True)
+    media_count = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = Routine
+        fields = ['id', 'name', 'instructor', 'exercise_count', 'media_count', 'updated_at', 'is_active']
+        read_only_fields = fields
+
+class BreathingExerciseSummarySerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    """Compact breathing exercise for lists."""
+    duration_seconds = serializers.IntegerField(source='get_total_duration', read_only=True)
+    media_count = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = BreathingExercise
+        fields = ['id', 'name', 'instructor', 'pattern_type', 'difficulty_level',
+                  'duration_seconds', 'media_count', 'updated_at', 'is_active']
+        read_only_fields = fields
+
+class MeditationSessionSummarySerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    """Compact meditation session for lists."""
+    duration_seconds = serializers.IntegerField(source='get_duration_seconds', read_only=True)
+    media_count = serializers.SerializerMethodField()
+
+    class Meta:
+        model = MeditationSession
+        fields = ['id', 'name', 'instructor', 'session_type', 'difficulty_level',
+                  'duration_seconds', 'media_count', 'updated_at', 'is_active']
+        read_only_fields = fields
+
+    def get_media_count(self, obj) -> int:
+        return (obj.guided_audio_id is not None) + (obj.background_audio_id is not None)
+
+class CombinedRoutineSummarySerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    """Compact combined routine for lists; counts come from annotations on the queryset."""
+    routine_count = serializers.IntegerField(read_only=True)
+    breathing_count = serializers.IntegerField(read_only=True)
+    meditation_count = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = CombinedRoutine
+        fields = ['id', 'name', 'instructor', 'routine_count', 'breathing_count',
+                  'meditation_count', 'updated_at', 'is_active']
+        read_only_fields = fields
 
 class RoutineCreateSerializer(serializers.ModelSerializer):
     exercises = ExerciseSerializer(many=True, required=False)
@@ -0,0 +1,129 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from typing import Optional
+from .feed import FEED_MODELS, content_type_of, remove_content, sync_client, sync_content
+from .models import (
+    BreathingExercise, ClientInstructorRelationship, CombinedRoutine, Exercise, MediaAsset, Routine
+)
+from .renders import source_fingerprint
+from .usage import record_usage
+from .versions import bump_client, bump_instructor
+
+def _delete_renders(renders) -> None:
+    """Delete renders together with their stored files."""
+    for render in renders:
+        render.asset.delete()
+
+@receiver(post_save, sender=MediaAsset)
+def drop_stale_renders(sender, instance: MediaAsset, created: bool, **kwargs) -> None:
+    """Delete renders made from an earlier version of a source asset."""
+    if created:
+        return
+    fingerprint = source_fingerprint(instance)
+    _delete_renders(
+        render for render in instance.derived_renders.select_related('asset')
+        if fingerprint not in render.params.values()
+    )
+
+@receiver(pre_delete, sender=MediaAsset)
+def drop_derived_renders(sender, instance: MediaAsset, **kwargs) -> None:
+    """Delete renders made from an asset that is being deleted."""
+    _delete_renders(list(instance.derived_renders.select_related('asset')))
+
+# Asset fields that decide what an asset counts toward storage usage
+USAGE_FIELDS = {'instructor', 'instructor_id', 'asset_type', 'file_size'}
+
+@receiver(pre_save, sender=MediaAsset)
+def remember_counted_usage(sender, instance: MediaAsset, update_fields=None, **kwargs) -> None:
+    """Note what an existing asset counted toward usage before it is saved."""
+    instance._counted_usage = None
+    if instance._state.adding or (update_fields is not None and not USAGE_FIELDS & set(update_fields)):
+        return
+    instance._counted_usage = MediaAsset.objects.filter(pk=instance.pk).values_list(
+        'instructor_id', 'asset_type', 'file_size'
+    ).first()
+
+@receiver(post_save, sender=MediaAsset)
+def count_saved_asset(sender, instance: MediaAsset, created: bool, **kwargs) -> None:
+    """Add a new asset to its instructor's storage usage, or move a changed one."""
+    previous = None if created else getattr(instance, '_counted_usage', None)
+    current = (instance.instructor_id, instance.asset_type, instance.file_size)
+    if not created and (previous is None or previous == current):
+        return
+    if previous is not None and previous[0]:
+        record_usage(previous[0], previous[1], -previous[2], -1)
+    if instance.instructor_id:
+        record_usage(instance.instructor_id, instance.asset_type, instance.file_size, 1)
+
+@receiver(post_delete, sender=MediaAsset)
+def count_deleted_asset(sender, instance: MediaAsset, **kwargs) -> None:
+    """Remove a deleted asset from its instructor's storage usage."""
+    if instance.instructor_id:
+        record_usage(instance.instructor_id, instance.asset_type, -instance.file_size, -1)
+
+def update_feeds_for_content(sender, instance, created: bool, update_fields=None, **kwargs) -> None:
+    """Show or hide saved content in the feeds of the clients who can see it."""
+    if not created and update_fields is not None and not {'is_active', 'instructor'} & set(update_fields):
+        return
+    sync_content(content_type_of(sender), instance)
+
+def drop_deleted_content(sender, instance, **kwargs) -> None:
+    """Remove deleted content from every feed."""
+    remove_content(content_type_of(sender), instance.pk)
+
+for feed_model in FEED_MODELS.values():
+    post_save.connect(update_feeds_for_content, sender=feed_model, dispatch_uid=f'feed-save-{feed_model.__name__}')
+    post_delete.connect(drop_deleted_content, sender=feed_model, dispatch_uid=f'feed-delete-{feed_model.__name__}')
+
+@receiver(post_save, sender=ClientInstructorRelationship)
+def update_feed_for_relationship(sender, instance: ClientInstructorRelationship, **kwargs) -> None:
+    """Resync a client's feed when they gain or change an instructor."""
+    sync_client(instance.client_id)
+    bump_client(instance.client_id)
+
+@receiver(post_delete, sender=ClientInstructorRelationship)
+def prune_feed_for_relationship(sender, instance: ClientInstructorRelationship, **kwargs) -> None:
+    """Remove what a client could only see through a deleted relationship."""
+    sync_client(instance.client_id, add=False)
+    bump_client(instance.client_id)
+
+@receiver(m2m_changed, sender=ClientInstructorRelationship.routines.through)
+def update_feed_for_assignment(sender, instance, action: str, reverse: bool, **kwargs) -> None:
+    """Resync feeds when routines are assigned to or removed from a relationship."""
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if reverse:
+        # Changed from the routine's side, e.g. routine.assigned_clients.add()
+        sync_content('routine', instance)
+        for client_id in ClientInstructorRelationship.objects.filter(
+            pk__in=kwargs['pk_set'] or ()
+        ).values_list('client_id', flat=True):
+            bump_client(client_id)
+    else:
+        sync_client(instance.client_id)
+        bump_client(instance.client_id)
+
+def _instructor_of(instance) -> Optional[int]:
+    if isinstance(instance, Exercise):
+        return Routine.objects.filter(pk=instance.routine_id).values_list('instructor_id', flat=True).first()
+    return instance.instructor_id
+
+def bump_content_version(sender, instance, **kwargs) -> None:
+    """Invalidate cached content lists of the instructor whose content changed."""
+    # m2m_changed also fires before each change; only act once it is done
+    if 'action' in kwargs and not kwargs['action'].startswith('post_'):
+        return
+    bump_instructor(_instructor_of(instance))
+
+for content_model in (*FEED_MODELS.values(), Exercise, MediaAsset):
+    post_save.connect(bump_content_version, sender=content_model, dispatch_uid=f'version-save-{content_model.__name__}')
+    post_delete.connect(bump_content_version, sender=content_model, dispatch_uid=f'version-delete-{content_model.__name__}')
+
+for through in (
+    Exercise.media_assets.through,
+    BreathingExercise.media_assets.through,
+    CombinedRoutine.routines.through,
+    CombinedRoutine.breathing_exercises.through,
+    CombinedRoutine.meditation_sessions.through,
+):
+    m2m_changed.connect(bump_content_version, sender=through, dispatch_uid=f'version-m2m-{through.__name__}')
@@ -12,6 +12,9 @@ from .main_views import (
     ClientAchievementViewSet,
 )
 from .views import auth
+from .views.dashboard import ClientDashboardView
+from .views.media import ClientMediaManifestView, MediaStreamView
+from . import async_views
 
 router = DefaultRouter()
 router.register(r'routines', RoutineViewSet, basename='routine')
@@ -37,7 +40,18 @@ auth_urlpatterns = [
     path('logout/', auth.logout, name='logout'),
 ]
 
+async_media_urlpatterns = [
+    path('uploads/', async_views.list_uploads, name='list-uploads'),
+    path('uploads/delete/', async_views.delete_uploads, name='delete-uploads'),
+    path('upload/', async_views.upload, name='upload'),
+    path('signed-urls/', async_views.signed_urls, name='signed-urls'),
+]
+
 urlpatterns = [
+    path('dashboard/', ClientDashboardView.as_view(), name='client-dashboard'),
+    path('media/manifest/', ClientMediaManifestView.as_view(), name='media-manifest'),
+    path('media/<int:pk>/stream/', MediaStreamView.as_view(), name='media-stream'),
     path('', include(router.urls)),
+    path('async/media/', include((async_media_urlpatterns, 'async-media'))),
     path('auth/', include((auth_urlpatterns, 'auth'))),
 ] 
\ No newline at end of file
@@ -0,0 +1,59 @@
+"""
+Per-instructor storage usage, maintained incrementally.
+
+Every asset owned by an instructor adds its size to a running total per
+asset type when created, moves it when its size, type or owner changes and
+removes it when deleted, so checking a quota reads at most one row per
+asset type.
+"""
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from django.utils import timezone
+from typing import Dict, Optional
+from users.models import UserProfile
+from .models import MediaAsset, StorageUsage
+
+def record_usage(instructor_id: int, asset_type: str, bytes_delta: int, count_delta: int) -> None:
+    """Atomically adjust an instructor's usage totals for one asset type."""
+    usage, _ = StorageUsage.objects.get_or_create(instructor_id=instructor_id, asset_type=asset_type)
+    # Update with F() expressions so concurrent uploads and deletes never lose an increment
+    StorageUsage.objects.filter(pk=usage.pk).update(
+        total_bytes=F('total_bytes') + bytes_delta,
+        asset_count=F('asset_count') + count_delta,
+        updated_at=timezone.now()
+    )
+
+def get_usage(instructor: UserProfile) -> Dict[str, Dict[str, int]]:
+    """Return an instructor's bytes and asset count by asset type."""
+    return {
+        usage['asset_type']: {'bytes': usage['total_bytes'], 'count': usage['asset_count']}
+        for usage in StorageUsage.objects.filter(instructor=instructor).values(
+            'asset_type', 'total_bytes', 'asset_count'
+        )
+    }
+
+def remaining_quota(instructor: UserProfile) -> int:
+    """Return how many more bytes an instructor may store; negative when over quota."""
+    used = StorageUsage.objects.filter(instructor=instructor).aggregate(total=Sum('total_bytes'))['total'] or 0
+    return settings.INSTRUCTOR_STORAGE_QUOTA - used
+
+def rebuild_usage(instructor: Optional[UserProfile] = None) -> int:
+    """Recompute usage totals from the assets themselves and return the rows written.
+
+    This scans assets, so it is meant for backfills and repairs rather than
+    request handling.
+    """
+    assets = MediaAsset.objects.filter(instructor__isnull=False)
+    usage = StorageUsage.objects.all()
+    if instructor is not None:
+        assets = assets.filter(instructor=instructor)
+        usage = usage.filter(instructor=instructor)
+    totals = assets.values('instructor_id', 'asset_type').annotate(
+        total_bytes=Sum('file_size'),
+        asset_count=Count('pk')
+    )
+    with transaction.atomic():
+        usage.delete()
+        StorageUsage.objects.bulk_create(StorageUsage(**total) for total in totals)
+    return len(totals)
@@ -0,0 +1,54 @@
+"""
+Cache scopes of routine content.
+
+Each instructor's content is one scope, bumped whenever any routine,
+exercise, breathing exercise, meditation session, combined routine or media
+asset of theirs changes. A client's lists depend on the scopes of all their
+instructors plus their own, which is bumped when relationships or
+assignments change.
+"""
+from django.core.cache import cache
+from django.db import transaction
+from functools import partial
+from typing import List, Optional
+from core.response_cache import bump_version, get_versions
+from .models import ClientInstructorRelationship
+
+def instructor_scope(instructor_id: int) -> str:
+    return f'instructor:{instructor_id}'
+
+def client_scope(client_id: int) -> str:
+    return f'client:{client_id}'
+
+def _bump_on_commit(scope: str) -> None:
+    # Bumping before the write commits would let a concurrent read cache the
+    # old rows under the new version
+    transaction.on_commit(partial(bump_version, scope))
+
+def bump_instructor(instructor_id: Optional[int]) -> None:
+    """Invalidate cached lists built from an instructor's content once the write commits."""
+    if instructor_id is not None:
+        _bump_on_commit(instructor_scope(instructor_id))
+
+def bump_client(client_id: int) -> None:
+    """Invalidate a client's cached lists once their relationship or assignment change commits."""
+    _bump_on_commit(client_scope(client_id))
+
+def content_scopes(user) -> Optional[List[str]]:
+    """Return the scopes a user's content lists depend on, or None if they are not cached."""
+    if not user.is_authenticated:
+        return None
+    if user.role in ['instructor', 'admin']:
+        return [instructor_scope(user.pk)]
+    # The client's instructors only change with the client's own version,
+    # so they are cached under it and cache hits need no query
+    scope = client_scope(user.pk)
+    instructors_key = f'client-instructors:{user.pk}:{get_versions([scope])[0]}'
+    instructor_ids = cache.get(instructors_key)
+    if instructor_ids is None:
+        instructor_ids = list(
+            ClientInstructorRelationship.objects.filter(client=user)
+            .order_by('instructor_id').values_list('instructor_id', flat=True)
+        )
+        cache.set(instructors_key, instructor_ids, None)
+    return [scope] + [instructor_scope(instructor_id) for instructor_id in instructor_ids]
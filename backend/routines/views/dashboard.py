@@ -0,0 +1,25 @@
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from routines.dashboard import build_dashboard
+
+class ClientDashboardView(APIView):
+    """Return everything the client home screen shows in a single request.
+
+    Replaces separate calls to the routine, breathing, meditation, combined
+    routine, progress stats and achievement endpoints on app start.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        if request.user.role != 'client':
+            return Response(
+                {'error': 'Only clients have a dashboard'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        return Response({
+            'generated_at': timezone.now().isoformat(),
+            **build_dashboard(request.user),
+        })
@@ -0,0 +1,106 @@
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, HttpResponseRedirect
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from core.http import RangeNotSatisfiable, RangedFile, etag_matches, parse_range
+from core.renderers import IgnoreClientContentNegotiation, ORJSONRenderer
+from core.storage import SupabaseStorage, get_storage
+from routines.media import build_media_manifest, hash_content, readable_media
+from routines.models import MediaAsset
+
+# Content is addressed by hash, so clients may keep it for a long time
+STREAM_CACHE_CONTROL = 'private, max-age=86400'
+
+class MediaStreamView(APIView):
+    """Serve a media asset's content with byte ranges and strong ETags.
+
+    Local files are streamed with ``sendfile`` where the server supports it.
+    Assets kept in Supabase are redirected to a signed URL, where storage
+    serves ranges itself.
+    """
+    permission_classes = [IsAuthenticated]
+    renderer_classes = [ORJSONRenderer]
+    content_negotiation_class = IgnoreClientContentNegotiation
+
+    def get(self, request, pk):
+        asset = get_object_or_404(readable_media(request.user), pk=pk)
+        if not asset.file:
+            if not asset.supabase_path:
+                return HttpResponse(status=status.HTTP_404_NOT_FOUND)
+            if asset.content_hash and etag_matches(request.headers.get('If-None-Match'), f'"{asset.content_hash}"'):
+                return self._not_modified(asset.content_hash)
+            return HttpResponseRedirect(get_storage().get_signed_url(asset.supabase_path))
+
+        fileobj = asset.file.open('rb')
+        if not asset.content_hash:
+            asset.content_hash = hash_content(fileobj)
+            # Update in the database so MediaAsset.save() does not re-upload the file
+            MediaAsset.objects.filter(pk=asset.pk).update(content_hash=asset.content_hash)
+        etag = f'"{asset.content_hash}"'
+
+        if etag_matches(request.headers.get('If-None-Match'), etag):
+            fileobj.close()
+            return self._not_modified(asset.content_hash)
+
+        size = asset.file.size
+        byte_range = None
+        if_range = request.headers.get('If-Range')
+        if not if_range or etag_matches(if_range, etag, weak=False):
+            try:
+                byte_range = parse_range(request.headers.get('Range'), size)
+            except RangeNotSatisfiable:
+                fileobj.close()
+                response = HttpResponse(status=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE)
+                response['Content-Range'] = f'bytes */{size}'
+                return response
+
+        content_type = SupabaseStorage._get_content_type(asset.file.name)
+        if byte_range is None:
+            fileobj.seek(0)
+            response = FileResponse(fileobj, content_type=content_type)
+            response['Content-Length'] = size
+        else:
+            start, end = byte_range
+            response = FileResponse(
+                RangedFile(fileobj, start, end - start + 1),
+                status=status.HTTP_206_PARTIAL_CONTENT,
+                content_type=content_type
+            )
+            response['Content-Length'] = end - start + 1
+            response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Accept-Ranges'] = 'bytes'
+        response['ETag'] = etag
+        response['Cache-Control'] = STREAM_CACHE_CONTROL
+        return response
+
+    @staticmethod
+    def _not_modified(content_hash: str) -> HttpResponse:
+        response = HttpResponse(status=status.HTTP_304_NOT_MODIFIED)
+        response['ETag'] = f'"{content_hash}"'
+        response['Cache-Control'] = STREAM_CACHE_CONTROL
+        return response
+
+class ClientMediaManifestView(APIView):
+    """List every asset assigned to the requesting client for offline caching.
+
+    The app compares content hashes with its cache and only downloads what
+    changed, so rotated signed URLs no longer cause re-downloads.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        assets = build_media_manifest(
+            request.user,
+            lambda asset_id: request.build_absolute_uri(reverse('media-stream', kwargs={'pk': asset_id})),
+            expires_in=settings.SIGNED_URL_EXPIRATION
+        )
+        return Response({
+            'generated_at': timezone.now().isoformat(),
+            'expires_in': settings.SIGNED_URL_EXPIRATION,
+            'assets': assets,
+        })
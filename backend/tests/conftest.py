@@ -2,13 +2,27 @@
 Pytest configuration and common fixtures for testing.
 """
 import pytest
+from datetime import timedelta
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils import timezone
 from rest_framework.test import APIClient
 from users.models import UserProfile
+import hashlib
 import uuid
 
 User = get_user_model()
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Start every test with an empty cache, since IDs are reused between tests."""
+    cache.clear()
+
+@pytest.fixture(autouse=True)
+def local_list_cache(settings):
+    """Let content lists use the local-memory cache, which is safe in a single test process."""
+    settings.LIST_CACHE_ALLOW_LOCAL_MEMORY = True
+
 @pytest.fixture
 def api_client():
     """Return an API client instance."""
@@ -58,4 +72,160 @@ def admin_user(db):
 def admin_client(api_client, admin_user):
     """Return an authenticated API client with admin privileges."""
     api_client.force_authenticate(user=admin_user)
-    return api_client 
\ No newline at end of file
+    return api_client 
+
+@pytest.fixture
+def client_profile(db):
+    """Create and return a Supabase client profile."""
+    return UserProfile.objects.create(
+        role='client',
+        email='client@example.com',
+        supabase_id=uuid.uuid4()
+    )
+
+@pytest.fixture
+def instructor_profile(db):
+    """Create and return a Supabase instructor profile."""
+    return UserProfile.objects.create(
+        role='instructor',
+        email='instructor@example.com',
+        supabase_id=uuid.uuid4()
+    )
+
+class FakeDownload:
+    """Streaming response returned by ``FakeStorage.open_download``."""
+
+    def __init__(self, data: bytes):
+        self.data = data
+
+    def iter_content(self, chunk_size: int = 1):
+        for start in range(0, len(self.data), chunk_size):
+            yield self.data[start:start + chunk_size]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+class FakeStorage:
+    """In-memory stand-in for SupabaseStorage."""
+
+    bucket_name = 'media-assets'
+
+    def __init__(self):
+        self.objects = {}
+
+    def add(self, path: str, size: int = 100, created_at: str = '2020-01-01T00:00:00+00:00') -> None:
+        """Store a fake object at ``path``."""
+        self.objects[path] = {'size': size, 'created_at': created_at}
+
+    def list_files(self, prefix: str, limit: int = 100, offset: int = 0) -> list:
+        """List entries directly under ``prefix`` the way Supabase does."""
+        prefix = f"{prefix.rstrip('/')}/" if prefix else ''
+        entries = {}
+        for path, info in self.objects.items():
+            if not path.startswith(prefix):
+                continue
+            name, _, rest = path[len(prefix):].partition('/')
+            if rest:
+                entries.setdefault(name, {'name': name, 'id': None})
+            else:
+                entries[name] = {
+                    'name': name,
+                    'id': path,
+                    'created_at': info['created_at'],
+                    'metadata': {'size': info['size']},
+                }
+        ordered = [entries[name] for name in sorted(entries)]
+        return ordered[offset:offset + limit]
+
+    def delete_files(self, file_paths) -> bool:
+        """Remove a batch of objects."""
+        for path in file_paths:
+            self.objects.pop(path, None)
+        return True
+
+    def delete_file(self, file_path: str) -> bool:
+        """Remove a single object."""
+        return self.delete_files([file_path])
+
+    def put_file(self, file_path: str, file_data, content_type: str, upsert: bool = False) -> None:
+        """Store an object's bytes, or a local file's content, at an exact path."""
+        if isinstance(file_data, str):
+            with open(file_data, 'rb') as f:
+                file_data = f.read()
+        self.add(file_path, size=len(file_data))
+        self.objects[file_path]['data'] = file_data
+
+    def generate_upload_policy(self, file_name: str, instructor_id: int, asset_type: str, content_type=None) -> dict:
+        """Return a direct upload policy for a path under the instructor's folder."""
+        file_path = f'{instructor_id}/{asset_type}/{file_name}'
+        return {
+            'upload_id': str(uuid.uuid4()),
+            'file_path': file_path,
+            'asset_type': asset_type,
+            'expires_at': (timezone.now() + timedelta(hours=1)).isoformat(),
+            'signed_url': f'https://storage.test/upload/{file_path}',
+        }
+
+    def verify_upload(self, upload_id: str, file_path: str, instructor_id: int):
+        """Confirm that an instructor's object exists and report its size."""
+        if not file_path.startswith(f'{instructor_id}/') or file_path not in self.objects:
+            return False, None
+        return True, {'file_path': file_path, 'size': self.objects[file_path]['size'], 'thumbnail_url': None}
+
+    def upload_file(self, file_data: bytes, file_name: str, instructor_id: int, asset_type: str, content_type=None):
+        """Store an uploaded file under the instructor's folder."""
+        file_path = f'{instructor_id}/{asset_type}/{file_name}'
+        self.put_file(file_path, file_data, content_type)
+        return file_path, {
+            'file_size': len(file_data),
+            'content_hash': hashlib.sha256(file_data).hexdigest(),
+            'blurhash': None,
+            'thumbnail_url': None,
+        }
+
+    def download_to(self, file_path: str, fileobj) -> int:
+        """Write an object's stored bytes into ``fileobj``."""
+        data = self.objects[file_path].get('data', b'')
+        fileobj.write(data)
+        return len(data)
+
+    def open_download(self, file_path: str, byte_range=None) -> 'FakeDownload':
+        """Open a streaming download of an object's stored bytes."""
+        return FakeDownload(self.objects[file_path].get('data', b''))
+
+    def get_signed_url(self, file_path: str, expires_in: int = 3600) -> str:
+        """Return a fake signed URL."""
+        return f'https://storage.test/{file_path}?expires={expires_in}'
+
+    def get_signed_urls(self, file_paths, expires_in: int = 3600) -> dict:
+        """Return fake signed URLs for several files."""
+        return {path: self.get_signed_url(path, expires_in) for path in file_paths}
+
+
+@pytest.fixture
+def fake_storage():
+    """Return an empty in-memory storage stand-in."""
+    return FakeStorage()
+
+@pytest.fixture
+def assert_constant_queries(db, django_capture_on_commit_callbacks):
+    """Return a guard asserting that ``fetch`` runs the same number of queries
+    before and after ``grow`` adds rows, i.e. that it has no N+1 pattern.
+
+    ``grow`` runs as if committed, so cached lists see the new rows."""
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    def check(fetch, grow):
+        with CaptureQueriesContext(connection) as before:
+            fetch()
+        with django_capture_on_commit_callbacks(execute=True):
+            grow()
+        with CaptureQueriesContext(connection) as after:
+            fetch()
+        assert len(after) == len(before), '\n'.join(q['sql'] for q in after.captured_queries)
+        return len(after)
+    return check
@@ -0,0 +1,161 @@
+"""
+Tests for the asyncio storage client.
+"""
+import asyncio
+import json
+import httpx
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.test import RequestFactory
+from core import resilience
+from core.async_storage import AsyncSupabaseStorage
+from core.resilience import StorageUnavailable
+from core.storage import SupabaseStorage
+from routines import async_views, media
+from routines.models import BreathingExercise, MediaAsset
+
+@pytest.fixture(autouse=True)
+def fresh_state(monkeypatch):
+    """Start each test with an empty cache and closed breakers."""
+    cache.clear()
+    monkeypatch.setattr(resilience, '_breakers', {})
+
+def make_client(handler):
+    """Build an async HTTP client that answers requests with ``handler``."""
+    return httpx.AsyncClient(
+        base_url='https://storage.test/storage/v1',
+        transport=httpx.MockTransport(handler)
+    )
+
+def test_get_signed_urls_limits_concurrency():
+    """Test that batch signing never exceeds the requested concurrency."""
+    in_flight = 0
+    peak = 0
+
+    async def handler(request):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        path = request.url.path.split('/object/sign/media-assets/', 1)[1]
+        return httpx.Response(200, json={'signedURL': f'/object/sign/media-assets/{path}?token=t'})
+
+    async def run():
+        storage = AsyncSupabaseStorage(http_client=make_client(handler))
+        return await storage.get_signed_urls([f'1/image/{i}.png' for i in range(10)], concurrency=3)
+
+    urls = asyncio.run(run())
+
+    assert peak <= 3
+    assert urls['1/image/4.png'] == 'https://storage.test/storage/v1/object/sign/media-assets/1/image/4.png?token=t'
+
+def test_delete_files_sends_one_request():
+    """Test that batch deletion is a single DELETE with all paths."""
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, json=[])
+
+    async def run():
+        storage = AsyncSupabaseStorage(http_client=make_client(handler))
+        return await storage.delete_files(['1/image/a.png', '1/image/b.png'])
+
+    assert asyncio.run(run()) is True
+    assert len(requests) == 1
+    assert requests[0].method == 'DELETE'
+    assert json.loads(requests[0].content) == {'prefixes': ['1/image/a.png', '1/image/b.png']}
+
+def test_signing_shares_the_sync_cache(monkeypatch):
+    """Test that a URL signed by the sync client is reused without a request."""
+    monkeypatch.setattr(SupabaseStorage, '_sign', lambda self, path, expires_in: f'https://storage.test/{path}')
+    storage = SupabaseStorage.__new__(SupabaseStorage)
+    storage.bucket_name = 'media-assets'
+    url = storage.get_signed_url('1/audio/a.wav')
+
+    def handler(request):
+        raise AssertionError('storage should not be asked')
+
+    async def run():
+        return await AsyncSupabaseStorage(http_client=make_client(handler)).get_signed_url('1/audio/a.wav')
+
+    assert asyncio.run(run()) == url
+
+def test_bulkhead_rejects_excess_concurrency(settings):
+    """Test that requests beyond the per-loop limit fail fast instead of queueing."""
+    settings.STORAGE_MAX_CONCURRENCY = 2
+    settings.STORAGE_BULKHEAD_WAIT = 0.01
+
+    async def handler(request):
+        await asyncio.sleep(0.1)
+        return httpx.Response(200, json=[])
+
+    async def run():
+        storage = AsyncSupabaseStorage(http_client=make_client(handler))
+        return await asyncio.gather(
+            *(storage.list_files('1/') for _ in range(3)), return_exceptions=True
+        )
+
+    results = asyncio.run(run())
+    assert sum(isinstance(result, StorageUnavailable) for result in results) == 1
+
+@pytest.mark.django_db
+def test_signed_urls_only_signs_own_assets(monkeypatch, instructor_profile, client_profile):
+    """Test that assets of other instructors are left out of a signing batch."""
+    own = MediaAsset.objects.create(
+        name='own', asset_type='image', file_size=1, supabase_path='1/image/own.png', instructor=instructor_profile
+    )
+    other = MediaAsset.objects.create(
+        name='other', asset_type='image', file_size=1, supabase_path='2/image/other.png', instructor=client_profile
+    )
+
+    async def authenticate(request):
+        return instructor_profile
+
+    async def get_signed_urls(self, paths, expires_in=3600):
+        return {path: f'https://storage.test/{path}' for path in paths}
+
+    monkeypatch.setattr(async_views, '_authenticate', authenticate)
+    monkeypatch.setattr(AsyncSupabaseStorage, '__init__', lambda self: None)
+    monkeypatch.setattr(AsyncSupabaseStorage, 'get_signed_urls', get_signed_urls)
+    request = RequestFactory().post(
+        '/', json.dumps({'asset_ids': [own.pk, other.pk]}), content_type='application/json'
+    )
+
+    response = async_to_sync(async_views.signed_urls)(request)
+    assert json.loads(response.content) == {str(own.pk): 'https://storage.test/1/image/own.png'}
+
+@pytest.mark.django_db
+def test_delete_uploads_refuses_referenced_assets(monkeypatch, instructor_profile, fake_storage):
+    """Test that a file still used by an exercise is kept unless the deletion is forced."""
+    path = f'{instructor_profile.id}/audio/breath.wav'
+    fake_storage.add(path)
+    asset = MediaAsset.objects.create(
+        name='breath', asset_type='audio', file_size=1, supabase_path=path, instructor=instructor_profile
+    )
+    BreathingExercise.objects.create(name='Box', instructor=instructor_profile).media_assets.add(asset)
+
+    async def authenticate(request):
+        return instructor_profile
+
+    monkeypatch.setattr(async_views, '_authenticate', authenticate)
+    monkeypatch.setattr(media, 'get_storage', lambda: fake_storage)
+
+    def delete(force):
+        request = RequestFactory().post(
+            '/', json.dumps({'file_paths': [path], 'force': force}), content_type='application/json'
+        )
+        return async_to_sync(async_views.delete_uploads)(request)
+
+    response = delete('false')
+    assert response.status_code == 409
+    assert list(json.loads(response.content)['in_use']) == [str(asset.pk)]
+    assert MediaAsset.objects.filter(pk=asset.pk).exists()
+    assert path in fake_storage.objects
+
+    response = delete(True)
+    assert json.loads(response.content) == {'successful': [path], 'failed': []}
+    assert not MediaAsset.objects.filter(pk=asset.pk).exists()
+    assert path not in fake_storage.objects
@@ -0,0 +1,261 @@
+"""
+Tests for waveform peak extraction and server-rendered audio.
+"""
+import io
+import uuid
+import wave
+import numpy as np
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from django.urls import reverse
+from routines.audio import (
+    PEAK_LEVELS, UnsupportedAudioFormat, compute_waveform, decode_waveform, encode_waveform,
+    render_breathing_cycle, write_breathing_cues, write_meditation_mix
+)
+from routines.models import AudioRender, BreathingExercise, MediaAsset, MediaWaveform, MeditationSession
+from routines.renders import find_meditation_mix, get_breathing_cue_track
+from users.models import UserProfile
+
+def make_wav(samples: np.ndarray, sample_rate: int = 8000, sample_width: int = 2) -> bytes:
+    """Encode float samples shaped ``(frames, channels)`` as integer PCM WAV."""
+    scale = (1 << (8 * sample_width - 1)) - 1
+    ints = np.round(samples * scale).astype('<i4')
+    if sample_width == 2:
+        data = ints.astype('<i2').tobytes()
+    else:
+        data = ints.view(np.uint8).reshape(-1, 4)[:, :sample_width].tobytes()
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as writer:
+        writer.setnchannels(samples.shape[1])
+        writer.setsampwidth(sample_width)
+        writer.setframerate(sample_rate)
+        writer.writeframes(data)
+    return buffer.getvalue()
+
+@pytest.mark.parametrize('sample_width', [2, 3])
+def test_compute_waveform_levels(sample_width):
+    """Test that peaks follow the signal envelope at every resolution."""
+    frames = 102_400
+    envelope = np.linspace(0, 1, frames, dtype=np.float32)
+    left = envelope * np.sin(np.arange(frames) * 0.3)
+    stereo = np.column_stack([left, -left])
+    waveform = compute_waveform(io.BytesIO(make_wav(stereo, sample_width=sample_width)))
+
+    assert waveform.channels == 2
+    assert waveform.frames == frames
+    assert waveform.samples_per_peak == 25
+    assert [len(mins) for mins, _ in waveform.levels] == list(PEAK_LEVELS)
+    mins, maxs = waveform.levels[0]
+    assert np.all(mins <= maxs)
+    assert maxs[-1] == pytest.approx(1, abs=0.01)
+    assert maxs[0] < 0.01
+    assert waveform.levels[2][1].max() == pytest.approx(maxs.max())
+
+def test_short_audio_keeps_trailing_samples():
+    """Test that files shorter than the peak count still get every sample."""
+    samples = np.array([[0.0], [0.5], [-0.25]], dtype=np.float32)
+    waveform = compute_waveform(io.BytesIO(make_wav(samples)))
+
+    mins, maxs = waveform.levels[0]
+    assert len(mins) == 3
+    assert maxs[1] == pytest.approx(0.5, abs=1e-3)
+
+def test_encode_round_trip():
+    """Test that the sidecar decodes back to quantized peaks."""
+    samples = np.sin(np.linspace(0, 20, 20_000, dtype=np.float32)).reshape(-1, 1)
+    waveform = compute_waveform(io.BytesIO(make_wav(samples, sample_rate=22050)))
+
+    sample_rate, samples_per_peak, levels = decode_waveform(encode_waveform(waveform))
+
+    assert sample_rate == 22050
+    assert samples_per_peak == waveform.samples_per_peak
+    assert [len(level) for level in levels] == [len(mins) for mins, _ in waveform.levels]
+    assert levels[0][:, 1].max() == 127
+
+def test_unsupported_format(monkeypatch):
+    """Test that non-WAV input is rejected when soundfile is unavailable."""
+    monkeypatch.setattr('routines.audio.sf', None)
+    with pytest.raises(UnsupportedAudioFormat):
+        compute_waveform(io.BytesIO(b'ID3\x03not really an mp3'))
+
+class DownloadStorage:
+    """Storage stand-in serving fixed file contents."""
+
+    def __init__(self, files):
+        self.files = files
+
+    def download_to(self, file_path, fileobj):
+        fileobj.write(self.files[file_path])
+        return len(self.files[file_path])
+
+@pytest.mark.django_db
+def test_compute_waveforms_command_and_endpoint(monkeypatch, api_client, client_profile, instructor_profile):
+    """Test that the job stores peaks and the endpoint serves them to the owner with an ETag."""
+    cache.clear()
+    samples = np.sin(np.linspace(0, 50, 16_000, dtype=np.float32)).reshape(-1, 1)
+    storage = DownloadStorage({'1/audio/calm.wav': make_wav(samples)})
+    monkeypatch.setattr('routines.management.commands.compute_waveforms.get_storage', lambda: storage)
+    asset = MediaAsset.objects.create(
+        name='calm', asset_type='audio', file_size=100, supabase_path='1/audio/calm.wav',
+        instructor=instructor_profile
+    )
+
+    call_command('compute_waveforms')
+
+    asset.refresh_from_db()
+    assert asset.duration_seconds == 2
+    assert MediaWaveform.objects.filter(asset=asset).exists()
+
+    url = reverse('media-waveform', kwargs={'pk': asset.pk})
+    api_client.force_authenticate(user=instructor_profile)
+    response = api_client.get(url, HTTP_ACCEPT='application/octet-stream')
+    assert response.status_code == 200
+    assert response['Content-Type'] == 'application/octet-stream'
+    assert decode_waveform(response.content)[0] == 8000
+
+    response = api_client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+    assert response.status_code == 304
+
+    # Cached peaks are not served to a client without the asset in their feed
+    api_client.force_authenticate(user=client_profile)
+    assert api_client.get(url).status_code == 404
+
+def test_breathing_cues_start_each_phase():
+    """Test that a cue starts at every phase boundary and the track spans every cycle."""
+    sample_rate = 8000
+    first, steady = render_breathing_cycle(2, 1, 3, 'minimal', sample_rate)
+    assert len(first) == len(steady) == 6 * sample_rate
+    for onset in (0, 2, 3):
+        start = onset * sample_rate
+        assert np.abs(first[start:start + 200]).max() > 0.3
+    assert np.abs(first[int(1.5 * sample_rate):2 * sample_rate]).max() < 0.01
+
+    buffer = io.BytesIO()
+    duration = write_breathing_cues(buffer, 2, 1, 3, cycles=4, sample_rate=sample_rate)
+    buffer.seek(0)
+    with wave.open(buffer, 'rb') as reader:
+        assert reader.getnframes() == 4 * 6 * sample_rate
+    assert duration == 24
+
+@pytest.mark.django_db
+def test_cue_track_shared_across_instructors(api_client, instructor_profile, fake_storage, monkeypatch):
+    """Test that identical patterns reuse one rendered asset."""
+    other = UserProfile.objects.create(role='instructor', email='other@example.com', supabase_id=uuid.uuid4())
+    pattern = {'inhale_duration': 4, 'hold_duration': 7, 'exhale_duration': 8, 'cycles': 2}
+    mine = BreathingExercise.objects.create(name='4-7-8', instructor=instructor_profile, **pattern)
+    theirs = BreathingExercise.objects.create(name='Relax', instructor=other, **pattern)
+
+    first = get_breathing_cue_track(mine, fake_storage)
+    assert get_breathing_cue_track(theirs, fake_storage) == first
+    assert first.duration_seconds == 38
+    assert AudioRender.objects.count() == 1
+    assert first.supabase_path in fake_storage.objects
+
+    monkeypatch.setattr('routines.main_views.get_storage', lambda: fake_storage)
+    api_client.force_authenticate(user=instructor_profile)
+    response = api_client.get(reverse('breathing-exercise-cue-track', kwargs={'pk': mine.pk}))
+    assert response.status_code == 200
+    assert response.data['id'] == first.id
+    assert first.supabase_path in response.data['url']
+
+@pytest.mark.django_db
+def test_cue_track_rendered_offline(api_client, instructor_profile, fake_storage, monkeypatch):
+    """Test that a missing cue track is accepted for rendering rather than rendered in the request."""
+    monkeypatch.setattr('routines.main_views.get_storage', lambda: fake_storage)
+    monkeypatch.setattr('routines.management.commands.render_breathing_cues.get_storage', lambda: fake_storage)
+    exercise = BreathingExercise.objects.create(
+        name='Box', instructor=instructor_profile, inhale_duration=1, hold_duration=1, exhale_duration=1, cycles=1
+    )
+    api_client.force_authenticate(user=instructor_profile)
+    url = reverse('breathing-exercise-cue-track', kwargs={'pk': exercise.pk})
+
+    assert api_client.get(url).status_code == 202
+    assert not AudioRender.objects.exists()
+
+    call_command('render_breathing_cues')
+    call_command('render_breathing_cues')
+    assert AudioRender.objects.count() == 1
+
+    response = api_client.get(url)
+    assert response.status_code == 200
+    assert response.data['duration_seconds'] == 3
+
+def test_meditation_mix_ducks_and_loops_background():
+    """Test that the background is ducked under the voice and looped to its length."""
+    sample_rate = 8000
+    t = np.arange(4 * sample_rate, dtype=np.float32) / sample_rate
+    voice = (0.5 * np.sin(2 * np.pi * 300 * t) * (t >= 2)).reshape(-1, 1)
+    background = 0.5 * np.sin(2 * np.pi * 100 * t[:sample_rate]).reshape(-1, 1)
+
+    output = io.BytesIO()
+    duration = write_meditation_mix(
+        output,
+        io.BytesIO(make_wav(voice, sample_rate)),
+        io.BytesIO(make_wav(np.column_stack([background, background]), sample_rate))
+    )
+    output.seek(0)
+    with wave.open(output, 'rb') as reader:
+        assert reader.getnchannels() == 2
+        assert reader.getnframes() == len(voice)
+        mixed = np.frombuffer(reader.readframes(reader.getnframes()), dtype='<i2').reshape(-1, 2) / 32768
+
+    assert duration == 4
+    # Only the looped background plays during the first two seconds
+    quiet = mixed[int(1.5 * sample_rate):2 * sample_rate, 0]
+    ducked_background = mixed[3 * sample_rate:, 0] - voice[3 * sample_rate:, 0]
+    assert np.abs(quiet).max() > 0.2
+    assert np.abs(ducked_background).max() < 0.1
+
+def test_meditation_mix_rejects_mismatched_rates():
+    """Test that tracks with different sample rates are not mixed."""
+    samples = np.zeros((100, 1), dtype=np.float32)
+    with pytest.raises(UnsupportedAudioFormat):
+        write_meditation_mix(
+            io.BytesIO(),
+            io.BytesIO(make_wav(samples, 8000)),
+            io.BytesIO(make_wav(samples, 16000))
+        )
+
+@pytest.mark.django_db
+def test_meditation_mix_rendered_and_invalidated(instructor_profile, fake_storage, monkeypatch):
+    """Test that mixes are rendered once per track pair and dropped when a track changes."""
+    monkeypatch.setattr('routines.management.commands.render_meditation_mixes.get_storage', lambda: fake_storage)
+    tone = np.sin(np.linspace(0, 300, 8000, dtype=np.float32)).reshape(-1, 1) * 0.3
+    assets = {}
+    for name in ('guided', 'background'):
+        fake_storage.put_file(f'1/audio/{name}.wav', make_wav(tone), 'audio/wav')
+        assets[name] = MediaAsset.objects.create(
+            name=name, asset_type='audio', file_size=100, supabase_path=f'1/audio/{name}.wav'
+        )
+    session = MeditationSession.objects.create(
+        name='Evening', instructor=instructor_profile,
+        guided_audio=assets['guided'], background_audio=assets['background']
+    )
+
+    call_command('render_meditation_mixes')
+    call_command('render_meditation_mixes')
+
+    session.refresh_from_db()
+    mix = find_meditation_mix(session)
+    assert AudioRender.objects.filter(kind='meditation_mix').count() == 1
+    assert mix.duration_seconds == 1
+    assert all(MediaAsset.objects.filter(pk__in=[a.pk for a in assets.values()]).values_list('content_hash', flat=True))
+
+    # Replacing a track with one of the same size still invalidates the mix
+    assets['guided'].refresh_from_db()
+    assets['guided'].content_hash = 'f' * 64
+    assets['guided'].save()
+    session.refresh_from_db()
+    assert find_meditation_mix(session) is None
+    assert not MediaAsset.objects.filter(pk=mix.pk).exists()
+
+    call_command('render_meditation_mixes')
+    session.refresh_from_db()
+    mix = find_meditation_mix(session)
+    assets['background'].refresh_from_db()
+    assets['background'].file_size = 200
+    assets['background'].save()
+    session.refresh_from_db()
+    assert find_meditation_mix(session) is None
+    assert not MediaAsset.objects.filter(pk=mix.pk).exists()
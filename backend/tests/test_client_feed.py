@@ -0,0 +1,78 @@
+"""
+Tests for the materialized per-client content feed.
+"""
+import pytest
+from django.apps import apps
+from django.core.management import call_command
+from django.urls import reverse
+from importlib import import_module
+from routines.feed import rebuild_feed
+from routines.models import BreathingExercise, ClientFeedItem, ClientInstructorRelationship, Routine
+
+pytestmark = pytest.mark.django_db
+
+def feed(client):
+    return set(ClientFeedItem.objects.filter(client=client).values_list('content_type', 'object_id'))
+
+def test_feed_follows_assignments_and_activation(client_profile, instructor_profile):
+    """Test that assigning, deactivating and unassigning content updates the feed."""
+    routine = Routine.objects.create(name='Morning', instructor=instructor_profile)
+    breathing = BreathingExercise.objects.create(name='Box', instructor=instructor_profile)
+    relationship = ClientInstructorRelationship.objects.create(client=client_profile, instructor=instructor_profile)
+    assert feed(client_profile) == {('breathing', breathing.id)}
+
+    relationship.routines.add(routine)
+    assert feed(client_profile) == {('breathing', breathing.id), ('routine', routine.id)}
+
+    routine.is_active = False
+    routine.save()
+    assert feed(client_profile) == {('breathing', breathing.id)}
+
+    routine.is_active = True
+    routine.save()
+    routine.assigned_clients.remove(relationship)
+    assert feed(client_profile) == {('breathing', breathing.id)}
+
+    relationship.delete()
+    assert feed(client_profile) == set()
+
+def test_client_lists_read_the_feed(api_client, client_profile, instructor_profile):
+    """Test that the client routine list returns feed content."""
+    routine = Routine.objects.create(name='Morning', instructor=instructor_profile)
+    Routine.objects.create(name='Unassigned', instructor=instructor_profile)
+    ClientInstructorRelationship.objects.create(
+        client=client_profile, instructor=instructor_profile
+    ).routines.add(routine)
+    api_client.force_authenticate(user=client_profile)
+
+    routines = api_client.get(reverse('routine-list')).data['results']
+    assert [row['id'] for row in routines] == [routine.id]
+
+def test_rebuild_repairs_bulk_updates(client_profile, instructor_profile):
+    """Test that rebuilding catches changes made without signals."""
+    breathing = BreathingExercise.objects.create(name='Box', instructor=instructor_profile)
+    ClientInstructorRelationship.objects.create(client=client_profile, instructor=instructor_profile)
+    BreathingExercise.objects.filter(pk=breathing.pk).update(is_active=False)
+    assert feed(client_profile) == {('breathing', breathing.id)}
+
+    assert rebuild_feed() == 1
+    assert feed(client_profile) == set()
+
+    BreathingExercise.objects.filter(pk=breathing.pk).update(is_active=True)
+    call_command('rebuild_client_feed', client_id=client_profile.id)
+    assert feed(client_profile) == {('breathing', breathing.id)}
+
+def test_migration_backfills_existing_feeds(client_profile, instructor_profile):
+    """Test that the data migration gives existing clients the feed signals would have built."""
+    backfill_feed = import_module('routines.migrations.0016_backfill_client_feed').backfill_feed
+    routine = Routine.objects.create(name='Morning', instructor=instructor_profile)
+    Routine.objects.create(name='Unassigned', instructor=instructor_profile)
+    breathing = BreathingExercise.objects.create(name='Box', instructor=instructor_profile)
+    ClientInstructorRelationship.objects.create(
+        client=client_profile, instructor=instructor_profile
+    ).routines.add(routine)
+    ClientFeedItem.objects.all().delete()
+
+    backfill_feed(apps, None)
+
+    assert feed(client_profile) == {('routine', routine.id), ('breathing', breathing.id)}
@@ -0,0 +1,52 @@
+"""
+Tests for ETag / Last-Modified validators on content endpoints.
+"""
+import pytest
+from django.urls import reverse
+from routines.models import Exercise, Routine
+
+pytestmark = pytest.mark.django_db
+
+def test_list_not_modified_until_content_changes(
+    api_client, instructor_profile, django_assert_num_queries, django_capture_on_commit_callbacks
+):
+    """Test that a matching If-None-Match gets a 304 without queries until a nested edit."""
+    routine = Routine.objects.create(name='Morning', instructor=instructor_profile)
+    api_client.force_authenticate(user=instructor_profile)
+    url = reverse('routine-list')
+
+    etag = api_client.get(url)['ETag']
+    with django_assert_num_queries(0):
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304
+    assert response['ETag'] == etag
+
+    with django_capture_on_commit_callbacks(execute=True):
+        Exercise.objects.create(routine=routine, name='Pose', order=0)
+    response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response['ETag'] != etag
+
+def test_query_params_change_the_etag(api_client, instructor_profile):
+    """Test that different pages of a list have different validators."""
+    Routine.objects.create(name='Morning', instructor=instructor_profile)
+    api_client.force_authenticate(user=instructor_profile)
+    url = reverse('routine-list')
+
+    assert api_client.get(url)['ETag'] != api_client.get(url + '?page_size=1')['ETag']
+
+def test_anonymous_detail_uses_updated_at(api_client, instructor_profile):
+    """Test that without a content version, validators come from updated_at."""
+    routine = Routine.objects.create(name='Morning', instructor=instructor_profile)
+    url = reverse('routine-detail', kwargs={'pk': routine.pk})
+
+    response = api_client.get(url)
+    assert response.status_code == 200
+    assert 'Last-Modified' in response
+
+    assert api_client.get(url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']).status_code == 304
+    assert api_client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code == 304
+
+    routine.name = 'Sunrise'
+    routine.save()
+    assert api_client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code == 200
@@ -0,0 +1,68 @@
+"""
+Tests for the client dashboard endpoint.
+"""
+import pytest
+from django.urls import reverse
+from routines.models import (
+    Achievement, BreathingExercise, ClientAchievement, ClientInstructorRelationship,
+    CombinedRoutine, Exercise, ExerciseProgress, MeditationSession, Routine
+)
+from users.models import UserProfile
+import uuid
+
+pytestmark = pytest.mark.django_db
+
+def add_instructor_content(client, email: str) -> None:
+    """Link ``client`` to a new instructor with one of each kind of content."""
+    instructor = UserProfile.objects.create(role='instructor', email=email, supabase_id=uuid.uuid4())
+    relationship = ClientInstructorRelationship.objects.create(client=client, instructor=instructor)
+    routine = Routine.objects.create(name=f'{email} flow', instructor=instructor)
+    Exercise.objects.create(routine=routine, name='Pose', order=0)
+    Exercise.objects.create(routine=routine, name='Pose', order=1)
+    relationship.routines.add(routine)
+    breathing = BreathingExercise.objects.create(name='Box', instructor=instructor)
+    MeditationSession.objects.create(name='Calm', instructor=instructor)
+    CombinedRoutine.objects.create(name='Evening', instructor=instructor)
+    ExerciseProgress.objects.create(client=client, breathing_exercise=breathing, duration_seconds=60)
+
+def test_dashboard_payload(api_client, client_profile):
+    """Test that the dashboard combines content, stats and achievements."""
+    add_instructor_content(client_profile, 'one@example.com')
+    Routine.objects.create(name='Unassigned', instructor=UserProfile.objects.get(email='one@example.com'))
+    achievement = Achievement.objects.create(
+        name='First breath', description='', achievement_type='milestone', criteria={}
+    )
+    ClientAchievement.objects.create(client=client_profile, achievement=achievement)
+    api_client.force_authenticate(user=client_profile)
+
+    response = api_client.get(reverse('client-dashboard'))
+
+    assert response.status_code == 200
+    assert [instructor['email'] for instructor in response.data['instructors']] == ['one@example.com']
+    assert [(routine['name'], routine['exercise_count']) for routine in response.data['routines']] == [
+        ('one@example.com flow', 2)
+    ]
+    assert len(response.data['breathing_exercises']) == 1
+    assert len(response.data['meditation_sessions']) == 1
+    assert len(response.data['combined_routines']) == 1
+    assert response.data['stats']['total_duration'] == 60
+    assert response.data['stats']['by_type'] == {'exercise': 0, 'breathing': 1, 'meditation': 0}
+    assert response.data['achievements'][0]['name'] == 'First breath'
+
+def test_dashboard_constant_queries(api_client, client_profile, assert_constant_queries):
+    """Test that more instructors and content do not add queries."""
+    add_instructor_content(client_profile, 'one@example.com')
+    api_client.force_authenticate(user=client_profile)
+
+    def fetch():
+        assert api_client.get(reverse('client-dashboard')).status_code == 200
+
+    assert_constant_queries(
+        fetch,
+        lambda: [add_instructor_content(client_profile, f'{i}@example.com') for i in range(3)]
+    )
+
+def test_dashboard_clients_only(api_client, instructor_profile):
+    """Test that instructors are refused."""
+    api_client.force_authenticate(user=instructor_profile)
+    assert api_client.get(reverse('client-dashboard')).status_code == 403
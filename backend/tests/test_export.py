@@ -0,0 +1,74 @@
+"""
+Tests for the streaming offline export of combined routines.
+"""
+import io
+import json
+import zipfile
+import pytest
+from django.core.files.base import ContentFile
+from django.urls import reverse
+from routines import export
+from routines.models import BreathingExercise, CombinedRoutine, Exercise, MediaAsset, Routine
+
+pytestmark = pytest.mark.django_db
+
+LOCAL_CONTENT = b'local pose video' * 1000
+REMOTE_CONTENT = b'remote breath audio' * 1000
+
+@pytest.fixture
+def combined_routine(settings, tmp_path, instructor_profile, fake_storage):
+    """Create a combined routine with a local, a stored and an unreadable asset."""
+    settings.MEDIA_ROOT = str(tmp_path)
+    # A supabase_path keeps MediaAsset.save() from uploading the file
+    local = MediaAsset(name='pose', asset_type='video', file_size=len(LOCAL_CONTENT), supabase_path='local')
+    local.file.save('pose.mp4', ContentFile(LOCAL_CONTENT), save=False)
+    local.save()
+    fake_storage.put_file('instructor/breath.wav', REMOTE_CONTENT, 'audio/wav')
+    remote = MediaAsset.objects.create(
+        name='breath', asset_type='audio', file_size=len(REMOTE_CONTENT), supabase_path='instructor/breath.wav'
+    )
+    lost = MediaAsset.objects.create(name='lost', asset_type='audio', file_size=10, supabase_path='instructor/lost.wav')
+
+    routine = Routine.objects.create(name='Morning', instructor=instructor_profile)
+    exercise = Exercise.objects.create(routine=routine, name='Sun salutation', order=1)
+    exercise.media_assets.add(local)
+    breathing = BreathingExercise.objects.create(name='Box', instructor=instructor_profile)
+    breathing.media_assets.add(remote, lost)
+
+    combined = CombinedRoutine.objects.create(name='Full practice', instructor=instructor_profile)
+    combined.routines.add(routine)
+    combined.breathing_exercises.add(breathing)
+    return combined
+
+def test_export_bundle_contents(combined_routine, fake_storage, django_assert_max_num_queries):
+    """Test that media are stored as-is and the manifest lists what was exported."""
+    with django_assert_max_num_queries(7):
+        combined = export.load_combined_routine(combined_routine.pk)
+        data = b''.join(export.iter_bundle(combined, fake_storage))
+
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        manifest = json.loads(archive.read('manifest.json'))
+        media = {item['id']: item for item in manifest['media']}
+        local, remote, lost = MediaAsset.objects.order_by('id')
+
+        assert archive.read(media[local.id]['path']) == LOCAL_CONTENT
+        assert archive.read(media[remote.id]['path']) == REMOTE_CONTENT
+        assert archive.getinfo(media[remote.id]['path']).compress_type == zipfile.ZIP_STORED
+
+    assert manifest['missing_media'] == [lost.id]
+    assert manifest['routines'][0]['exercises'][0]['media'] == [local.id]
+    assert sorted(manifest['breathing_exercises'][0]['media']) == [remote.id, lost.id]
+
+def test_export_endpoint_streams(api_client, instructor_profile, combined_routine, fake_storage, monkeypatch):
+    """Test that the export action streams a ZIP attachment."""
+    monkeypatch.setattr(export, 'get_storage', lambda: fake_storage)
+    api_client.force_authenticate(user=instructor_profile)
+
+    url = reverse('combined-routine-export', kwargs={'pk': combined_routine.pk})
+    response = api_client.get(url, HTTP_ACCEPT='application/zip')
+
+    assert response.status_code == 200
+    assert response.streaming
+    assert response['Content-Disposition'] == f'attachment; filename="routine-{combined_routine.pk}.zip"'
+    with zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content))) as archive:
+        assert 'manifest.json' in archive.namelist()
@@ -0,0 +1,48 @@
+"""
+Tests for BlurHash image placeholders.
+"""
+import io
+import numpy as np
+import pytest
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from PIL import Image
+from core.images import blurhash_encode, image_placeholder
+from routines.models import MediaAsset
+from routines.serializers import MediaAssetSerializer
+
+def _png(pixels: np.ndarray) -> bytes:
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+def test_blurhash_matches_reference():
+    """Test the encoding against a value produced by the reference encoder."""
+    pixels = np.full((8, 8, 3), [200, 100, 50], dtype=np.uint8)
+    assert blurhash_encode(pixels, 4, 3) == 'LNM|T9}XfQ}X}XsofQsofQfQfQfQ'
+
+def test_image_placeholder_downscales_large_images():
+    """Test that a large image gets a placeholder and unreadable data does not."""
+    pixels = np.zeros((1200, 1600, 3), dtype=np.uint8)
+    pixels[:, :800] = [30, 120, 200]
+
+    placeholder = image_placeholder(_png(pixels))
+    assert len(placeholder) == 28
+    assert placeholder[0] == 'L'
+    assert image_placeholder(b'not an image') is None
+
+@pytest.mark.django_db
+def test_compute_blurhashes_backfills(settings, tmp_path):
+    """Test that the backfill command stores placeholders exposed by the serializer."""
+    settings.MEDIA_ROOT = str(tmp_path)
+    data = _png(np.full((16, 16, 3), [200, 100, 50], dtype=np.uint8))
+    # A supabase_path keeps MediaAsset.save() from uploading the file
+    asset = MediaAsset(name='pose', asset_type='image', file_size=len(data), supabase_path='local')
+    asset.file.save('pose.png', ContentFile(data), save=False)
+    asset.save()
+
+    call_command('compute_blurhashes', stdout=io.StringIO())
+
+    asset.refresh_from_db()
+    assert asset.blurhash == image_placeholder(data)
+    assert MediaAssetSerializer().fields['blurhash'].read_only
@@ -0,0 +1,74 @@
+"""
+Tests for the orjson renderer and parser.
+"""
+import datetime
+import decimal
+import json
+import numpy as np
+import pytest
+import uuid
+from core.parsers import ORJSONParser
+from core.renderers import ORJSONRenderer
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from io import BytesIO, StringIO
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from routines.models import Routine
+
+def test_renders_like_json_renderer():
+    """Test that rich Python types encode to the same JSON as DRF's renderer."""
+    data = {
+        'aware': timezone.now(),
+        'naive': datetime.datetime(2024, 5, 1, 7, 30),
+        'date': datetime.date(2024, 5, 1),
+        'time': datetime.time(7, 30, 15, 250),
+        'duration': datetime.timedelta(minutes=5),
+        'uuid': uuid.uuid4(),
+        'decimal': decimal.Decimal('4.50'),
+        'lazy': gettext_lazy('Breathe'),
+        'array': np.arange(3),
+        1: ['int keys', ('and', 'tuples')],
+    }
+    assert json.loads(ORJSONRenderer().render(data)) == json.loads(JSONRenderer().render(data))
+
+def test_render_edge_cases():
+    """Test empty bodies, indentation and JavaScript-safe line separators."""
+    renderer = ORJSONRenderer()
+    assert renderer.render(None) == b''
+    assert renderer.render({'a': 1}) == b'{"a":1}'
+    assert renderer.render({'a': 1}, 'application/json; indent=4') == b'{\n  "a": 1\n}'
+    assert renderer.render(['\u2028\u2029']) == JSONRenderer().render(['\u2028\u2029'])
+
+def test_parser():
+    """Test parsing, rejection of invalid JSON and non-UTF-8 bodies."""
+    parser = ORJSONParser()
+    assert parser.parse(BytesIO(b'{"name": "Flow", "ids": [1, 2]}')) == {'name': 'Flow', 'ids': [1, 2]}
+    assert parser.parse(BytesIO('"Ūdāna"'.encode('utf-16')), parser_context={'encoding': 'utf-16'}) == 'Ūdāna'
+    for body in (b'{"name":', b'[NaN]'):
+        with pytest.raises(ParseError):
+            parser.parse(BytesIO(body))
+
+@pytest.mark.django_db
+def test_api_uses_orjson(api_client, instructor_profile):
+    """Test that the API parses and renders JSON with the orjson classes by default."""
+    api_client.force_authenticate(user=instructor_profile)
+    response = api_client.post(
+        reverse('routine-list'),
+        json.dumps({'name': 'Évening', 'description': 'Wind down', 'exercises': []}),
+        content_type='application/json'
+    )
+    assert response.status_code == 201
+    assert isinstance(response.accepted_renderer, ORJSONRenderer)
+    assert Routine.objects.get().name == 'Évening'
+    assert response.json()['name'] == 'Évening'
+
+@pytest.mark.django_db
+def test_benchmark_command():
+    """Test that the benchmark confirms identical output."""
+    out = StringIO()
+    call_command('benchmark_json_rendering', scale=2, repeat=1, stdout=out)
+    assert 'Identical output for every payload' in out.getvalue()
+    assert not Routine.objects.exists()
@@ -0,0 +1,80 @@
+"""
+Tests for the per-client media prefetch manifest.
+"""
+import pytest
+from django.urls import reverse
+from routines import media
+from routines.models import (
+    BreathingExercise,
+    ClientInstructorRelationship,
+    CombinedRoutine,
+    Exercise,
+    MediaAsset,
+    MeditationSession,
+    Routine,
+)
+
+pytestmark = pytest.mark.django_db
+
+def _asset(name: str, **kwargs) -> MediaAsset:
+    return MediaAsset.objects.create(
+        name=name, asset_type='audio', file_size=100, supabase_path=f'instructor/{name}.wav', **kwargs
+    )
+
+@pytest.fixture
+def assignments(client_profile, instructor_profile):
+    """Assign a routine and a combined routine to the client; return the assets they use."""
+    relationship = ClientInstructorRelationship.objects.create(client=client_profile, instructor=instructor_profile)
+    pose, breath, voice, other, retired = (
+        _asset('pose', content_hash='a' * 64), _asset('breath'), _asset('voice'), _asset('other'),
+        _asset('retired', is_active=False)
+    )
+
+    routine = Routine.objects.create(name='Morning', instructor=instructor_profile)
+    Exercise.objects.create(routine=routine, name='Sun salutation', order=1).media_assets.add(pose, retired)
+    relationship.routines.add(routine)
+    unassigned = Routine.objects.create(name='Evening', instructor=instructor_profile)
+    Exercise.objects.create(routine=unassigned, name='Twist', order=1).media_assets.add(other)
+
+    breathing = BreathingExercise.objects.create(name='Box', instructor=instructor_profile)
+    breathing.media_assets.add(breath)
+    session = MeditationSession.objects.create(name='Calm', instructor=instructor_profile, guided_audio=voice)
+    combined = CombinedRoutine.objects.create(name='Full practice', instructor=instructor_profile)
+    combined.breathing_exercises.add(breathing)
+    combined.meditation_sessions.add(session)
+    return [pose, breath, voice]
+
+def test_readable_media_single_query(client_profile, assignments, django_assert_num_queries):
+    """Test that assigned and combined-routine assets are found in one query."""
+    with django_assert_num_queries(1):
+        found = list(media.readable_media(client_profile).order_by('pk'))
+    assert found == assignments
+
+def test_manifest_follows_the_feed(client_profile, instructor_profile, assignments, fake_storage):
+    """Test that inactive assigned routines are left out and standalone content is included."""
+    pose, breath, voice = assignments
+    routine = Routine.objects.get(name='Morning')
+    routine.is_active = False
+    routine.save()
+    rain = _asset('rain')
+    MeditationSession.objects.create(name='Sleep', instructor=instructor_profile, background_audio=rain)
+    standalone = BreathingExercise.objects.create(name='Sigh', instructor=instructor_profile)
+    sigh = _asset('sigh')
+    standalone.media_assets.add(sigh)
+
+    manifest = media.build_media_manifest(client_profile, lambda pk: f'/media/{pk}/', fake_storage)
+    assert [asset['id'] for asset in manifest] == [breath.id, voice.id, rain.id, sigh.id]
+
+def test_manifest_endpoint(api_client, client_profile, assignments, fake_storage, monkeypatch):
+    """Test that the manifest lists hashes, sizes and signed URLs."""
+    monkeypatch.setattr(media, 'get_storage', lambda: fake_storage)
+    api_client.force_authenticate(user=client_profile)
+
+    response = api_client.get(reverse('media-manifest'))
+
+    assert response.status_code == 200
+    pose = response.data['assets'][0]
+    assert [asset['id'] for asset in response.data['assets']] == [asset.id for asset in assignments]
+    assert pose['content_hash'] == 'a' * 64
+    assert pose['file_size'] == 100
+    assert pose['url'].startswith('https://storage.test/instructor/pose.wav')
@@ -0,0 +1,91 @@
+"""
+Tests for the media where-used index and reference-aware deletion.
+"""
+import pytest
+from django.urls import reverse
+from routines import media
+from routines.models import BreathingExercise, Exercise, MediaAsset, MeditationSession, Routine
+
+pytestmark = pytest.mark.django_db
+
+@pytest.fixture
+def assets(instructor_profile):
+    """Create three assets: one used by an exercise and a session, one by breathing, one unused."""
+    pose, breath, spare = (
+        MediaAsset.objects.create(
+            name=name, asset_type='audio', file_size=10,
+            supabase_path=f'{instructor_profile.id}/audio/{name}.wav', instructor=instructor_profile
+        )
+        for name in ('pose', 'breath', 'spare')
+    )
+    routine = Routine.objects.create(name='Morning', instructor=instructor_profile)
+    exercise = Exercise.objects.create(routine=routine, name='Sun salutation', order=1)
+    exercise.media_assets.add(pose)
+    breathing = BreathingExercise.objects.create(name='Box', instructor=instructor_profile)
+    breathing.media_assets.add(breath)
+    session = MeditationSession.objects.create(
+        name='Calm', instructor=instructor_profile, guided_audio=pose, background_audio=pose
+    )
+    return {'pose': pose, 'breath': breath, 'spare': spare, 'exercise': exercise,
+            'breathing': breathing, 'session': session}
+
+def test_find_references_fixed_queries(assets, django_assert_num_queries):
+    """Test that a batch of assets is resolved in three queries."""
+    ids = [assets['pose'].id, assets['breath'].id, assets['spare'].id]
+    with django_assert_num_queries(3):
+        references = media.find_references(ids)
+
+    assert references[assets['pose'].id] == {
+        'exercises': [assets['exercise'].id],
+        'breathing_exercises': [],
+        'meditation_sessions': [assets['session'].id],
+    }
+    assert references[assets['breath'].id]['breathing_exercises'] == [assets['breathing'].id]
+    assert not media.is_referenced(references[assets['spare'].id])
+
+def test_bulk_delete_refuses_then_forces(api_client, instructor_profile, assets, fake_storage, monkeypatch):
+    """Test that used assets block deletion unless forced, and files go in one batch."""
+    monkeypatch.setattr(media, 'get_storage', lambda: fake_storage)
+    for asset in ('pose', 'breath', 'spare'):
+        fake_storage.add(assets[asset].supabase_path)
+    api_client.force_authenticate(user=instructor_profile)
+    url = reverse('media-bulk-delete')
+    ids = [assets['pose'].id, assets['spare'].id]
+
+    response = api_client.post(url, {'ids': ids}, format='json')
+    assert response.status_code == 409
+    assert list(response.data['in_use']) == [assets['pose'].id]
+    assert MediaAsset.objects.count() == 3
+
+    response = api_client.post(url, {'ids': ids, 'force': 'false'}, format='json')
+    assert response.status_code == 409
+
+    response = api_client.post(url, {'ids': ids + [999], 'force': True}, format='json')
+    assert response.status_code == 200
+    assert sorted(response.data['deleted']) == sorted(ids)
+    assert response.data['failed'] == []
+    assert response.data['not_found'] == [999]
+    assert list(fake_storage.objects) == [assets['breath'].supabase_path]
+    assets['session'].refresh_from_db()
+    assert assets['session'].guided_audio is None
+    assert not assets['exercise'].media_assets.exists()
+
+def test_destroy_refuses_used_asset(api_client, instructor_profile, assets):
+    """Test that deleting a single used asset reports where it is used."""
+    api_client.force_authenticate(user=instructor_profile)
+    response = api_client.delete(reverse('media-detail', kwargs={'pk': assets['breath'].pk}))
+
+    assert response.status_code == 409
+    assert response.data['references']['breathing_exercises'] == [assets['breathing'].id]
+
+def test_bulk_delete_keeps_assets_when_storage_fails(api_client, instructor_profile, assets, fake_storage, monkeypatch):
+    """Test that assets whose files cannot be deleted are kept and reported."""
+    monkeypatch.setattr(media, 'get_storage', lambda: fake_storage)
+    monkeypatch.setattr(fake_storage, 'delete_files', lambda paths: False)
+    api_client.force_authenticate(user=instructor_profile)
+
+    response = api_client.post(reverse('media-bulk-delete'), {'ids': [assets['spare'].id]}, format='json')
+    assert response.status_code == 200
+    assert response.data['deleted'] == []
+    assert response.data['failed'] == [assets['spare'].id]
+    assert MediaAsset.objects.filter(pk=assets['spare'].pk).exists()
@@ -0,0 +1,87 @@
+"""
+Tests for range requests and conditional GETs on the media stream endpoint.
+"""
+import hashlib
+import pytest
+from django.core.files.base import ContentFile
+from django.urls import reverse
+from core.http import RangeNotSatisfiable, parse_range
+from routines.models import BreathingExercise, ClientInstructorRelationship, MediaAsset
+from users.models import UserProfile
+import uuid
+
+pytestmark = pytest.mark.django_db
+
+CONTENT = bytes(range(256)) * 40
+
+@pytest.fixture
+def local_asset(settings, tmp_path, instructor_profile):
+    """Create an instructor's asset backed by a local file."""
+    settings.MEDIA_ROOT = str(tmp_path)
+    # A supabase_path keeps MediaAsset.save() from uploading the file
+    asset = MediaAsset(
+        name='bell', asset_type='audio', file_size=len(CONTENT), supabase_path='local', instructor=instructor_profile
+    )
+    asset.file.save('bell.wav', ContentFile(CONTENT), save=False)
+    asset.save()
+    return asset
+
+@pytest.fixture
+def stream_client(api_client, client_profile, instructor_profile, local_asset):
+    """Return a client authenticated as a client whose feed uses the asset."""
+    ClientInstructorRelationship.objects.create(client=client_profile, instructor=instructor_profile)
+    BreathingExercise.objects.create(name='Bell', instructor=instructor_profile).media_assets.add(local_asset)
+    api_client.force_authenticate(user=client_profile)
+    return api_client
+
+def test_parse_range():
+    """Test open-ended, suffix, clamped and unsatisfiable ranges."""
+    assert parse_range('bytes=0-99', 1000) == (0, 99)
+    assert parse_range('bytes=900-', 1000) == (900, 999)
+    assert parse_range('bytes=-100', 1000) == (900, 999)
+    assert parse_range('bytes=500-5000', 1000) == (500, 999)
+    assert parse_range('bytes=0-1,5-9', 1000) is None
+    with pytest.raises(RangeNotSatisfiable):
+        parse_range('bytes=1000-', 1000)
+
+def test_stream_range_request(stream_client, local_asset):
+    """Test that only the requested bytes are sent."""
+    url = reverse('media-stream', kwargs={'pk': local_asset.pk})
+    response = stream_client.get(url, HTTP_RANGE='bytes=100-199', HTTP_ACCEPT='audio/*')
+
+    assert response.status_code == 206
+    assert response['Content-Range'] == f'bytes 100-199/{len(CONTENT)}'
+    assert b''.join(response.streaming_content) == CONTENT[100:200]
+    assert response['ETag'] == f'"{hashlib.sha256(CONTENT).hexdigest()}"'
+
+def test_stream_conditional_requests(stream_client, local_asset):
+    """Test If-None-Match and a stale If-Range."""
+    url = reverse('media-stream', kwargs={'pk': local_asset.pk})
+    etag = stream_client.get(url)['ETag']
+
+    assert stream_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+    response = stream_client.get(url, HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"stale"')
+    assert response.status_code == 200
+    assert b''.join(response.streaming_content) == CONTENT
+
+    response = stream_client.get(url, HTTP_RANGE=f'bytes={len(CONTENT)}-')
+    assert response.status_code == 416
+
+def test_stream_requires_access(api_client, client_profile, instructor_profile, local_asset):
+    """Test that only the owner and clients whose feed uses the asset can stream it."""
+    url = reverse('media-stream', kwargs={'pk': local_asset.pk})
+    other_instructor = UserProfile.objects.create(
+        role='instructor', email='other@example.com', supabase_id=uuid.uuid4()
+    )
+    for user in (client_profile, other_instructor):
+        api_client.force_authenticate(user=user)
+        assert api_client.get(url).status_code == 404
+
+    api_client.force_authenticate(user=instructor_profile)
+    assert api_client.get(url).status_code == 200
+
+    ClientInstructorRelationship.objects.create(client=client_profile, instructor=instructor_profile)
+    BreathingExercise.objects.create(name='Bell', instructor=instructor_profile).media_assets.add(local_asset)
+    api_client.force_authenticate(user=client_profile)
+    assert api_client.get(url).status_code == 200
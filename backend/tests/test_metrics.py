@@ -0,0 +1,42 @@
+"""
+Tests for storage metrics and the Server-Timing header.
+"""
+import pytest
+from django.urls import reverse
+from rest_framework import status
+from core.metrics import MetricsRegistry, observe_storage_call, server_timing_header
+
+pytestmark = pytest.mark.django_db
+
+def test_histogram_renders_cumulative_buckets():
+    """Test that histogram buckets are cumulative and include +Inf."""
+    registry = MetricsRegistry()
+    latency = registry.histogram('op_seconds', 'Op latency.', ['operation'], buckets=[0.1, 1])
+    latency.observe(0.05, operation='sign')
+    latency.observe(0.5, operation='sign')
+    latency.observe(5, operation='sign')
+
+    text = registry.render()
+
+    assert 'op_seconds_bucket{operation="sign",le="0.1"} 1' in text
+    assert 'op_seconds_bucket{operation="sign",le="1.0"} 2' in text
+    assert 'op_seconds_bucket{operation="sign",le="+Inf"} 3' in text
+    assert 'op_seconds_count{operation="sign"} 3' in text
+
+def test_server_timing_header_groups_operations():
+    """Test that timings are summed per operation."""
+    header = server_timing_header([('sign', 0.01), ('sign', 0.02), ('list', 0.1)])
+    assert header == 'storage-sign;dur=30.0;desc="2 calls", storage-list;dur=100.0;desc="1 call"'
+
+def test_metrics_endpoint_requires_token(api_client, settings):
+    """Test that the metrics endpoint is only served with the scrape token."""
+    settings.METRICS_TOKEN = 'scrape-secret'
+    observe_storage_call('sign', 'media-assets', 'ok', 0.01)
+    url = reverse('metrics')
+
+    response = api_client.get(url)
+    assert response.status_code in (status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN)
+
+    response = api_client.get(url, HTTP_X_METRICS_TOKEN='scrape-secret')
+    assert response.status_code == status.HTTP_200_OK
+    assert b'storage_operation_duration_seconds_bucket' in response.content
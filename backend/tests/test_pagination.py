@@ -0,0 +1,49 @@
+"""
+Tests for cursor pagination of list endpoints.
+"""
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+from routines.models import ExerciseProgress
+
+pytestmark = pytest.mark.django_db
+
+def walk(api_client, url):
+    """Follow ``next`` links from ``url``, returning every page's rows."""
+    rows = []
+    while url:
+        response = api_client.get(url)
+        assert response.status_code == 200
+        rows.extend(response.data['results'])
+        url = response.data['next']
+    return rows
+
+def test_progress_pages_cover_every_row_once(api_client, client_profile):
+    """Test that cursor pages return all progress newest first, including rows sharing a timestamp."""
+    for seconds in range(7):
+        ExerciseProgress.objects.create(client=client_profile, duration_seconds=seconds)
+    # Rows completed at the same instant are ordered by id
+    ExerciseProgress.objects.filter(duration_seconds__lt=4).update(completed_at=timezone.now())
+    api_client.force_authenticate(user=client_profile)
+
+    rows = walk(api_client, reverse('progress-list') + '?page_size=2')
+
+    expected = list(
+        ExerciseProgress.objects.order_by('-completed_at', '-id').values_list('id', flat=True)
+    )
+    assert [row['id'] for row in rows] == expected
+
+def test_page_queries_do_not_depend_on_depth(api_client, client_profile, django_assert_max_num_queries):
+    """Test that a deep page runs no more queries than the first."""
+    for seconds in range(6):
+        ExerciseProgress.objects.create(client=client_profile, duration_seconds=seconds)
+    api_client.force_authenticate(user=client_profile)
+    url = reverse('progress-list') + '?page_size=2'
+
+    first = api_client.get(url)
+    second = api_client.get(first.data['next'])
+    with django_assert_max_num_queries(3):
+        third = api_client.get(second.data['next'])
+
+    assert len(third.data['results']) == 2
+    assert third.data['next'] is None
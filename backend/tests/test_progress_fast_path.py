@@ -0,0 +1,45 @@
+"""
+Tests for the values() read path of exercise progress.
+"""
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from io import StringIO
+from routines.models import BreathingExercise, Exercise, ExerciseProgress, MeditationSession, Routine
+from routines.progress import progress_values, serialize_progress
+from routines.serializers import ExerciseProgressSerializer
+
+pytestmark = pytest.mark.django_db
+
+def test_fast_path_matches_serializer(api_client, client_profile, instructor_profile):
+    """Test that the list endpoint returns exactly what the serializer would."""
+    routine = Routine.objects.create(name='Morning', instructor=instructor_profile)
+    ExerciseProgress.objects.create(
+        client=client_profile, duration_seconds=30, difficulty_rating=3, notes='Stiff',
+        exercise=Exercise.objects.create(routine=routine, name='Pose', order=0)
+    )
+    ExerciseProgress.objects.create(
+        client=client_profile, duration_seconds=60,
+        breathing_exercise=BreathingExercise.objects.create(name='Box', instructor=instructor_profile)
+    )
+    ExerciseProgress.objects.create(
+        client=client_profile, duration_seconds=90,
+        meditation_session=MeditationSession.objects.create(name='Calm', instructor=instructor_profile)
+    )
+    ExerciseProgress.objects.create(client=client_profile, duration_seconds=5)
+    queryset = ExerciseProgress.objects.order_by('-completed_at', '-id')
+    expected = [dict(row) for row in ExerciseProgressSerializer(queryset, many=True).data]
+
+    assert serialize_progress(progress_values(queryset)) == expected
+    assert [row['exercise_type'] for row in expected] == [None, 'meditation', 'breathing', 'exercise']
+
+    api_client.force_authenticate(user=client_profile)
+    response = api_client.get(reverse('progress-list'))
+    assert response.data['results'] == expected
+
+def test_benchmark_command():
+    """Test that the benchmark confirms identical output."""
+    out = StringIO()
+    call_command('benchmark_progress_list', rows=30, repeat=1, stdout=out)
+    assert 'Identical output' in out.getvalue()
+    assert not ExerciseProgress.objects.exists()
@@ -0,0 +1,79 @@
+"""
+Tests for versioned caching of content list responses.
+"""
+import pytest
+from django.urls import reverse
+from routines.models import ClientInstructorRelationship, Exercise, Routine
+
+pytestmark = pytest.mark.django_db
+
+def routine_names(api_client):
+    return [routine['name'] for routine in api_client.get(reverse('routine-list')).data['results']]
+
+def test_instructor_list_served_from_cache(
+    api_client, instructor_profile, django_assert_num_queries, django_capture_on_commit_callbacks
+):
+    """Test that a repeated list is served without queries and refreshed by committed edits."""
+    routine = Routine.objects.create(name='Morning', instructor=instructor_profile)
+    api_client.force_authenticate(user=instructor_profile)
+    assert routine_names(api_client) == ['Morning']
+
+    with django_assert_num_queries(0):
+        assert routine_names(api_client) == ['Morning']
+
+    # Versions are only bumped on commit
+    with django_capture_on_commit_callbacks() as callbacks:
+        routine.name = 'Sunrise'
+        routine.save()
+    assert routine_names(api_client) == ['Morning']
+    for callback in callbacks:
+        callback()
+    assert routine_names(api_client) == ['Sunrise']
+
+    # Nested content invalidates too
+    with django_capture_on_commit_callbacks(execute=True):
+        Exercise.objects.create(routine=routine, name='Pose', order=0)
+    response = api_client.get(reverse('routine-list') + '?expand=exercises')
+    assert [exercise['name'] for exercise in response.data['results'][0]['exercises']] == ['Pose']
+
+def test_client_list_follows_assignments(
+    api_client, client_profile, instructor_profile, django_assert_num_queries, django_capture_on_commit_callbacks
+):
+    """Test that a client's cached list changes with assignments and instructor edits."""
+    routine = Routine.objects.create(name='Morning', instructor=instructor_profile)
+    relationship = ClientInstructorRelationship.objects.create(client=client_profile, instructor=instructor_profile)
+    api_client.force_authenticate(user=client_profile)
+    assert routine_names(api_client) == []
+
+    with django_capture_on_commit_callbacks(execute=True):
+        relationship.routines.add(routine)
+    assert routine_names(api_client) == ['Morning']
+    with django_assert_num_queries(0):
+        assert routine_names(api_client) == ['Morning']
+
+    with django_capture_on_commit_callbacks(execute=True):
+        routine.name = 'Sunrise'
+        routine.save()
+    assert routine_names(api_client) == ['Sunrise']
+
+def test_local_memory_cache_is_not_used(api_client, instructor_profile, settings):
+    """Test that lists are not cached on a per-process cache, where other workers would miss bumps."""
+    settings.LIST_CACHE_ALLOW_LOCAL_MEMORY = False
+    Routine.objects.create(name='Morning', instructor=instructor_profile)
+    api_client.force_authenticate(user=instructor_profile)
+    routine_names(api_client)
+
+    Routine.objects.update(name='Sunrise')
+    assert routine_names(api_client) == ['Sunrise']
+
+def test_query_params_are_part_of_the_key(api_client, instructor_profile):
+    """Test that different pages are cached separately."""
+    for name in ('One', 'Two'):
+        Routine.objects.create(name=name, instructor=instructor_profile)
+    api_client.force_authenticate(user=instructor_profile)
+
+    first = api_client.get(reverse('routine-list') + '?page_size=1').data
+    second = api_client.get(first['next']).data
+
+    assert [row['name'] for row in first['results']] == ['Two']
+    assert [row['name'] for row in second['results']] == ['One']
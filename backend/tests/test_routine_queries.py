@@ -0,0 +1,54 @@
+"""
+Query-count guards for routine and relationship listings.
+"""
+import pytest
+from django.urls import reverse
+from routines.models import ClientInstructorRelationship, Exercise, MediaAsset, Routine
+
+pytestmark = pytest.mark.django_db
+
+def make_routine(instructor, name: str) -> Routine:
+    """Create a routine with two exercises, each with its own media asset."""
+    routine = Routine.objects.create(name=name, instructor=instructor)
+    for order in range(2):
+        exercise = Exercise.objects.create(routine=routine, name=f'{name} {order}', order=order)
+        exercise.media_assets.add(MediaAsset.objects.create(
+            name=f'{name} {order}', asset_type='image', file_size=10,
+            supabase_path='local', instructor=instructor
+        ))
+    return routine
+
+def test_routine_list_constant_queries(api_client, instructor_profile, assert_constant_queries):
+    """Test that listing routines costs the same number of queries for 1 or 5 routines."""
+    make_routine(instructor_profile, 'Morning')
+    api_client.force_authenticate(user=instructor_profile)
+
+    def fetch():
+        response = api_client.get(reverse('routine-list') + '?expand=exercises.media_assets')
+        assert response.status_code == 200
+        return response
+
+    assert_constant_queries(fetch, lambda: [make_routine(instructor_profile, f'Flow {i}') for i in range(4)])
+
+    routines = fetch().data['results']
+    assert len(routines) == 5
+    exercises = routines[0]['exercises']
+    assert [exercise['order'] for exercise in exercises] == [0, 1]
+    assert exercises[0]['media_assets'][0]['url'].endswith(
+        reverse('media-stream', kwargs={'pk': exercises[0]['media_assets'][0]['id']})
+    )
+
+def test_relationship_list_constant_queries(api_client, instructor_profile, client_profile, assert_constant_queries):
+    """Test that listing relationships does not query per assigned routine."""
+    relationship = ClientInstructorRelationship.objects.create(client=client_profile, instructor=instructor_profile)
+    relationship.routines.add(make_routine(instructor_profile, 'Morning'))
+    api_client.force_authenticate(user=client_profile)
+
+    def fetch():
+        response = api_client.get(reverse('relationship-list') + '?expand=routines.exercises.media_assets')
+        assert response.status_code == 200
+
+    assert_constant_queries(
+        fetch,
+        lambda: relationship.routines.add(*(make_routine(instructor_profile, f'Flow {i}') for i in range(4)))
+    )
@@ -0,0 +1,99 @@
+"""
+Tests for the S3-compatible storage backend, run against moto's in-process S3.
+"""
+import io
+import threading
+import time
+import pytest
+from moto import mock_aws
+from core import resilience, s3_storage
+from core.s3_storage import S3Storage
+from core.storage import get_storage
+
+PART_SIZE = 5 * 1024 * 1024
+
+@pytest.fixture(autouse=True)
+def s3_settings(settings, monkeypatch):
+    """Point the backend at a mocked bucket with small parts."""
+    settings.MEDIA_STORAGE_BACKEND = 'core.s3_storage.S3Storage'
+    settings.AWS_STORAGE_BUCKET_NAME = 'test-media'
+    settings.AWS_S3_ENDPOINT_URL = None
+    settings.AWS_ACCESS_KEY_ID = 'testing'
+    settings.AWS_SECRET_ACCESS_KEY = 'testing'
+    settings.S3_MULTIPART_PART_SIZE = PART_SIZE
+    settings.S3_MULTIPART_CONCURRENCY = 3
+    monkeypatch.setattr(resilience, '_breakers', {})
+    monkeypatch.setattr(resilience, '_bulkhead', None)
+    monkeypatch.setattr(s3_storage, '_verified_buckets', set())
+    with mock_aws():
+        yield
+
+def _content(size: int) -> bytes:
+    return bytes(range(256)) * (size // 256) + b'x' * (size % 256)
+
+def test_multipart_upload_sends_parts_in_parallel():
+    """Test that a large upload is split into parts sent concurrently."""
+    storage = get_storage()
+    assert isinstance(storage, S3Storage)
+    upload_part = storage.client.upload_part
+    active, peak, lock = [0], [0], threading.Lock()
+
+    def tracking_upload_part(**kwargs):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.05)
+        try:
+            return upload_part(**kwargs)
+        finally:
+            with lock:
+                active[0] -= 1
+
+    storage.client.upload_part = tracking_upload_part
+    data = _content(2 * PART_SIZE + 1000)
+    storage.put_file('1/video/flow.mp4', data, 'video/mp4')
+
+    stored = storage.client.get_object(Bucket='test-media', Key='1/video/flow.mp4')
+    assert stored['Body'].read() == data
+    assert stored['ETag'].endswith('-3"')
+    assert peak[0] > 1
+
+def test_failed_part_aborts_upload(tmp_path):
+    """Test that a failing part aborts the multipart upload from a file path."""
+    storage = S3Storage()
+    path = tmp_path / 'flow.mp4'
+    path.write_bytes(_content(PART_SIZE + 10))
+    upload_part = storage.client.upload_part
+
+    def failing_upload_part(**kwargs):
+        if kwargs['PartNumber'] == 2:
+            raise ValueError('injected failure')
+        return upload_part(**kwargs)
+
+    storage.client.upload_part = failing_upload_part
+    with pytest.raises(ValueError):
+        storage.put_file('1/video/flow.mp4', str(path), 'video/mp4')
+
+    assert not storage.client.list_multipart_uploads(Bucket='test-media').get('Uploads')
+
+def test_listing_signing_and_deletion():
+    """Test the Supabase-shaped listing, signed downloads and batch deletes."""
+    storage = S3Storage()
+    storage.put_file('1/image/a.png', b'a' * 10, 'image/png')
+    storage.put_file('1/image/b.png', b'b' * 20, 'image/png')
+    storage.put_file('1/audio/c.wav', b'c', 'audio/wav')
+
+    assert [entry['name'] for entry in storage.list_files('1/')] == ['audio', 'image']
+    images = storage.list_files('1/image', limit=1, offset=1)
+    assert images[0]['id'] == '1/image/b.png'
+    assert images[0]['metadata']['size'] == 20
+
+    buffer = io.BytesIO()
+    assert storage.download_to('1/image/a.png', buffer) == 10
+    assert buffer.getvalue() == b'a' * 10
+    urls = storage.get_signed_urls(['1/image/a.png', '1/image/b.png'])
+    assert all('X-Amz-Signature' in url for url in urls.values())
+
+    assert storage.delete_files(['1/image/a.png', '1/image/b.png'])
+    assert storage.get_file_metadata('1/image/a.png') is None
+    assert storage.get_file_metadata('1/audio/c.wav')['size'] == 1
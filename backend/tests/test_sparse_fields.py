@@ -0,0 +1,88 @@
+"""
+Tests for sparse fieldsets and opt-in expansion.
+"""
+import pytest
+from django.urls import reverse
+from core.sparse import parse_paths
+from routines.models import BreathingExercise, CombinedRoutine, Exercise, MediaAsset, MeditationSession, Routine
+
+pytestmark = pytest.mark.django_db
+
+@pytest.fixture
+def routine(instructor_profile):
+    """Create a routine with one exercise that has one media asset."""
+    routine = Routine.objects.create(name='Morning', instructor=instructor_profile)
+    exercise = Exercise.objects.create(routine=routine, name='Pose', order=0)
+    exercise.media_assets.add(MediaAsset.objects.create(
+        name='Pose', asset_type='image', file_size=10, supabase_path='local', instructor=instructor_profile
+    ))
+    return routine
+
+def test_parse_paths():
+    """Test that dotted paths are merged into one tree."""
+    assert parse_paths('id, exercises.name,exercises.media_assets.url,') == {
+        'id': {}, 'exercises': {'name': {}, 'media_assets': {'url': {}}}
+    }
+
+def test_relations_are_opt_in(api_client, instructor_profile, routine, django_assert_num_queries):
+    """Test that nested relations are neither serialized nor loaded unless expanded."""
+    api_client.force_authenticate(user=instructor_profile)
+    url = reverse('routine-list')
+
+    with django_assert_num_queries(1):
+        row = api_client.get(url).data['results'][0]
+    assert 'exercises' not in row
+
+    row = api_client.get(url + '?expand=exercises').data['results'][0]
+    assert [exercise['name'] for exercise in row['exercises']] == ['Pose']
+    assert 'media_assets' not in row['exercises'][0]
+
+    row = api_client.get(url + '?expand=exercises.media_assets').data['results'][0]
+    assert [asset['name'] for asset in row['exercises'][0]['media_assets']] == ['Pose']
+
+def test_sparse_fields(api_client, instructor_profile, routine):
+    """Test that ?fields= trims top-level and nested fields."""
+    api_client.force_authenticate(user=instructor_profile)
+    url = reverse('routine-detail', kwargs={'pk': routine.pk})
+
+    assert api_client.get(url + '?fields=id,name').data == {'id': routine.id, 'name': 'Morning'}
+    assert api_client.get(url + '?fields=id,exercises.name&expand=exercises').data == {
+        'id': routine.id, 'exercises': [{'name': 'Pose'}]
+    }
+    # An expansion that fields excludes is dropped
+    assert api_client.get(url + '?fields=id&expand=exercises').data == {'id': routine.id}
+
+def test_writes_keep_every_field(api_client, instructor_profile):
+    """Test that ?fields= does not drop input on writes."""
+    breathing = BreathingExercise.objects.create(name='Box', instructor=instructor_profile)
+    api_client.force_authenticate(user=instructor_profile)
+    url = reverse('breathing-exercise-detail', kwargs={'pk': breathing.pk})
+    response = api_client.patch(url + '?fields=id', {'name': 'Square', 'cycles': 6}, format='json')
+    assert response.status_code == 200
+    breathing.refresh_from_db()
+    assert (breathing.name, breathing.cycles) == ('Square', 6)
+
+def test_nested_expansion_plans(api_client, instructor_profile, routine, assert_constant_queries):
+    """Test that deep expansions of combined routines are prefetched."""
+    api_client.force_authenticate(user=instructor_profile)
+    url = reverse('combined-routine-list') + (
+        '?expand=routines.exercises.media_assets,breathing_exercises.media_assets,'
+        'meditation_sessions.guided_audio,meditation_sessions.background_audio'
+    )
+
+    def grow():
+        combined = CombinedRoutine.objects.create(name='Evening', instructor=instructor_profile)
+        combined.routines.add(routine)
+        combined.breathing_exercises.add(BreathingExercise.objects.create(name='Box', instructor=instructor_profile))
+        combined.meditation_sessions.add(MeditationSession.objects.create(name='Calm', instructor=instructor_profile))
+
+    def fetch():
+        response = api_client.get(url)
+        assert response.status_code == 200
+        return response
+
+    grow()
+    assert_constant_queries(fetch, grow)
+    row = fetch().data['results'][0]
+    assert row['routines'][0]['exercises'][0]['media_assets'][0]['name'] == 'Pose'
+    assert row['meditation_sessions'][0]['guided_audio'] is None
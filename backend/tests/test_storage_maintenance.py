@@ -0,0 +1,124 @@
+"""
+Tests for storage maintenance management commands.
+"""
+import pytest
+from datetime import timedelta
+from django.core.management import call_command
+from django.utils import timezone
+from routines.management.commands.sweep_uploads import Command
+from routines.models import MediaAsset, UploadProgress
+
+pytestmark = pytest.mark.django_db
+
+@pytest.fixture
+def reconcile_storage(monkeypatch, fake_storage):
+    """Point the reconcile command at the in-memory storage."""
+    monkeypatch.setattr(
+        'routines.management.commands.reconcile_storage.get_storage',
+        lambda: fake_storage
+    )
+    return fake_storage
+
+def test_reconcile_reports_without_deleting(reconcile_storage, tmp_path):
+    """Test that orphans are only reported unless --delete is given."""
+    reconcile_storage.add('1/image/kept.png')
+    reconcile_storage.add('1/image/orphan.png')
+    MediaAsset.objects.create(name='kept', asset_type='image', file_size=100, supabase_path='1/image/kept.png')
+
+    call_command('reconcile_storage', checkpoint=str(tmp_path / 'cp.json'))
+
+    assert '1/image/orphan.png' in reconcile_storage.objects
+
+def test_reconcile_deletes_orphans_across_pages(reconcile_storage, tmp_path):
+    """Test that deletion keeps paging correct while the listing shrinks."""
+    for i in range(7):
+        reconcile_storage.add(f'2/audio/{i}.wav')
+    reconcile_storage.add('2/video/clip.mp4')
+    for i in (1, 4):
+        MediaAsset.objects.create(name=str(i), asset_type='audio', file_size=100, supabase_path=f'2/audio/{i}.wav')
+
+    call_command('reconcile_storage', delete=True, page_size=2, checkpoint=str(tmp_path / 'cp.json'))
+
+    assert sorted(reconcile_storage.objects) == ['2/audio/1.wav', '2/audio/4.wav']
+    assert not (tmp_path / 'cp.json').exists()
+
+def test_reconcile_keeps_recent_objects(reconcile_storage, tmp_path):
+    """Test that objects younger than --min-age-hours are left alone."""
+    reconcile_storage.add('3/image/fresh.png', created_at='2999-01-01T00:00:00+00:00')
+
+    call_command('reconcile_storage', delete=True, checkpoint=str(tmp_path / 'cp.json'))
+
+    assert '3/image/fresh.png' in reconcile_storage.objects
+
+def test_reconcile_resumes_from_checkpoint(reconcile_storage, tmp_path):
+    """Test that prefixes before the checkpoint are skipped."""
+    reconcile_storage.add('1/image/a.png')
+    reconcile_storage.add('5/image/b.png')
+    checkpoint = tmp_path / 'cp.json'
+    checkpoint.write_text('{"bucket": "media-assets", "prefix": "5/image/", "offset": 0}')
+
+    call_command('reconcile_storage', delete=True, checkpoint=str(checkpoint))
+
+    assert '1/image/a.png' in reconcile_storage.objects
+    assert '5/image/b.png' not in reconcile_storage.objects
+
+@pytest.fixture
+def sweep_storage(monkeypatch, fake_storage):
+    """Point the sweep command at the in-memory storage."""
+    monkeypatch.setattr(
+        'routines.management.commands.sweep_uploads.get_storage',
+        lambda: fake_storage
+    )
+    return fake_storage
+
+def test_sweep_expires_pending_uploads(sweep_storage):
+    """Test that expired pending uploads are failed and their objects removed."""
+    now = timezone.now()
+    sweep_storage.add('1/video/partial.mp4')
+    expired = UploadProgress.objects.create(
+        file_name='partial.mp4', asset_type='video', file_path='1/video/partial.mp4',
+        expires_at=now - timedelta(minutes=5)
+    )
+    active = UploadProgress.objects.create(
+        file_name='active.mp4', asset_type='video', file_path='1/video/active.mp4',
+        expires_at=now + timedelta(minutes=30)
+    )
+
+    call_command('sweep_uploads', chunk_size=1)
+
+    expired.refresh_from_db()
+    active.refresh_from_db()
+    assert expired.status == 'failed'
+    assert active.status == 'pending'
+    assert '1/video/partial.mp4' not in sweep_storage.objects
+
+def test_sweep_keeps_uploads_completed_meanwhile(sweep_storage, monkeypatch):
+    """Test that an upload finishing after the batch is selected keeps its row and object."""
+    sweep_storage.add('1/video/done.mp4')
+    upload = UploadProgress.objects.create(
+        file_name='done.mp4', asset_type='video', file_path='1/video/done.mp4',
+        expires_at=timezone.now() - timedelta(minutes=5)
+    )
+    fail_batch = Command._fail_batch
+
+    def complete_first(self, pks, now):
+        UploadProgress.objects.filter(pk=upload.pk).update(status='completed')
+        return fail_batch(self, pks, now)
+
+    monkeypatch.setattr(Command, '_fail_batch', complete_first)
+    call_command('sweep_uploads')
+
+    upload.refresh_from_db()
+    assert upload.status == 'completed'
+    assert '1/video/done.mp4' in sweep_storage.objects
+
+def test_sweep_removes_old_finished_rows(sweep_storage):
+    """Test that only finished rows past the retention window are deleted."""
+    old = UploadProgress.objects.create(file_name='old.png', asset_type='image', status='completed')
+    recent = UploadProgress.objects.create(file_name='recent.png', asset_type='image', status='failed')
+    UploadProgress.objects.filter(pk=old.pk).update(updated_at=timezone.now() - timedelta(days=90))
+
+    call_command('sweep_uploads', retention_days=30)
+
+    assert not UploadProgress.objects.filter(pk=old.pk).exists()
+    assert UploadProgress.objects.filter(pk=recent.pk).exists()
@@ -0,0 +1,166 @@
+"""
+Tests for storage timeouts, circuit breaking and concurrency limits.
+
+A fault-injecting stand-in replaces the Supabase client so the tests can make
+storage slow or failing and check that callers are answered quickly.
+"""
+import threading
+import time
+import httpx
+import pytest
+from django.core.cache import cache
+from core import resilience, storage as storage_module
+from core.resilience import CircuitBreaker, StorageUnavailable
+from core.storage import SupabaseStorage
+
+class FaultyBucket:
+    """Bucket API stand-in whose calls can be delayed or made to fail."""
+
+    def __init__(self, client):
+        self.client = client
+
+    def _request(self, result):
+        self.client.calls += 1
+        if self.client.delay:
+            time.sleep(self.client.delay)
+        if self.client.fail:
+            raise httpx.ConnectError('injected failure')
+        return result
+
+    def create_signed_url(self, path, expires_in):
+        # Shaped like storage3's result
+        url = f'https://storage.test/{path}?n={self.client.calls}'
+        return self._request({'signedURL': url, 'signedUrl': url})
+
+    def create_signed_urls(self, paths, expires_in):
+        return self._request([
+            {'path': path, 'signedURL': f'https://storage.test/{path}?n={self.client.calls}', 'error': None}
+            for path in paths
+        ])
+
+    def remove(self, paths):
+        return self._request([])
+
+class FaultyStorageAPI:
+    """Storage API stand-in exposing buckets and bucket lookups."""
+
+    def __init__(self, client):
+        self.client = client
+
+    def get_bucket(self, name):
+        return {'name': name}
+
+    def from_(self, name):
+        return FaultyBucket(self.client)
+
+class FaultyClient:
+    """Supabase client stand-in with configurable latency and failures."""
+
+    def __init__(self):
+        self.calls = 0
+        self.delay = 0.0
+        self.fail = False
+        self.storage = FaultyStorageAPI(self)
+
+@pytest.fixture(autouse=True)
+def resilience_settings(settings, monkeypatch):
+    """Use tight limits and fresh process-wide breaker state for each test."""
+    settings.STORAGE_TIMEOUTS = {'default': 0.2, 'bucket': 0.2, 'sign': 0.2, 'delete': 0.2}
+    settings.STORAGE_CIRCUIT_BREAKER = {
+        'failure_rate': 0.5, 'window': 4, 'min_calls': 3, 'reset_timeout': 60,
+    }
+    settings.STORAGE_MAX_CONCURRENCY = 2
+    settings.STORAGE_BULKHEAD_WAIT = 0.05
+    cache.clear()
+    monkeypatch.setattr(resilience, '_breakers', {})
+    monkeypatch.setattr(resilience, '_bulkhead', None)
+    monkeypatch.setattr(storage_module, '_verified_buckets', set())
+
+@pytest.fixture
+def faulty_client():
+    """Return a healthy fault-injecting client."""
+    return FaultyClient()
+
+def test_slow_storage_times_out(faulty_client):
+    """Test that a hanging request is abandoned after the operation timeout."""
+    storage = SupabaseStorage(client=faulty_client)
+    faulty_client.delay = 2
+
+    started = time.monotonic()
+    with pytest.raises(StorageUnavailable):
+        storage._get_signed_url('1/image/a.png')
+    assert time.monotonic() - started < 1
+
+def test_breaker_opens_and_fails_fast(faulty_client):
+    """Test that repeated failures stop further calls reaching storage."""
+    storage = SupabaseStorage(client=faulty_client)
+    faulty_client.fail = True
+
+    for name in ('a', 'b'):
+        with pytest.raises(httpx.ConnectError):
+            storage._get_signed_url(f'1/image/{name}.png')
+    calls = faulty_client.calls
+
+    with pytest.raises(StorageUnavailable):
+        storage._get_signed_url('1/image/c.png')
+    assert faulty_client.calls == calls
+
+def test_cached_signed_url_served_while_open(faulty_client):
+    """Test that a previously signed URL is still served during an outage."""
+    storage = SupabaseStorage(client=faulty_client)
+    url = storage._get_signed_url('1/audio/a.wav')
+    faulty_client.fail = True
+    resilience.get_circuit_breaker(f'storage:{storage.bucket_name}')._open()
+
+    assert storage._get_signed_url('1/audio/a.wav') == url
+    assert storage.delete_file('1/audio/a.wav') is False
+
+def test_batch_signing_reuses_cache(faulty_client):
+    """Test that batch signing only asks storage for uncached URLs."""
+    storage = SupabaseStorage(client=faulty_client)
+    cached = storage._get_signed_url('1/audio/a.wav')
+    calls = faulty_client.calls
+
+    urls = storage.get_signed_urls(['1/audio/a.wav', '1/audio/b.wav', '1/audio/c.wav'])
+    assert urls['1/audio/a.wav'] == cached
+    assert faulty_client.calls == calls + 1
+    assert storage._get_signed_url('1/audio/b.wav') == urls['1/audio/b.wav']
+
+def test_single_and_batch_signing_share_urls(faulty_client):
+    """Test that a URL cached by get_signed_url comes back from get_signed_urls as a string."""
+    storage = SupabaseStorage(client=faulty_client)
+    url = storage.get_signed_url('1/audio/a.wav')
+
+    assert isinstance(url, str)
+    assert storage.get_signed_urls(['1/audio/a.wav']) == {'1/audio/a.wav': url}
+
+def test_bulkhead_rejects_excess_concurrency(faulty_client):
+    """Test that calls beyond the concurrency limit are rejected immediately."""
+    storage = SupabaseStorage(client=faulty_client)
+    faulty_client.delay = 0.15
+    errors = []
+
+    def sign(name):
+        try:
+            storage._get_signed_url(f'1/image/{name}.png')
+        except StorageUnavailable as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=sign, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(errors) == 2
+
+def test_breaker_half_open_trial_closes():
+    """Test that one successful trial call closes an open breaker."""
+    breaker = CircuitBreaker('test', min_calls=1, reset_timeout=0)
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
@@ -0,0 +1,98 @@
+"""
+Tests for incrementally maintained per-instructor storage usage.
+"""
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+from routines.models import MediaAsset, StorageUsage, UploadProgress
+from routines.usage import get_usage, rebuild_usage, remaining_quota
+
+pytestmark = pytest.mark.django_db
+
+def _asset(instructor, asset_type: str, size: int) -> MediaAsset:
+    return MediaAsset.objects.create(
+        name='asset', asset_type=asset_type, file_size=size,
+        supabase_path=f'{instructor.id}/{asset_type}/asset', instructor=instructor
+    )
+
+def test_usage_follows_creates_and_deletes(instructor_profile):
+    """Test that totals change with each asset and match a full rebuild."""
+    image = _asset(instructor_profile, 'image', 1000)
+    _asset(instructor_profile, 'image', 500)
+    _asset(instructor_profile, 'audio', 4000)
+    MediaAsset.objects.create(name='shared', asset_type='audio', file_size=9000, supabase_path='shared/a')
+    image.delete()
+
+    expected = {'image': {'bytes': 500, 'count': 1}, 'audio': {'bytes': 4000, 'count': 1}}
+    assert get_usage(instructor_profile) == expected
+
+    StorageUsage.objects.update(total_bytes=0, asset_count=0)
+    assert rebuild_usage(instructor_profile) == 2
+    assert get_usage(instructor_profile) == expected
+
+def test_upload_policy_rejects_over_quota(settings, api_client, instructor_profile, django_assert_max_num_queries):
+    """Test that the quota check reads the usage rows instead of the assets."""
+    settings.INSTRUCTOR_STORAGE_QUOTA = 5000
+    _asset(instructor_profile, 'video', 4500)
+    api_client.force_authenticate(user=instructor_profile)
+
+    with django_assert_max_num_queries(1):
+        assert remaining_quota(instructor_profile) == 500
+
+    response = api_client.post(
+        reverse('media-get-upload-policy'),
+        {'file_name': 'flow.mp4', 'asset_type': 'video', 'file_size': 1000},
+        format='json'
+    )
+    assert response.status_code == 403
+    assert response.data['remaining_bytes'] == 500
+    assert api_client.get(reverse('media-usage')).data['total_bytes'] == 4500
+
+def test_usage_follows_updates(instructor_profile, client_profile):
+    """Test that changing an asset's size, type or owner moves its usage."""
+    asset = _asset(instructor_profile, 'image', 1000)
+    asset.file_size = 1500
+    asset.save()
+    asset.asset_type = 'video'
+    asset.save(update_fields=['asset_type'])
+    assert get_usage(instructor_profile) == {'image': {'bytes': 0, 'count': 0}, 'video': {'bytes': 1500, 'count': 1}}
+
+    asset.instructor = client_profile
+    asset.save()
+    assert get_usage(instructor_profile)['video'] == {'bytes': 0, 'count': 0}
+    assert get_usage(client_profile) == {'video': {'bytes': 1500, 'count': 1}}
+
+def test_uploads_count_toward_quota(settings, monkeypatch, api_client, instructor_profile, fake_storage):
+    """Test that direct and form uploads create owned assets until the quota is reached."""
+    monkeypatch.setattr('routines.main_views.get_storage', lambda: fake_storage)
+    settings.INSTRUCTOR_STORAGE_QUOTA = 5000
+    api_client.force_authenticate(user=instructor_profile)
+
+    policy = api_client.post(
+        reverse('media-get-upload-policy'),
+        {'file_name': 'flow.mp4', 'asset_type': 'video', 'file_size': 3000},
+        format='json'
+    ).data
+    fake_storage.add(policy['file_path'], size=3000)
+    response = api_client.post(
+        reverse('media-verify-upload'),
+        {'upload_id': policy['upload_id'], 'file_path': policy['file_path']},
+        format='json'
+    )
+    assert response.status_code == 201
+    assert MediaAsset.objects.get(pk=response.data['id']).instructor == instructor_profile
+    assert UploadProgress.objects.get(pk=policy['progress_id']).status == 'completed'
+
+    response = api_client.post(reverse('media-list'), {
+        'name': 'Pose', 'asset_type': 'image', 'file_size': 1500,
+        'file': SimpleUploadedFile('pose.png', b'x' * 1500, content_type='image/png'),
+    })
+    assert response.status_code == 201
+    assert api_client.get(reverse('media-usage')).data['total_bytes'] == 4500
+
+    response = api_client.post(
+        reverse('media-get-upload-policy'),
+        {'file_name': 'breath.mp3', 'asset_type': 'audio', 'file_size': 1000},
+        format='json'
+    )
+    assert response.status_code == 403
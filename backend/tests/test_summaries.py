@@ -0,0 +1,66 @@
+"""
+Tests for the summary representations of content lists.
+"""
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from routines.models import BreathingExercise, CombinedRoutine, Exercise, MediaAsset, MeditationSession, Routine
+
+pytestmark = pytest.mark.django_db
+
+def test_routine_summary(api_client, instructor_profile):
+    """Test that routine lists return counts instead of nested exercises, in one query."""
+    routine = Routine.objects.create(name='Morning', description='x' * 1000, instructor=instructor_profile)
+    for order in range(3):
+        exercise = Exercise.objects.create(routine=routine, name='Pose', order=order)
+        exercise.media_assets.add(MediaAsset.objects.create(
+            name='Pose', asset_type='image', file_size=10, supabase_path='local', instructor=instructor_profile
+        ))
+    api_client.force_authenticate(user=instructor_profile)
+
+    with CaptureQueriesContext(connection) as queries:
+        rows = api_client.get(reverse('routine-list')).data['results']
+
+    assert len(queries) == 1
+    assert 'description' not in queries[0]['sql']
+    assert rows == [{
+        'id': routine.id, 'name': 'Morning', 'instructor': instructor_profile.id,
+        'exercise_count': 3, 'media_count': 3,
+        'updated_at': rows[0]['updated_at'], 'is_active': True,
+    }]
+
+def test_session_summaries(api_client, instructor_profile):
+    """Test computed durations and media counts of breathing and meditation summaries."""
+    BreathingExercise.objects.create(
+        name='Box', instructor=instructor_profile, inhale_duration=4, hold_duration=4, exhale_duration=4, cycles=5
+    )
+    audio = MediaAsset.objects.create(
+        name='Guide', asset_type='audio', file_size=10, supabase_path='local', instructor=instructor_profile
+    )
+    MeditationSession.objects.create(
+        name='Calm', instructor=instructor_profile, duration_minutes=15, guided_audio=audio, guided_script='x' * 1000
+    )
+    api_client.force_authenticate(user=instructor_profile)
+
+    breathing = api_client.get(reverse('breathing-exercise-list')).data['results'][0]
+    assert (breathing['duration_seconds'], breathing['media_count']) == (60, 0)
+
+    with CaptureQueriesContext(connection) as queries:
+        meditation = api_client.get(reverse('meditation-session-list')).data['results'][0]
+    assert 'guided_script' not in queries[0]['sql']
+    assert (meditation['duration_seconds'], meditation['media_count']) == (900, 1)
+
+def test_combined_summary_and_expand_fallback(api_client, instructor_profile):
+    """Test member counts, and that ?expand= returns the full representation."""
+    combined = CombinedRoutine.objects.create(name='Evening', instructor=instructor_profile)
+    combined.routines.add(*(Routine.objects.create(name=f'Flow {i}', instructor=instructor_profile) for i in range(2)))
+    combined.breathing_exercises.add(BreathingExercise.objects.create(name='Box', instructor=instructor_profile))
+    api_client.force_authenticate(user=instructor_profile)
+    url = reverse('combined-routine-list')
+
+    row = api_client.get(url).data['results'][0]
+    assert (row['routine_count'], row['breathing_count'], row['meditation_count']) == (2, 1, 0)
+
+    row = api_client.get(url + '?expand=routines').data['results'][0]
+    assert sorted(routine['name'] for routine in row['routines']) == ['Flow 0', 'Flow 1']
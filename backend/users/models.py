@@ -26,6 +26,16 @@ class UserProfile(models.Model):
         """String representation."""
         return f"{self.email} ({self.role})"
     
+    @property
+    def is_authenticated(self) -> bool:
+        """Always True, so DRF permissions can treat profiles as authenticated users."""
+        return True
+    
+    @property
+    def is_anonymous(self) -> bool:
+        """Always False, the counterpart of ``is_authenticated``."""
+        return False
+    
     def get_preferences(self) -> Dict[str, Any]:
         """Get user preferences with defaults."""
         default_preferences = {